@@ -0,0 +1,122 @@
+# backend/app/api/v1/endpoints/analytics.py
+# This file implements FastAPI endpoints for aggregate analytics across all processed flights (the fleet archive).
+# The following functionalities are provided:
+#
+# 1. **Common Parameters**:
+# - `since` / `until` (dates, inclusive) or `days` (the last n days) restrict the flights by their ingest timestamp.
+# - Only processed files (`done`) are included; their whole-flight metrics are read from the metadata store in a
+#   single query (`MetadataStore.flight_summaries`), so the aggregates never load flight data.
+#
+# 2. **Fleet Summary Endpoint**:
+# - **GET `/summary`**:
+#   - Returns the number of flights, the total flight time (minutes) and points, and the flights with the highest
+#     altitude and the closest radar distance.
+#
+# 3. **Metric Distribution Endpoint**:
+# - **GET `/distribution`**:
+#   - Returns the histogram (`bins` buckets), min/max/mean/percentiles and the top flights of one flight metric
+#     (`metric`, e.g. `maxAltitude`).
+#   - Raises HTTP 400 for unknown metrics.
+#
+# 4. **Daily Totals Endpoint**:
+# - **GET `/daily`**:
+#   - Returns the number of flights, the flight time (minutes) and the points per ingest day.
+#
+# 5. **Closest Approaches Endpoint**:
+# - **GET `/approaches`**:
+#   - Returns the `limit` flights with the closest radar approach, with the time, position and altitude of the
+#     closest point located in the columnar artifacts by a parallel map-reduce in the CPU worker pool
+#     (`services/fleet_analytics.py`).
+#   - With `threshold`, also counts the flights and points closer than `threshold` meters.
+#
+# Computations run in the I/O worker pool (summaries) or the CPU worker pool (artifacts), off the event loop.
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from ....db.metadata_store import get_metadata_store
+from ....services.executor import PoolSaturated, io_pool
+from ....services.fleet_analytics import (
+    METRIC_FIELDS,
+    closest_approaches,
+    daily_totals,
+    fleet_summary,
+    metric_distribution,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def load_flights(
+    since: Optional[date], until: Optional[date], days: Optional[int]
+) -> List[Dict]:
+    """Whole-flight metrics of the processed flights ingested in the requested period."""
+    if days is not None:
+        since = date.today() - timedelta(days=days - 1)
+    return await io_pool.run(
+        get_metadata_store().flight_summaries,
+        METRIC_FIELDS,
+        since.isoformat() if since is not None else None,
+        (until + timedelta(days=1)).isoformat() if until is not None else None,
+    )
+
+
+@router.get("/summary")
+async def get_fleet_summary(
+    since: Optional[date] = Query(None),
+    until: Optional[date] = Query(None),
+    days: Optional[int] = Query(None, ge=1),
+):
+    """Get totals and extremes of the fleet."""
+    flights = await load_flights(since, until, days)
+    return await io_pool.run(fleet_summary, flights)
+
+
+@router.get("/distribution")
+async def get_metric_distribution(
+    metric: str = Query("maxAltitude"),
+    bins: int = Query(20, ge=1, le=1000),
+    since: Optional[date] = Query(None),
+    until: Optional[date] = Query(None),
+    days: Optional[int] = Query(None, ge=1),
+):
+    """Get the distribution of a flight metric across the fleet."""
+    if metric not in METRIC_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown metric: {metric}. Available metrics: {', '.join(METRIC_FIELDS)}",
+        )
+    flights = await load_flights(since, until, days)
+    return await io_pool.run(metric_distribution, flights, metric, bins)
+
+
+@router.get("/daily")
+async def get_daily_totals(
+    since: Optional[date] = Query(None),
+    until: Optional[date] = Query(None),
+    days: Optional[int] = Query(None, ge=1),
+):
+    """Get flights and flight time per day."""
+    flights = await load_flights(since, until, days)
+    return {"days": await io_pool.run(daily_totals, flights)}
+
+
+@router.get("/approaches")
+async def get_closest_approaches(
+    limit: int = Query(10, ge=1, le=1000),
+    threshold: Optional[float] = Query(None, ge=0),
+    since: Optional[date] = Query(None),
+    until: Optional[date] = Query(None),
+    days: Optional[int] = Query(None, ge=1),
+):
+    """Get the closest radar approaches of the fleet."""
+    try:
+        flights = await load_flights(since, until, days)
+        return await closest_approaches(flights, limit, threshold)
+    except (HTTPException, PoolSaturated):
+        raise
+    except Exception as e:
+        logger.error(f"Error computing closest approaches: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
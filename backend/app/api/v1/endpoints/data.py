@@ -5,46 +5,91 @@
 # 1. **Data Retrieval Endpoint**:
 # - **GET `/{file_id}`**:
 #   - Fetches processed drone data for a specific file ID.
-#   - Retrieves the file path from the mapping using `get_file_path(file_id)`.
-#   - Reads and parses the file content (`JSON` or `CSV`) using `read_file_content(file_path)`.
-#   - Calculates various metrics such as altitude, radar distance, and flight duration using `calculate_metrics(data)`.
-#   - Optionally filters data based on start and end time (if provided via query parameters).
+#   - Loads the flight columns and whole-flight metrics through `load_flight(file_id)`, which serves them from the
+#     in-process flight cache when the file has not changed since it was cached.
+#   - Filters records by `start_time`/`end_time` with a binary search over the timestamp column.
+#   - Pages through the window with `offset`/`limit`; the response's `page` object reports the window size and
+#     the `nextOffset` to request.
+#   - Projects records onto the dotted paths given in `fields` (e.g. `fields=gps.altitude`); `timestamp` is always included.
+#   - With `max_points`, downsamples the page for rendering: `timeSeries` with Largest-Triangle-Three-Buckets and
+#     the GPS track in `data` with Douglas–Peucker, served from the precomputed LOD pyramid when available.
+#   - `include_data`, `include_series` and `include_summary` drop the records, the `timeSeries` or the
+#     `flightMetrics`/`summary` from the response, so views only transfer what they render.
+#   - Selects, downsamples and serializes the page in the I/O worker pool (`build_data_response`), off the event loop.
+#   - Negotiates the encoding from the `Accept` header or the `format` parameter (`services/flight_encoding.py`):
+#     `records` (JSON arrays of objects, the default), `columns` (column-oriented JSON,
+#     `application/vnd.drone.columns+json`) or `binary` (typed arrays, `application/vnd.drone.columns`). JSON is
+#     encoded with orjson when it is installed.
+#   - Sends a strong `ETag` (content hash of the file, processing version, media type and query parameters) and
+#     `Cache-Control` (`services/http_cache.py`); a request whose `If-None-Match` matches gets `304 Not Modified`
+#     right after the metadata lookup, without reading or serializing the flight.
+#   - Responses are compressed by `CompressionMiddleware` (`core/compression.py`); a page that was compressed before
+#     is served from the cached compressed variants (keyed by its ETag and encoding) without loading the flight.
+#   - The metadata lookup, file read and serialization are timed as spans (`lookup`, `read`, `serialize`, plus
+#     `parse` and `metrics` when they have to be rebuilt), and the served bytes and rows are counted
+#     (`core/instrumentation.py`, reported at `GET /metrics` and optionally in a `Server-Timing` header).
 #   - Returns processed data and calculated metrics in JSON format.
 #   - Handles errors such as missing files, empty data, or unexpected exceptions.
 #
 # 2. **Data Export Endpoint**:
 # - **GET `/{file_id}/export`**:
 #   - Exports drone data in a specified format (`csv` or `json`).
-#   - Retrieves the file path and reads data using `get_file_path(file_id)` and `read_file_content(file_path)`.
-#   - Formats data into CSV or JSON, depending on the requested format:
+#   - Loads the flight through `load_flight(file_id)` (shared with the data endpoint and its cache).
+#   - Supports the same `start_time`/`end_time` window as the data endpoint.
+#   - Streams the document with a `StreamingResponse`, formatting a chunk of rows at a time from the
+#     memory-mapped columns (`services/flight_export.py`), so memory use does not grow with the flight size:
 #     - **CSV**:
 #       - Uses Python's `csv.writer` with proper newline handling to write data rows.
 #       - Includes a header row with columns: `timestamp, latitude, longitude, altitude, radar_distance`.
-#       - Returns a plain text response (`text/csv`) with the filename `drone_data.csv`.
+#       - Returns a `text/csv` stream with the filename `drone_data.csv`.
 #     - **JSON**:
 #       - Formats data with proper indentation for readability.
-#       - Returns a plain text response (`application/json`) with the filename `drone_data.json`.
+#       - Returns an `application/json` stream with the filename `drone_data.json`.
+#   - The stream is compressed chunk by chunk by `CompressionMiddleware` with the encoding the client accepts.
+#   - Sends an `ETag` (content hash, processing version, format and window) and `Cache-Control`, and answers a
+#     matching `If-None-Match` with `304 Not Modified` before anything is read or streamed.
+#   - Each chunk is formatted in the I/O worker pool.
+#   - The stream is timed as the `stream` span and the exported rows and bytes are counted.
 #   - Handles errors such as unsupported formats, missing files, or export failures.
 #
-# 3. **Helper Functions**:
-# - `get_file_mapping()`:
-#   - Reads the `file_mapping.json` to retrieve the current mapping of file IDs to metadata.
-#   - Returns an empty dictionary if the mapping file is missing or encounters an error.
+# 3. **Flight Comparison Endpoint**:
+# - **GET `/compare`**:
+#   - Compares the flights given in `ids` (comma-separated, 2 to 8 file IDs; the first is the reference).
+#   - Loads the flights in parallel through `load_flight` (flight cache, memory-mapped artifacts).
+#   - Resamples altitude and radar distance onto a common grid of `points` samples with vectorized interpolation
+#     (`services/flight_comparison.py`): by seconds since takeoff (`align=elapsed`) or by the fraction of each
+#     flight's duration (`align=progress`).
+#   - Returns the grid, the aligned columns per flight and the deltas of every flight to the reference (aligned
+#     differences, their RMSE and the differences of the whole-flight metrics), so clients do not have to fetch
+#     and align the full datasets.
+#   - Raises HTTP 400 for invalid ID lists and HTTP 404 if a file does not exist.
 #
-# - `get_file_path(file_id: str) -> Path`:
-#   - Retrieves the file path for a given file ID from the mapping.
-#   - Validates that the file exists and raises an HTTP exception if not found.
+# 4. **Helper Functions**:
+# - `get_file_record(file_id: str) -> dict` / `get_file_path(file_id: str) -> Path`:
+#   - Retrieve the metadata record or the file path for a given file ID from the metadata store (a single indexed lookup).
+#   - Validate that the file exists and raise an HTTP exception if not found.
+#
+# - `load_flight(file_id: str, file_info: dict = None) -> LoadedFlight`:
+#   - Returns the flight columns, the whole-flight `flightMetrics`/`summary` and the LOD pyramid (if stored) of a file.
+#   - The columns are memory-mapped from the binary artifact written by `process_file`; when the artifact is
+#     missing or older than the file, it is rebuilt from the raw file with `build_flight_artifacts` first.
+#   - The whole-flight metrics are taken from the metadata record, where they are stored at ingest. Files processed
+#     before that get them calculated once (`flight_summary`) and written back to the metadata store.
+#   - Artifact loading runs in the I/O worker pool; parsing and the metrics run in the CPU worker pool
+#     (see `services/executor.py`), which rejects requests with 503 when its queue is full.
+#   - Results are cached in `flight_cache`, keyed by file ID and the file's modification time and size.
 #
 # - `read_file_content(file_path: Path) -> List[dict]`:
-#   - Reads and parses file content based on its extension (`.json` or `.csv`).
-#   - Handles file-specific formatting and normalization of fields like `latitude`, `longitude`, `altitude`, and `radar_distance`.
+#   - Reads and parses file content based on its extension (`.json` or `.csv`) with the ingestion module
+#     (`services/ingestion.py`).
 #   - Returns a list of dictionaries representing the parsed records.
 #
-# - `calculate_metrics(data: List[dict])`:
+# - `calculate_metrics(data: List[dict] | FlightColumns)`:
 #   - Calculates various metrics for the dataset, including:
 #     - Altitude and distance statistics (min, max, average, change).
 #     - Flight duration based on timestamps.
 #     - Time-series data with normalized altitude and distance.
+#   - Converts the records into `FlightColumns` and delegates to the vectorized engine in `services/flight_columns.py`.
 #   - Returns a dictionary containing flight metrics, time-series data, and a summary.
 #
 # - `parse_time(time_str: str) -> time`:
@@ -54,52 +99,83 @@
 # - `calculate_duration(start_time_str: str, end_time_str: str) -> float`:
 #   - Calculates the duration in minutes between two time strings.
 #
-# This file integrates with `file_mapping.json` and ensures seamless handling of drone data processing and export.
+# This file integrates with the metadata store and ensures seamless handling of drone data processing and export.
 # Logging is utilized extensively to track operations and handle errors gracefully.
-from fastapi import APIRouter, HTTPException, Query, Response
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, NamedTuple, Optional, List, Tuple, Union
+import asyncio
+import numpy as np
 import json
 import csv
 import io
 from datetime import datetime, time
 import logging
+from ....core.compression import cached_variant
 from ....core.config import settings
+from ....core.instrumentation import count_processed, span, timed_stream
+from ....db.metadata_store import get_metadata_store
+from ....services import flight_columns
+from ....services.flight_columns import (
+    FlightColumns,
+    RECORD_FIELDS,
+    build_time_series,
+)
+from ....services.data_processing import build_flight_artifacts, flight_summary
+from ....services.downsampling import select_series, select_track
+from ....services.executor import PoolSaturated, cpu_pool, io_pool
+from ....services.flight_encoding import (
+    FORMATS,
+    MEDIA_BINARY,
+    MEDIA_RECORDS,
+    data_columns,
+    encode,
+    negotiate,
+    series_columns,
+)
+from ....services.flight_comparison import (
+    ALIGN_MODES,
+    MAX_COMPARED_FLIGHTS,
+    compare_flights,
+)
+from ....services.ingestion import read_records
+from ....services.flight_artifacts import load_artifact, load_lod
+from ....services.flight_cache import flight_cache, file_signature
+from ....services.flight_export import iter_csv, iter_json
+from ....services.http_cache import (
+    cache_headers,
+    flight_etag,
+    is_not_modified,
+    not_modified,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-def get_file_mapping():
-    """Get or create the file ID mapping."""
-    mapping_file = settings.UPLOAD_DIR / "file_mapping.json"
-    try:
-        if mapping_file.exists():
-            with open(mapping_file, "r") as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Error reading mapping file: {e}")
-    return {}
-
-
-def get_file_path(file_id: str) -> Path:
-    """Get file path from mapping."""
+def get_file_record(file_id: str) -> dict:
+    """Get the metadata record of an existing file."""
     logger.debug(f"Getting file path for ID: {file_id}")
-    mapping = get_file_mapping()
+    file_info = get_metadata_store().get(file_id)
 
-    if file_id not in mapping:
-        logger.error(f"File ID not found in mapping: {file_id}")
+    if file_info is None:
+        logger.error(f"File ID not found in metadata store: {file_id}")
         raise HTTPException(status_code=404, detail="File not found")
 
-    file_path = Path(mapping[file_id]["path"])
+    file_path = Path(file_info["path"])
     if not file_path.exists():
         logger.error(f"File not found at path: {file_path}")
         raise HTTPException(status_code=404, detail="File not found")
 
     logger.debug(f"Found file at: {file_path}")
-    return file_path
+    return file_info
+
+
+def get_file_path(file_id: str) -> Path:
+    """Get file path from the metadata store."""
+    return Path(get_file_record(file_id)["path"])
 
 
 def time_to_minutes(t: time) -> float:
@@ -129,153 +205,290 @@ def calculate_duration(start_time_str: str, end_time_str: str) -> float:
 
 def read_file_content(file_path: Path) -> List[dict]:
     """Read and parse file content based on extension."""
-    logger.debug(f"Reading file: {file_path}")
+    if file_path.suffix.lower() not in (".csv", ".json"):
+        logger.error(f"Unsupported file format: {file_path.suffix}")
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported file format: {file_path.suffix}"
+        )
 
     try:
-        if file_path.suffix.lower() == ".json":
-            logger.debug("Processing JSON file")
-            with open(file_path, "r") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    data = [data]
-                logger.debug(f"Read {len(data)} records from JSON")
-                return data
-
-        elif file_path.suffix.lower() == ".csv":
-            logger.debug("Processing CSV file")
-            data = []
-            with open(file_path, "r") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    processed_row = {
-                        "timestamp": row["timestamp"],
-                        "gps": {
-                            "latitude": float(row["latitude"]),
-                            "longitude": float(row["longitude"]),
-                            "altitude": float(row["altitude"]),
-                        },
-                        "radar": {"distance": float(row["radar_distance"])},
-                    }
-                    data.append(processed_row)
-            logger.debug(f"Read {len(data)} records from CSV")
-            return data
-
-        else:
-            logger.error(f"Unsupported file format: {file_path.suffix}")
-            raise HTTPException(
-                status_code=400, detail=f"Unsupported file format: {file_path.suffix}"
-            )
-
-    except Exception as e:
+        return read_records(file_path)
+    except ValueError as e:
         logger.error(f"Error reading file: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def calculate_metrics(data: List[dict]):
+def calculate_metrics(data: Union[List[dict], FlightColumns]):
     """Calculate all metrics for the dataset."""
-    if not data:
-        raise ValueError("No data provided")
-
-    # Basic metrics
-    altitude_values = [d["gps"]["altitude"] for d in data]
-    distance_values = [d["radar"]["distance"] for d in data]
-
-    # Calculate duration
-    total_duration = calculate_duration(data[0]["timestamp"], data[-1]["timestamp"])
-
-    # Calculate time series with proper duration
-    time_series = []
-    start_time = parse_time(data[0]["timestamp"])
-    max_altitude = max(altitude_values)
-    min_altitude = min(altitude_values)
-    avg_altitude = sum(altitude_values) / len(altitude_values)
-    max_distance = max(distance_values)
-    min_distance = min(distance_values)
-    avg_distance = sum(distance_values) / len(distance_values)
-
-    for item in data:
-        current_time = parse_time(item["timestamp"])
-        duration = time_to_minutes(current_time) - time_to_minutes(start_time)
-
-        point = {
-            "duration": round(duration, 2),
-            "altitude": item["gps"]["altitude"],
-            "distance": item["radar"]["distance"],
-            "normalizedAltitude": (
-                (item["gps"]["altitude"] - min_altitude) / (max_altitude - min_altitude)
-                if max_altitude != min_altitude
-                else 0
-            ),
-            "normalizedDistance": (
-                (item["radar"]["distance"] - min_distance)
-                / (max_distance - min_distance)
-                if max_distance != min_distance
-                else 0
-            ),
-            "time": item["timestamp"],
-        }
-        time_series.append(point)
-
-    return {
-        "flightMetrics": {
-            "duration": round(total_duration, 2),
-            "maxAltitude": max_altitude,
-            "minAltitude": min_altitude,
-            "avgAltitude": round(avg_altitude, 2),
-            "maxDistance": max_distance,
-            "minDistance": min_distance,
-            "avgDistance": round(avg_distance, 2),
-            "totalPoints": len(data),
-            "startTime": data[0]["timestamp"],
-            "endTime": data[-1]["timestamp"],
-        },
-        "timeSeries": time_series,
-        "summary": {
-            "altitude": {
-                "max": max_altitude,
-                "min": min_altitude,
-                "avg": round(avg_altitude, 2),
-                "change": round(altitude_values[-1] - altitude_values[0], 2),
-            },
-            "radar": {
-                "max": max_distance,
-                "min": min_distance,
-                "avg": round(avg_distance, 2),
-                "change": round(distance_values[-1] - distance_values[0], 2),
-            },
-        },
+    if not isinstance(data, FlightColumns):
+        if not data:
+            raise ValueError("No data provided")
+        data = FlightColumns.from_records(data)
+    return flight_columns.calculate_metrics(data)
+
+
+class LoadedFlight(NamedTuple):
+    """A flight as served by the data endpoints."""
+
+    columns: FlightColumns
+    summary: dict
+    lod: Optional[Dict[str, np.ndarray]]
+
+
+async def load_flight(file_id: str, file_info: Optional[dict] = None) -> LoadedFlight:
+    """Get the columns, whole-flight summary and LOD pyramid of a file, using the flight cache."""
+    if file_info is None:
+        with span("lookup"):
+            file_info = await io_pool.run(get_file_record, file_id)
+    file_path = Path(file_info["path"])
+    signature = file_signature(file_path)
+
+    cached = flight_cache.get(file_id, signature)
+    if cached is not None:
+        logger.debug(f"Flight cache hit for {file_id}")
+        return cached
+
+    # Prefer the memory-mapped artifact, (re)build it from the raw file in a worker otherwise
+    summary = file_info["metrics"]
+    with span("read"):
+        columns = await io_pool.run(load_artifact, file_path)
+    if columns is None:
+        logger.debug(f"No current artifact for {file_id}, parsing raw file")
+        with span("parse"):
+            summary = await cpu_pool.run(build_flight_artifacts, str(file_path))
+            columns = await io_pool.run(load_artifact, file_path)
+
+    if columns is None or len(columns) == 0:
+        raise HTTPException(status_code=404, detail="No data found in file")
+
+    # Metrics are stored at ingest; calculate and store them once for older files
+    if summary is None:
+        with span("metrics"):
+            summary = await cpu_pool.run(flight_summary, str(file_path))
+    if summary != file_info["metrics"]:
+        await io_pool.run(get_metadata_store().update, file_id, metrics=summary)
+
+    with span("read"):
+        lod = await io_pool.run(load_lod, file_path)
+    flight = LoadedFlight(columns, summary, lod)
+    nbytes = columns.nbytes + sum(a.nbytes for a in (lod or {}).values())
+    flight_cache.put(file_id, signature, flight, nbytes)
+    return flight
+
+
+def time_to_seconds(t: Optional[time]) -> Optional[int]:
+    """Convert a time of day to seconds since midnight."""
+    if t is None:
+        return None
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated field projection."""
+    if fields is None:
+        return None
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in RECORD_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. "
+            f"Available fields: {', '.join(RECORD_FIELDS)}",
+        )
+    return ["timestamp", *requested]
+
+
+def paginate(
+    selection: Union[slice, np.ndarray], offset: int, limit: Optional[int]
+) -> Tuple[Union[slice, np.ndarray], int]:
+    """Apply offset/limit to a window selection. Returns (page, window size)."""
+    if isinstance(selection, slice):
+        total = selection.stop - selection.start
+        start = min(selection.start + offset, selection.stop)
+        stop = selection.stop if limit is None else min(start + limit, selection.stop)
+        return slice(start, stop), total
+
+    total = len(selection)
+    stop = None if limit is None else offset + limit
+    return selection[offset:stop], total
+
+
+def build_data_response(
+    flight: LoadedFlight,
+    projection: Optional[List[str]],
+    start_time: Optional[time],
+    end_time: Optional[time],
+    include_summary: bool,
+    include_series: bool,
+    include_data: bool,
+    offset: int,
+    limit: Optional[int],
+    max_points: Optional[int],
+    media_type: str = MEDIA_RECORDS,
+) -> Response:
+    """Select, downsample and serialize the requested page of a flight."""
+    columns, summary = flight.columns, flight.summary
+    columnar = media_type != MEDIA_RECORDS
+    binary = media_type == MEDIA_BINARY
+
+    # Select the time window, then the requested page of it
+    window = columns.window(time_to_seconds(start_time), time_to_seconds(end_time))
+    selection, total = paginate(window, offset, limit)
+    page = columns.take(selection)
+    returned = len(page)
+
+    # Downsample for rendering: LTTB for the series, Douglas-Peucker for the track
+    series_page = track_page = page
+    if max_points is not None:
+        if include_series:
+            series_page = columns.take(
+                select_series(columns, selection, max_points, flight.lod)
+            )
+        if include_data:
+            track_page = columns.take(
+                select_track(columns, selection, max_points, flight.lod)
+            )
+
+    metrics = {}
+    if include_summary:
+        metrics["flightMetrics"] = summary["flightMetrics"]
+    if include_series:
+        if columnar:
+            metrics["timeSeries"] = series_columns(
+                series_page, summary["flightMetrics"], binary
+            )
+        else:
+            metrics["timeSeries"] = build_time_series(
+                series_page, summary["flightMetrics"]
+            )
+    if include_summary:
+        metrics["summary"] = summary["summary"]
+
+    response_data = {}
+    if include_data:
+        if columnar:
+            response_data["data"] = data_columns(track_page, projection, binary)
+        else:
+            response_data["data"] = track_page.to_records(projection)
+    response_data["metrics"] = metrics
+    response_data["page"] = {
+        "offset": offset,
+        "limit": limit,
+        "returned": returned,
+        "total": total,
+        "nextOffset": offset + returned if offset + returned < total else None,
+        "maxPoints": max_points,
     }
 
+    body = encode(response_data, media_type)
+    count_processed("data", nbytes=len(body), rows=returned)
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+
+@router.get("/compare")
+async def compare_data(
+    ids: str = Query(...),
+    points: int = Query(500, ge=2, le=10000),
+    align: str = Query("elapsed", regex=f"^({'|'.join(ALIGN_MODES)})$"),
+):
+    """Compare several flights on a common, downsampled time grid."""
+    file_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not 2 <= len(file_ids) <= MAX_COMPARED_FLIGHTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Between 2 and {MAX_COMPARED_FLIGHTS} different file IDs are required",
+        )
+    logger.info(f"Comparing files {file_ids}")
+
+    try:
+        # Load all flights in parallel (served from cache when possible)
+        records, flights = await asyncio.gather(
+            asyncio.gather(*(io_pool.run(get_file_record, i) for i in file_ids)),
+            asyncio.gather(*(load_flight(i) for i in file_ids)),
+        )
+
+        # Resample in the I/O pool, next to the memory-mapped columns
+        comparison = await io_pool.run(
+            compare_flights,
+            [
+                (record, flight.columns, flight.summary["flightMetrics"])
+                for record, flight in zip(records, flights)
+            ],
+            points,
+            align,
+        )
+        return JSONResponse(content=comparison)
+
+    except (HTTPException, PoolSaturated):
+        raise
+    except Exception as e:
+        logger.error(f"Comparison error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 @router.get("/{file_id}")
 async def get_data(
+    request: Request,
     file_id: str,
     start_time: Optional[time] = Query(None),
     end_time: Optional[time] = Query(None),
     include_summary: bool = Query(True),
+    include_series: bool = Query(True),
+    include_data: bool = Query(True),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = Query(None),
+    max_points: Optional[int] = Query(None, ge=2),
+    format: Optional[str] = Query(None, regex=f"^({'|'.join(FORMATS)})$"),
 ):
     """Get processed drone data for a specific file."""
     logger.info(f"Getting data for file ID: {file_id}")
 
     try:
-        # Get file path from mapping
-        file_path = get_file_path(file_id)
-
-        # Read and parse the file
-        data = read_file_content(file_path)
-        logger.debug(f"Read {len(data)} records")
-
-        if not data:
-            raise HTTPException(status_code=404, detail="No data found in file")
-
-        # Calculate all metrics
-        metrics = calculate_metrics(data)
-
-        response_data = {"data": data, "metrics": metrics}
-
-        return JSONResponse(content=response_data)
+        projection = parse_fields(fields)
+        media_type = negotiate(request.headers.get("accept"), format)
+
+        # The response only depends on the file content and the request
+        with span("lookup"):
+            file_info = await io_pool.run(get_file_record, file_id)
+        etag = flight_etag(
+            file_info, media_type, *sorted(request.query_params.multi_items())
+        )
+        headers = {
+            **cache_headers(etag, settings.HTTP_CACHE_MAX_AGE),
+            "Vary": "Accept",
+        }
+        if is_not_modified(request, etag):
+            return not_modified(headers)
+        # A page that was compressed before is served as it is
+        cached = cached_variant(request, etag, headers)
+        if cached is not None:
+            return cached
+
+        # Read, parse and calculate metrics (served from cache when possible)
+        flight = await load_flight(file_id, file_info)
+
+        # Build and serialize the page in the I/O pool, off the event loop
+        with span("serialize"):
+            response = await io_pool.run(
+                build_data_response,
+                flight,
+                projection,
+                start_time,
+                end_time,
+                include_summary,
+                include_series,
+                include_data,
+                offset,
+                limit,
+                max_points,
+                media_type,
+            )
+        response.headers.update(headers)
+        return response
 
-    except HTTPException:
+    except (HTTPException, PoolSaturated):
         raise
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
@@ -297,80 +510,48 @@ from ....core.config import settings
 
 @router.get("/{file_id}/export")
 async def export_data(
-    response: Response, file_id: str, format: str = Query(..., regex="^(csv|json)$")
+    request: Request,
+    file_id: str,
+    format: str = Query(..., regex="^(csv|json)$"),
+    start_time: Optional[time] = Query(None),
+    end_time: Optional[time] = Query(None),
 ):
     """Export drone data in specified format."""
     logger.info(f"Exporting file {file_id} in {format} format")
 
     try:
-        # Get file path and read data
-        file_path = get_file_path(file_id)
-        data = read_file_content(file_path)
-
-        if not data:
-            raise HTTPException(status_code=404, detail="No data found in file")
+        with span("lookup"):
+            file_info = await io_pool.run(get_file_record, file_id)
+        etag = flight_etag(file_info, format, start_time, end_time)
+        cache = cache_headers(etag, settings.HTTP_CACHE_MAX_AGE)
+        if is_not_modified(request, etag):
+            return not_modified(cache)
+
+        # Memory-mapped columns (served from cache when possible)
+        columns = (await load_flight(file_id, file_info)).columns
+        window = columns.window(time_to_seconds(start_time), time_to_seconds(end_time))
+        columns = columns.take(window)
 
         if format == "csv":
-            # Use StringIO with proper newline handling
-            output = StringIO(newline="")
-            writer = csv.writer(output, lineterminator="\n")
+            chunks = iter_csv(columns, settings.EXPORT_CHUNK_ROWS)
+            media_type = "text/csv"
+        else:  # JSON format
+            chunks = iter_json(columns, settings.EXPORT_CHUNK_ROWS)
+            media_type = "application/json"
 
-            # Write header
-            writer.writerow(
-                ["timestamp", "latitude", "longitude", "altitude", "radar_distance"]
-            )
+        headers = {
+            "Content-Disposition": f"attachment; filename=drone_data.{format}",
+            **cache,
+        }
+        body = (chunk.encode("utf-8") for chunk in chunks)
 
-            # Write data rows with proper formatting
-            for item in data:
-                writer.writerow(
-                    [
-                        item["timestamp"],
-                        f"{item['gps']['latitude']:.4f}",
-                        f"{item['gps']['longitude']:.4f}",
-                        str(int(round(item["gps"]["altitude"]))),
-                        str(int(round(item["radar"]["distance"]))),
-                    ]
-                )
-
-            # Get content and close StringIO
-            content = output.getvalue()
-            output.close()
-
-            # Return plain text response with proper headers
-            response = PlainTextResponse(content=content, media_type="text/csv")
-            response.headers["Content-Disposition"] = (
-                "attachment; filename=drone_data.csv"
-            )
-            return response
+        # Format each chunk in the I/O pool
+        body = timed_stream(io_pool.iterate(body), "stream", "export")
+        count_processed("export", rows=len(columns))
 
-        else:  # JSON format
-            # Format data properly
-            formatted_data = []
-            for item in data:
-                formatted_item = {
-                    "timestamp": item["timestamp"],
-                    "gps": {
-                        "latitude": round(float(item["gps"]["latitude"]), 4),
-                        "longitude": round(float(item["gps"]["longitude"]), 4),
-                        "altitude": int(round(item["gps"]["altitude"])),
-                    },
-                    "radar": {"distance": int(round(item["radar"]["distance"]))},
-                }
-                formatted_data.append(formatted_item)
-
-            # Create formatted JSON string with proper indentation
-            json_str = json.dumps(formatted_data, indent=2)
-
-            # Return as PlainTextResponse to preserve formatting
-            response = PlainTextResponse(
-                content=json_str, media_type="application/json"
-            )
-            response.headers["Content-Disposition"] = (
-                "attachment; filename=drone_data.json"
-            )
-            return response
+        return StreamingResponse(body, media_type=media_type, headers=headers)
 
-    except HTTPException:
+    except (HTTPException, PoolSaturated):
         raise
     except Exception as e:
         logger.error(f"Export error: {str(e)}", exc_info=True)
@@ -5,51 +5,101 @@
 # 1. **File Upload Endpoint**:
 # - **POST `/upload`**:
 #   - Accepts a file (`UploadFile`) and performs the following operations:
-#     - Validates the file content using the `validate_file_content` function.
-#     - Generates a unique file ID and constructs a save path with a timestamped filename.
-#     - Saves the file in chunks (8KB at a time) to ensure efficient handling of large files.
-#     - Checks the saved file's existence and size to confirm successful saving.
-#     - Updates a file mapping (`file_mapping.json`) to track file metadata (e.g., ID, name, path, timestamp).
-#     - Starts a background task (`process_file`) to process the file asynchronously.
+#     - Validates and saves the file in a single streaming pass using `save_upload_file`: the content is validated
+#       and hashed chunk by chunk while it is written to a temporary file, which is then stored by its content hash
+#       (`services/blob_store.py`). Identical content is stored only once.
+#     - Generates a unique file ID for the saved file.
+#     - Inserts the file metadata (e.g., ID, name, path, timestamp, content hash) and its processing job into the
+#       metadata store in a single transaction, and wakes up the background job queue (`services/job_queue.py`).
+#       A re-upload of content that was already processed is marked done with the existing metrics and artifacts
+#       right away, without a job.
+#   - Disk writes, validation and the metadata insert run in the I/O worker pool (`services/executor.py`).
+#   - Storing and registering are timed as the `store` and `register` spans, and the uploaded bytes are counted
+#     (`core/instrumentation.py`).
 #   - Returns a response containing the file ID, filename, and upload timestamp.
 #   - Handles errors such as invalid content, file saving issues, or unexpected exceptions.
 #
+# - **POST `/upload/batch`**:
+#   - Accepts several files (`files`) in one multipart request; zip archives are expanded and each flight file
+#     inside them is ingested (at most `settings.UPLOAD_BATCH_MAX_FILES` flight files per request).
+#   - Files are validated, hashed and stored concurrently (`settings.UPLOAD_BATCH_WORKERS` at a time) with the same
+#     streaming pass as single uploads.
+#   - The metadata and processing jobs of all valid files are committed in one transaction.
+#   - Returns the result per file (file ID, or the validation error) in request order, so one invalid file does not
+#     fail the whole batch.
+#
 # 2. **List Files Endpoint**:
 # - **GET `/`**:
-#   - Reads the `file_mapping.json` to retrieve metadata of all uploaded files.
+#   - Queries the metadata store for all uploaded files (indexed by timestamp) in the I/O worker pool.
 #   - Filters out files that are missing or empty.
-#   - Returns a sorted list (most recent first) of uploaded files, including their IDs, filenames, timestamps, and statuses.
-#   - Handles errors such as file mapping issues or unexpected exceptions.
+#   - Returns a list (most recent first) of uploaded files, including their IDs, filenames, timestamps, statuses and
+#     the flight metrics (`flightMetrics`/`summary`) stored at ingest (`null` until the file is processed), so
+#     listings never load flight data.
+#   - With `bbox=min_lon,min_lat,max_lon,max_lat`, returns only files whose GPS track passes through the box, answered
+#     by the spatial index of track segments (`services/spatial_index.py`) without reading flight data.
+#   - With `near=lat,lon` and `radius` (meters), returns only files whose track passes within the radius, closest
+#     first, each with its `closestApproach` (distance, time and position of the closest point).
+#   - Sends an `ETag` derived from the metadata store's revision (which changes with every upload, status change,
+#   delete and track index update) and the query, with `Cache-Control: private, no-cache`; a matching
+#   `If-None-Match` gets `304 Not Modified` without listing or checking any file, and a listing that was compressed
+#   before is served from the cached compressed variants (`core/compression.py`).
+#   - Raises HTTP 400 for malformed coordinates.
+#   - Handles errors such as metadata store issues or unexpected exceptions.
 #
 # 3. **File Info Endpoint**:
 # - **GET `/{file_id}`**:
 #   - Retrieves metadata for a specific file based on its ID.
 #   - Verifies the file's existence and integrity.
-#   - Returns file details, including ID, filename, timestamp, and processing status.
+#   - Returns file details, including ID, filename, timestamp, processing status and flight metrics.
 #   - Handles cases where the file is not found or unexpected exceptions occur.
 #
-# 4. **Utility Functions**:
-# - `get_file_mapping()`:
-#   - Reads the `file_mapping.json` to retrieve the current file mapping.
-#   - Creates an empty mapping if the file does not exist.
+# 4. **File Status Endpoint**:
+# - **GET `/{file_id}/status`**:
+#   - Returns the processing status of a file (`pending`, `running`, `done` or `failed`), the number of attempts
+#     of its processing job and the error of the last failed attempt.
+#
+# 5. **File Delete Endpoint**:
+# - **DELETE `/{file_id}`**:
+#   - Removes the metadata record atomically and drops the file from the flight cache.
+#   - The stored content and its derived data are deleted once no other file record refers to them (reference
+#     counting in `blob_store.release`).
 #
-# - `save_file_mapping(mapping)`:
-#   - Writes the updated file mapping back to `file_mapping.json`.
+# File metadata lives in the metadata store (`app/db/metadata_store.py`), which replaces the former `file_mapping.json`.
 #
 # These endpoints enable file upload, tracking, and retrieval functionality, ensuring efficient and reliable handling of drone data files (CSV/JSON).
+import asyncio
 import os
 import uuid
-import json
 import shutil
 import logging
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import List
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
+from ....core.compression import cached_variant
 from ....core.config import settings
-from ....services.data_processing import process_file
-from ....utils.file_validator import validate_file_content
+from ....core.instrumentation import count_processed, span
+from ....db.metadata_store import get_metadata_store
+from ....services.flight_cache import flight_cache
+from ....services.executor import PoolSaturated, io_pool
+from ....services.blob_store import blob_store
+from ....services.http_cache import (
+    cache_headers,
+    entity_tag,
+    is_not_modified,
+    not_modified,
+)
+from ....services.job_queue import job_queue
+from ....services.spatial_index import find_near
+from ....utils.file_handlers import (
+    archive_members,
+    is_archive,
+    open_archive,
+    save_archive_member,
+    save_upload_file,
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -57,96 +107,47 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_file_mapping():
-    """Get or create the file ID mapping."""
-    mapping_file = settings.UPLOAD_DIR / "file_mapping.json"
-    if mapping_file.exists():
-        with open(mapping_file, "r") as f:
-            return json.load(f)
-    return {}
-
-
-def save_file_mapping(mapping):
-    """Save the file ID mapping."""
-    mapping_file = settings.UPLOAD_DIR / "file_mapping.json"
-    with open(mapping_file, "w") as f:
-        json.dump(mapping, f, indent=2)
-
-
 @router.post("/upload")
-async def upload_file(
-    background_tasks: BackgroundTasks, file: UploadFile = File(...)
-) -> JSONResponse:
+async def upload_file(file: UploadFile = File(...)) -> JSONResponse:
     """Upload a drone data file (CSV or JSON)."""
     try:
         # Log file details
         logger.debug(f"Received file: {file.filename}")
         logger.debug(f"Content type: {file.content_type}")
 
-        # Validate file content
-        is_valid, error_message = await validate_file_content(file)
-        if not is_valid:
-            raise HTTPException(status_code=400, detail=error_message)
+        # Validate, hash and store the file in a single streaming pass
+        with span("store"):
+            file_path, saved_size, content_hash = await save_upload_file(file)
+        logger.debug(f"Saved file to: {file_path} ({saved_size} bytes)")
+        count_processed("upload", nbytes=saved_size)
 
-        # Generate IDs and paths
         file_id = str(uuid.uuid4())
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         original_filename = file.filename
-        save_filename = f"{timestamp}_{original_filename}"
-        file_path = settings.UPLOAD_DIR / save_filename
-
-        # Ensure upload directory exists
-        settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-        logger.debug(f"Saving file to: {file_path}")
-
-        # Save file using chunks
-        with open(file_path, "wb") as buffer:
-            while True:
-                chunk = await file.read(8192)  # 8KB chunks
-                if not chunk:
-                    break
-                buffer.write(chunk)
-
-        # Verify the saved file
-        if not file_path.exists():
-            logger.error(f"File not found after saving: {file_path}")
-            raise HTTPException(status_code=500, detail="Failed to save file")
-
-        saved_size = file_path.stat().st_size
-        logger.debug(f"Saved file size: {saved_size} bytes")
-
-        if saved_size == 0:
-            logger.error("Saved file is empty")
-            file_path.unlink()  # Delete empty file
-            raise HTTPException(status_code=500, detail="Failed to save file content")
-
-        # Update file mapping
-        mapping = get_file_mapping()
-        mapping[file_id] = {
+
+        # Register file metadata together with its processing job
+        record = {
             "filename": original_filename,
             "timestamp": datetime.now().isoformat(),
             "path": str(file_path),
             "id": file_id,
             "status": "pending",
             "size": saved_size,
+            "hash": content_hash,
         }
-        save_file_mapping(mapping)
-
-        # Start background processing
-        background_tasks.add_task(process_file, file_id, str(file_path))
+        with span("register"):
+            await register_uploads([record])
 
         return JSONResponse(
             status_code=200,
             content={
                 "id": file_id,
                 "filename": original_filename,
-                "timestamp": mapping[file_id]["timestamp"],
+                "timestamp": record["timestamp"],
                 "status": "success",
             },
         )
 
-    except HTTPException:
+    except (HTTPException, PoolSaturated):
         raise
     except Exception as e:
         logger.error(f"Upload error: {str(e)}", exc_info=True)
@@ -156,28 +157,197 @@ async def upload_file(
         )
 
 
+async def register_uploads(records: List[dict]) -> None:
+    """Insert stored uploads with their processing jobs; their blobs are released again if that fails."""
+    try:
+        await job_queue.submit(records)
+    except Exception:
+        for record in records:
+            blob_store.unpin(Path(record["path"]))
+            await io_pool.run(blob_store.release, Path(record["path"]))
+        raise
+    for record in records:
+        blob_store.unpin(Path(record["path"]))
+
+
+@router.post("/upload/batch")
+async def upload_files(files: List[UploadFile] = File(...)) -> JSONResponse:
+    """Upload several drone data files (CSV, JSON or zip archives of them)."""
+    archives = []
+    try:
+        # Expand archives into their flight files, keeping the request order
+        items = []
+        for file in files:
+            if not is_archive(file.filename):
+                items.append((file.filename, None, partial(save_upload_file, file)))
+                continue
+            try:
+                archive = await io_pool.run(open_archive, file)
+            except HTTPException as e:
+                items.append((file.filename, None, e))
+                continue
+            archives.append(archive)
+            for info in archive_members(archive):
+                items.append(
+                    (
+                        info.filename,
+                        file.filename,
+                        partial(save_archive_member, archive, info),
+                    )
+                )
+
+        if len(items) > settings.UPLOAD_BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many files, at most {settings.UPLOAD_BATCH_MAX_FILES} are allowed per batch",
+            )
+
+        # Validate and store the files concurrently
+        slots = asyncio.Semaphore(max(1, settings.UPLOAD_BATCH_WORKERS))
+
+        async def store(filename: str, archive_name: Optional[str], save) -> dict:
+            result = {"filename": Path(filename).name, "archive": archive_name}
+            if isinstance(save, HTTPException):
+                return {**result, "status": "error", "error": save.detail}
+            async with slots:
+                try:
+                    with span("store"):
+                        file_path, saved_size, content_hash = await save()
+                except HTTPException as e:
+                    return {**result, "status": "error", "error": e.detail}
+                except Exception as e:
+                    logger.error(f"Error storing {filename}: {e}", exc_info=True)
+                    return {**result, "status": "error", "error": str(e)}
+            count_processed("upload", nbytes=saved_size)
+            record = {
+                "filename": result["filename"],
+                "timestamp": datetime.now().isoformat(),
+                "path": str(file_path),
+                "id": str(uuid.uuid4()),
+                "status": "pending",
+                "size": saved_size,
+                "hash": content_hash,
+            }
+            return {
+                **result,
+                "id": record["id"],
+                "timestamp": record["timestamp"],
+                "status": "success",
+                "record": record,
+            }
+
+        results = await asyncio.gather(*(store(*item) for item in items))
+
+        # Register all stored files in one transaction
+        records = [r.pop("record") for r in results if r["status"] == "success"]
+        if records:
+            with span("register"):
+                await register_uploads(records)
+
+        logger.info(
+            f"Batch upload: {len(records)} files stored, {len(results) - len(records)} failed"
+        )
+        return JSONResponse(
+            status_code=200,
+            content={
+                "files": results,
+                "uploaded": len(records),
+                "failed": len(results) - len(records),
+            },
+        )
+
+    except (HTTPException, PoolSaturated):
+        raise
+    except Exception as e:
+        logger.error(f"Batch upload error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while uploading the files: {str(e)}",
+        )
+    finally:
+        for archive in archives:
+            await io_pool.run(archive.close)
+
+
+def list_existing_files(records: Optional[List[dict]] = None) -> List[dict]:
+    """List the records of all files (or of the given records) that exist and are not empty."""
+    files = []
+
+    # Records come back ordered by timestamp, most recent first
+    if records is None:
+        records = get_metadata_store().list()
+    for file_info in records:
+        file_path = Path(file_info["path"])
+        if file_path.exists() and file_path.stat().st_size > 0:
+            entry = {
+                "id": file_info["id"],
+                "filename": file_info["filename"],
+                "timestamp": file_info["timestamp"],
+                "status": file_info["status"],
+                "metrics": file_info["metrics"],
+            }
+            if "closestApproach" in file_info:
+                entry["closestApproach"] = file_info["closestApproach"]
+            files.append(entry)
+
+    return files
+
+
+def parse_coordinates(value: str, count: int, name: str) -> List[float]:
+    """Parse a comma-separated list of coordinates."""
+    try:
+        coordinates = [float(v) for v in value.split(",")]
+    except ValueError:
+        coordinates = []
+    if len(coordinates) != count:
+        raise HTTPException(
+            status_code=400, detail=f"{name} must be {count} comma-separated numbers"
+        )
+    return coordinates
+
+
 @router.get("/")
-async def list_files() -> List[dict]:
-    """List all uploaded files."""
+async def list_files(
+    request: Request,
+    response: Response,
+    bbox: Optional[str] = Query(None),
+    near: Optional[str] = Query(None),
+    radius: float = Query(500.0, gt=0),
+) -> List[dict]:
+    """List all uploaded files, optionally only those whose track passes through an area."""
     try:
-        mapping = get_file_mapping()
-        files = []
-
-        for file_id, file_info in mapping.items():
-            file_path = Path(file_info["path"])
-            if file_path.exists() and file_path.stat().st_size > 0:
-                files.append(
-                    {
-                        "id": file_id,
-                        "filename": file_info["filename"],
-                        "timestamp": file_info["timestamp"],
-                        "status": file_info.get("status", "success"),
-                    }
+        # The listing only changes with the metadata store's revision
+        revision = await io_pool.run(get_metadata_store().revision)
+        etag = entity_tag(revision, *sorted(request.query_params.multi_items()))
+        headers = cache_headers(etag)
+        if is_not_modified(request, etag):
+            return not_modified(headers)
+        cached = cached_variant(request, etag, headers)
+        if cached is not None:
+            return cached
+        response.headers.update(headers)
+
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = parse_coordinates(bbox, 4, "bbox")
+            if min_lon > max_lon or min_lat > max_lat:
+                raise HTTPException(
+                    status_code=400,
+                    detail="bbox must be min_lon,min_lat,max_lon,max_lat",
                 )
+            records = await io_pool.run(
+                get_metadata_store().find_in_area, min_lat, max_lat, min_lon, max_lon
+            )
+            return await io_pool.run(list_existing_files, records)
 
-        files.sort(key=lambda x: x["timestamp"], reverse=True)
-        return files
+        if near is not None:
+            lat, lon = parse_coordinates(near, 2, "near")
+            records = await find_near(lat, lon, radius)
+            return await io_pool.run(list_existing_files, records)
 
+        return await io_pool.run(list_existing_files)
+
+    except (HTTPException, PoolSaturated):
+        raise
     except Exception as e:
         logger.error(f"Error listing files: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -189,24 +359,24 @@ async def list_files() -> List[dict]:
 async def get_file_info(file_id: str):
     """Get information about a specific file."""
     try:
-        mapping = get_file_mapping()
-        if file_id not in mapping:
+        file_info = await io_pool.run(get_metadata_store().get, file_id)
+        if file_info is None:
             raise HTTPException(status_code=404, detail="File not found")
 
-        file_info = mapping[file_id]
         file_path = Path(file_info["path"])
 
-        if not file_path.exists():
+        if not await io_pool.run(file_path.exists):
             raise HTTPException(status_code=404, detail="File not found")
 
         return {
             "id": file_id,
             "filename": file_info["filename"],
             "timestamp": file_info["timestamp"],
-            "status": file_info.get("status", "success"),
+            "status": file_info["status"],
+            "metrics": file_info["metrics"],
         }
 
-    except HTTPException:
+    except (HTTPException, PoolSaturated):
         raise
     except Exception as e:
         logger.error(f"Error getting file info: {str(e)}", exc_info=True)
@@ -216,43 +386,50 @@ async def get_file_info(file_id: str):
         )
 
 
+@router.get("/{file_id}/status")
+async def get_file_status(file_id: str):
+    """Get the processing status of a file."""
+    try:
+        store = get_metadata_store()
+        file_info = await io_pool.run(store.get, file_id)
+        if file_info is None:
+            raise HTTPException(status_code=404, detail="File not found")
+
+        job = await io_pool.run(store.get_job, file_id)
+        return {
+            "id": file_id,
+            "status": file_info["status"],
+            "attempts": job["attempts"] if job else 0,
+            "maxAttempts": job["max_attempts"] if job else 0,
+            "error": file_info["error"],
+            "updatedAt": job["updated_at"] if job else file_info["timestamp"],
+        }
+
+    except (HTTPException, PoolSaturated):
+        raise
+    except Exception as e:
+        logger.error(f"Error getting file status: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while getting file status: {str(e)}",
+        )
+
+
 @router.delete("/{file_id}")
 async def delete_file(file_id: str):
     """Delete a file and all its associated data."""
     logger.info(f"Deleting file with ID: {file_id}")
     try:
-        mapping = get_file_mapping()
-        if file_id not in mapping:
-            logger.warning(f"File ID not found in mapping: {file_id}")
+        # Remove from the metadata store first so no new reads start on this file
+        file_info = await io_pool.run(get_metadata_store().delete, file_id)
+        if file_info is None:
+            logger.warning(f"File ID not found in metadata store: {file_id}")
             raise HTTPException(status_code=404, detail="File not found")
 
-        file_info = mapping[file_id]
-        file_path = Path(file_info["path"])
-        base_path = file_path.parent
-        base_name = file_path.stem
-
-        # List of patterns to clean up
-        cleanup_patterns = [
-            file_path,  # Original file
-            base_path / f"{base_name}_processed.json",  # Processed data
-            base_path / f"{base_name}_analysis.json",  # Any analysis results
-            base_path / f"{base_name}_metrics.json",  # Any metrics data
-        ]
-
-        # Delete all related files
-        deleted_files = []
-        for path in cleanup_patterns:
-            try:
-                if path.exists():
-                    path.unlink()
-                    deleted_files.append(path.name)
-                    logger.debug(f"Deleted file: {path}")
-            except Exception as e:
-                logger.error(f"Error deleting file {path}: {e}")
+        flight_cache.invalidate(file_id)
 
-        # Remove from mapping
-        del mapping[file_id]
-        save_file_mapping(mapping)
+        # Delete the stored file and its derived data unless other files share them
+        deleted_files = await io_pool.run(blob_store.release, Path(file_info["path"]))
 
         logger.info(
             f"Successfully deleted file {file_id} and {len(deleted_files)} related files"
@@ -263,7 +440,7 @@ async def delete_file(file_id: str):
             "deleted_files": deleted_files,
         }
 
-    except HTTPException:
+    except (HTTPException, PoolSaturated):
         raise
     except Exception as e:
         logger.error(f"Error during file deletion: {e}")
@@ -6,34 +6,37 @@
 # - **POST `/watch`**:
 #   - Accepts a `WatchPathRequest` with a directory path to monitor.
 #   - Validates that the provided directory exists.
-#   - Configures a `watchdog` observer to monitor the directory for file changes.
-#   - The observer listens for new files with `.csv` or `.json` extensions.
-#   - Stops any previously running observer before starting a new one.
+#   - Starts the folder watcher (`services/folder_watcher.py`) on the directory, replacing the previously watched one.
+#     New `.csv` and `.json` files are ingested through the upload pipeline (validation, storage, processing job)
+#     once they have finished writing; files already in the directory are picked up by an initial scan.
 #   - Returns a success response with the monitored path.
 #   - Raises HTTP 400 if the directory does not exist and HTTP 500 for other errors.
 #
-# - **POST `/scan`**:
-#   - Placeholder for directory scanning logic to identify and return a list of new files.
-#   - Returns an empty list for now and raises HTTP 500 in case of errors.
+# - **GET `/watch`**:
+#   - Returns the watched directory and the number of files that are settling or being ingested.
 #
-# 2. File Event Handling:
-# - `FileEventHandler` class:
-#   - Subclass of `FileSystemEventHandler` to handle filesystem events.
-#   - Implements the `on_created` method to detect new files.
-#   - Checks the file extension of newly created files (`.csv` or `.json`) and handles them as needed (logic to be implemented).
+# - **DELETE `/watch`**:
+#   - Stops watching the current directory.
 #
-# 3. Observer Management:
-# - An instance of `watchdog.observers.Observer` is created to monitor filesystem events.
-# - The observer is managed in the `/watch` endpoint:
-#   - Stops any previously active observer to avoid conflicts.
-#   - Schedules the `FileEventHandler` for the specified directory.
+# - **POST `/scan`**:
+#   - Incrementally scans the directory given in the request body (or the watched directory): only files whose
+#     size or modification time changed since they were last seen are ingested, concurrently with a bounded number
+#     of workers. Files with the content of an already ingested file are reported as duplicates.
+#   - Returns the number of scanned and skipped files and the outcome per ingested file
+#     (`ingested`, `duplicate` or `invalid`, with the file ID or the validation error; `deferred` when the worker
+#     pools are saturated, in which case the file is ingested later).
+#   - Raises HTTP 400 if there is no directory to scan and HTTP 500 in case of other errors.
 #
-# This module enables directory monitoring and provides a foundation for processing uploaded files in real-time.
+# This module enables directory monitoring so drone logs dropped into a shared folder are ingested automatically.
+import logging
+from pathlib import Path
+from typing import Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-import os
+from ....services.executor import PoolSaturated
+from ....services.folder_watcher import folder_watcher
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -42,45 +45,54 @@ class WatchPathRequest(BaseModel):
     path: str
 
 
-class FileEventHandler(FileSystemEventHandler):
-    def on_created(self, event):
-        if not event.is_directory:
-            # Handle new file
-            if event.src_path.endswith((".csv", ".json")):
-                # Process the file
-                pass
-
-
-observer = Observer()
-event_handler = FileEventHandler()
+class ScanRequest(BaseModel):
+    path: Optional[str] = None
 
 
 @router.post("/watch")
 async def set_watch_path(request: WatchPathRequest):
+    """Start watching a directory for new flight files."""
     try:
-        path = request.path
-        if not os.path.exists(path):
+        path = Path(request.path)
+        if not path.is_dir():
             raise HTTPException(status_code=400, detail="Directory does not exist")
 
-        # Stop any existing observer
-        if observer.is_alive():
-            observer.stop()
-            observer.join()
-
-        # Start watching new path
-        observer.schedule(event_handler, path, recursive=False)
-        observer.start()
-
-        return {"success": True, "path": path}
+        watched = await folder_watcher.watch(path)
+        return {"success": True, "path": str(watched)}
+    except (HTTPException, PoolSaturated):
+        raise
     except Exception as e:
+        logger.error(f"Error watching directory: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/watch")
+async def get_watch_status():
+    """Get the watched directory and ingestion progress."""
+    return folder_watcher.stats()
+
+
+@router.delete("/watch")
+async def stop_watching():
+    """Stop watching the current directory."""
+    folder_watcher.stop()
+    return {"success": True}
+
+
 @router.post("/scan")
-async def scan_directory():
+async def scan_directory(request: Optional[ScanRequest] = None):
+    """Ingest new and changed files of a directory."""
     try:
-        # Implement directory scanning logic
-        # Return list of new files found
-        return {"success": True, "files": []}
+        path = request.path if request is not None else None
+        if path is None and folder_watcher.path is None:
+            raise HTTPException(status_code=400, detail="No directory to scan")
+        if path is not None and not Path(path).is_dir():
+            raise HTTPException(status_code=400, detail="Directory does not exist")
+
+        result = await folder_watcher.scan(path)
+        return {"success": True, **result}
+    except (HTTPException, PoolSaturated):
+        raise
     except Exception as e:
+        logger.error(f"Error scanning directory: {e}")
         raise HTTPException(status_code=500, detail=str(e))
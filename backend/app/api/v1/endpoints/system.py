@@ -0,0 +1,123 @@
+# backend/app/api/v1/endpoints/system.py
+# This file implements FastAPI endpoints that report the internal state of the backend.
+# The following functionalities are provided:
+#
+# 1. **Flight Cache Statistics**:
+# - **GET `/cache`**:
+#   - Returns the hit/miss/eviction counters and the current size of the parsed-flight cache.
+#
+# 2. **Compression Statistics**:
+# - **GET `/compression`**:
+#   - Returns the available content encodings (in order of preference) and the counters and size of the cache of
+#     pre-compressed response variants.
+#
+# 3. **Executor Statistics**:
+# - **GET `/executor`**:
+#   - Returns, per worker pool (`io` threads, `cpu` processes), the running and queued tasks, callers waiting
+#     for a queue slot, completed/failed/rejected counters and queue wait and run time percentiles.
+#
+# 4. **Job Queue Statistics**:
+# - **GET `/jobs`**:
+#   - Returns the number of processing jobs per status (`pending`, `running`, `done`, `failed`) and the number of
+#     job workers.
+#
+# 5. **Sampling Profiler**:
+# - **GET `/profiler`**: Returns the profiler settings and the kept slow-request profiles (without stacks).
+# - **PUT `/profiler`**: Enables or disables the profiler and sets its latency threshold at runtime (`enabled`,
+#   `threshold` query parameters), so hot spots can be diagnosed without a redeploy.
+# - **GET `/profiler/{profile_id}`**: Returns a profile as collapsed stacks (`format=collapsed`, for flame graph
+#   tools) or as a pstats-like table of the functions with the most samples (`format=top`).
+# - **DELETE `/profiler`**: Drops the kept profiles.
+# - `PUT` and `DELETE` change the state of the server and are not authenticated: they raise HTTP 403 unless
+#   `settings.PROFILER_RUNTIME_CONTROL` is set.
+#
+# The other endpoints are read-only and intended for monitoring and tuning the backend.
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from ....core.compression import available_encodings, variant_cache
+from ....core.config import settings
+from ....core.profiler import collapsed, sampling_profiler, top
+from ....services.executor import executor_stats, io_pool
+from ....services.flight_cache import flight_cache
+from ....services.job_queue import job_queue
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def require_profiler_control() -> None:
+    """Reject runtime changes of the profiler unless they are enabled in the settings."""
+    if not settings.PROFILER_RUNTIME_CONTROL:
+        raise HTTPException(
+            status_code=403,
+            detail="Runtime profiler control is disabled (PROFILER_RUNTIME_CONTROL)",
+        )
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Get statistics of the parsed-flight cache."""
+    return flight_cache.stats()
+
+
+@router.get("/compression")
+async def get_compression_stats():
+    """Get the available encodings and statistics of the compressed-variant cache."""
+    return {"encodings": available_encodings(), "variants": variant_cache.stats()}
+
+
+@router.get("/executor")
+async def get_executor_stats():
+    """Get queue depth and task latency of the worker pools."""
+    return executor_stats()
+
+
+@router.get("/jobs")
+async def get_job_stats():
+    """Get the number of processing jobs per status."""
+    return await io_pool.run(job_queue.stats)
+
+
+@router.get("/profiler")
+async def get_profiler():
+    """Get the profiler settings and the kept slow-request profiles."""
+    return sampling_profiler.stats()
+
+
+@router.put("/profiler", dependencies=[Depends(require_profiler_control)])
+async def configure_profiler(
+    enabled: Optional[bool] = Query(None),
+    threshold: Optional[float] = Query(None, ge=0),
+):
+    """Enable or disable the profiler and set its latency threshold."""
+    sampling_profiler.configure(enabled=enabled, threshold=threshold)
+    logger.info(
+        f"Profiler {'enabled' if sampling_profiler.enabled else 'disabled'} "
+        f"(threshold {sampling_profiler.threshold}s)"
+    )
+    return sampling_profiler.stats()
+
+
+@router.delete("/profiler", dependencies=[Depends(require_profiler_control)])
+async def clear_profiles():
+    """Drop the kept profiles."""
+    sampling_profiler.clear()
+    return {"success": True}
+
+
+@router.get("/profiler/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(
+    profile_id: int,
+    format: str = Query("collapsed", regex="^(collapsed|top)$"),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Get a kept profile as collapsed stacks or as a table of the hottest functions."""
+    profile = sampling_profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "top":
+        return PlainTextResponse(top(profile, limit))
+    return PlainTextResponse(collapsed(profile))
@@ -0,0 +1,294 @@
+# backend/app/core/compression.py
+# This file provides the response compression of the API.
+# The following functionalities are implemented:
+#
+# 1. Encodings:
+# - `gzip` is always available; `br` (Brotli, with the `brotli` package) and `zstd` (Zstandard, with the
+#   `zstandard` package) are used when they are installed.
+# - `negotiate_encoding(accept_encoding)` picks the encoding with the highest quality in the client's
+#   `Accept-Encoding` header; ties go to the order of `settings.COMPRESSION_ENCODINGS` (default: br, zstd, gzip).
+#   `parse_accept_encoding` reads the q-values (`gzip;q=0` refuses gzip) and treats `x-gzip` as `gzip`.
+# - The levels are configurable (`settings.COMPRESSION_GZIP_LEVEL`, `COMPRESSION_BROTLI_QUALITY`,
+#   `COMPRESSION_ZSTD_LEVEL`); the defaults favour speed, as flight JSON compresses 10-20x even at low levels.
+#
+# 2. Middleware:
+# - `CompressionMiddleware` (plain ASGI) compresses responses with a compressible media type (text, JSON and the
+#   columnar flight formats) of at least `settings.COMPRESSION_MIN_SIZE` bytes. Responses that already have a
+#   `Content-Encoding` or `Cache-Control: no-transform` pass through unchanged.
+# - Complete bodies are compressed in one piece; streamed bodies chunk by chunk with a streaming compressor.
+#   Bodies and chunks of at least `settings.COMPRESSION_OFFLOAD_SIZE` bytes are compressed in the I/O worker pool,
+#   off the event loop (on the event loop when the pool is saturated). Compression is timed as the `compress` span.
+# - A compressed response gets `Vary: Accept-Encoding`, and its `ETag` is made weak (`W/"..."`), as the encoded
+#   bytes are another representation; the conditional requests of `services/http_cache.py` compare tags weakly.
+#
+# 3. Pre-compressed Variants:
+# - Compressed bodies of responses with a strong `ETag` (derived from the stored content, see
+#   `services/http_cache.py`) are kept in `variant_cache`, an LRU cache keyed by entity tag and encoding and bounded
+#   by `settings.COMPRESSION_CACHE_MAX_BYTES` and `COMPRESSION_CACHE_MAX_ENTRIES`.
+# - `cached_variant(request, etag, headers)` returns the cached compressed response for a request, so the data
+#   endpoint serves a flight page it has compressed before without loading, serializing or compressing it again.
+import zlib
+from typing import Callable, Dict, List, Optional
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from .config import settings
+from .instrumentation import span
+from ..services.executor import PoolSaturated, io_pool
+from ..services.flight_cache import FlightCache
+
+try:
+    import brotli
+except ImportError:  # Optional encoding
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional encoding
+    zstandard = None
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.drone.columns",
+    "image/svg+xml",
+}
+
+# Legacy names of content codings (RFC 9110, section 8.4.1.3)
+CODING_ALIASES = {"x-gzip": "gzip"}
+
+
+class _BrotliCompressor:
+    """Brotli compressor with the interface of zlib's compression objects."""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _compressors() -> Dict[str, Callable]:
+    """Factories of streaming compressors, per available encoding."""
+    compressors = {
+        "gzip": lambda: zlib.compressobj(
+            settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+    }
+    if brotli is not None:
+        compressors["br"] = lambda: _BrotliCompressor(
+            settings.COMPRESSION_BROTLI_QUALITY
+        )
+    if zstandard is not None:
+        compressors["zstd"] = lambda: zstandard.ZstdCompressor(
+            level=settings.COMPRESSION_ZSTD_LEVEL
+        ).compressobj()
+    return compressors
+
+
+COMPRESSORS = _compressors()
+
+
+def available_encodings() -> List[str]:
+    """The available encodings, most preferred first."""
+    return [e for e in settings.COMPRESSION_ENCODINGS if e in COMPRESSORS]
+
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Quality per content coding of an Accept-Encoding header (`x-gzip` counts as `gzip`)."""
+    qualities = {}
+    for entry in (accept_encoding or "").split(","):
+        coding, *params = [part.strip().lower() for part in entry.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        coding = CODING_ALIASES.get(coding, coding)
+        qualities[coding] = max(quality, qualities.get(coding, 0.0))
+    return qualities
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Content encoding for a response, from the Accept-Encoding header (None: identity)."""
+    qualities = parse_accept_encoding(accept_encoding)
+
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete body."""
+    compressor = COMPRESSORS[encoding]()
+    return compressor.compress(data) + compressor.flush()
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Whether responses of a media type are worth compressing."""
+    if not content_type:
+        return False
+    media_type = content_type.split(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+def _mark_encoded(headers: MutableHeaders, encoding: str) -> None:
+    headers["Content-Encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+def _revalidated(message: Dict, request_headers: Headers) -> None:
+    """Give a 304 response the weak tag of the compressed representation the client revalidated."""
+    headers = MutableHeaders(scope=message)
+    etag = headers.get("etag")
+    if etag and f"W/{etag}" in request_headers.get("if-none-match", ""):
+        headers["ETag"] = f"W/{etag}"
+
+
+variant_cache = FlightCache(
+    settings.COMPRESSION_CACHE_MAX_BYTES, settings.COMPRESSION_CACHE_MAX_ENTRIES
+)
+
+
+def _variant_key(etag: str, encoding: str) -> str:
+    return f"{etag};{encoding}"
+
+
+def cached_variant(
+    request: Request, etag: str, headers: Dict[str, str]
+) -> Optional[Response]:
+    """The cached compressed response with a strong entity tag, if there is one for the request's encoding."""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is None or not settings.COMPRESSION_ENABLED:
+        return None
+    variant = variant_cache.get(_variant_key(etag, encoding), None)
+    if variant is None:
+        return None
+
+    media_type, body = variant
+    response = Response(content=body, media_type=media_type, headers=headers)
+    _mark_encoded(response.headers, encoding)
+    return response
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = settings.COMPRESSION_MIN_SIZE,
+        offload_size: int = settings.COMPRESSION_OFFLOAD_SIZE,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+
+    async def __call__(self, scope, receive, send):
+        encoding = None
+        if scope["type"] == "http" and settings.COMPRESSION_ENABLED:
+            request_headers = Headers(scope=scope)
+            encoding = negotiate_encoding(request_headers.get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                passthrough = (
+                    message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or "no-transform" in headers.get("cache-control", "")
+                    or not is_compressible(headers.get("content-type"))
+                    or int(headers.get("content-length", self.minimum_size))
+                    < self.minimum_size
+                )
+                if passthrough:
+                    if message["status"] == 304:
+                        _revalidated(message, request_headers)
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether the body is streamed
+                    start = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                if not more_body and len(body) < self.minimum_size:
+                    headers.add_vary_header("Accept-Encoding")
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                etag = headers.get("etag")
+                _mark_encoded(headers, encoding)
+                if not more_body:
+                    # A complete body: compress it at once and keep the variant if it is cacheable
+                    compressed = await self._compress(compress, body, encoding)
+                    headers["Content-Length"] = str(len(compressed))
+                    if start["status"] == 200 and etag and not etag.startswith("W/"):
+                        variant_cache.put(
+                            _variant_key(etag, encoding),
+                            None,
+                            (headers.get("content-type"), compressed),
+                            len(compressed),
+                        )
+                    await send(start)
+                    await send({**message, "body": compressed})
+                    return
+
+                del headers["Content-Length"]
+                compressor = COMPRESSORS[encoding]()
+                await send(start)
+                start = None
+
+            data = await self._compress(compressor.compress, body)
+            if not more_body:
+                data += compressor.flush()
+            if data or not more_body:
+                await send({**message, "body": data})
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _compress(self, func, body: bytes, *args) -> bytes:
+        """Run a compression step, in the I/O worker pool for large bodies."""
+        with span("compress"):
+            if len(body) >= self.offload_size:
+                try:
+                    return await io_pool.run(func, body, *args)
+                except PoolSaturated:
+                    # The response is already being sent: compress it here rather than fail it
+                    pass
+            return func(body, *args)
@@ -16,20 +16,82 @@
 #   - Includes typical development environments (e.g., `localhost:5173`, `localhost:3000`).
 #
 # 4. File Settings:
-# - `MAX_UPLOAD_SIZE`: The maximum allowed size for uploaded files (default: 10MB).
+# - `MAX_UPLOAD_SIZE`: The maximum allowed size for uploaded files (default: 4GB). Uploads are validated and saved in a
+#   streaming pass, so memory use does not grow with this limit.
 # - `ALLOWED_EXTENSIONS`: The set of allowed file extensions (default: `.csv` and `.json`).
+# - `ARCHIVE_EXTENSIONS`: Archives accepted by the batch upload, whose flight files are ingested (default: `.zip`).
+# - `UPLOAD_BATCH_WORKERS`: Files of a batch upload that are validated and stored concurrently (default: 4).
+# - `UPLOAD_BATCH_MAX_FILES`: Maximum number of flight files per batch upload, archive members included (default: 1000).
 #
-# 5. Configuration:
+# 5. Metadata Settings:
+# - `METADATA_BACKEND`: The metadata store backend (default: "sqlite").
+# - `METADATA_DB`: Optional path of the SQLite metadata database (default: `UPLOAD_DIR/metadata.db`).
+#
+# 6. Cache Settings:
+# - `FLIGHT_CACHE_MAX_BYTES`: Memory budget of the parsed-flight cache (default: 512MB).
+# - `FLIGHT_CACHE_MAX_ENTRIES`: Maximum number of cached flights (default: 32, 0 disables the cache).
+# - `HTTP_CACHE_MAX_AGE`: Seconds clients may reuse flight data and exports without revalidating them
+#   (`Cache-Control: private, max-age=N`; default: 0, i.e. `private, no-cache`: every reuse is revalidated with
+#   `If-None-Match`, which costs a metadata lookup and a 304 response).
+#
+# 7. Export Settings:
+# - `EXPORT_CHUNK_ROWS`: Number of rows formatted per chunk of a streamed export (default: 10000).
+#
+# 8. Executor Settings:
+# - `EXECUTOR_IO_WORKERS`: Threads for file I/O and work on memory-mapped columns (default: 8).
+# - `EXECUTOR_CPU_WORKERS`: Workers for parsing and metrics (default: half of the CPU cores, at least 1).
+# - `EXECUTOR_CPU_PROCESSES`: Run parsing and metrics in worker processes instead of threads (default: True).
+# - `EXECUTOR_QUEUE_SIZE`: Tasks that may queue per pool in addition to the running ones (default: 64).
+# - `EXECUTOR_QUEUE_TIMEOUT`: Seconds to wait for a queue slot before rejecting a request with 503 (default: 5).
+#
+# 9. Job Queue Settings:
+# - `JOB_WORKERS`: Files processed concurrently by the background job queue (default: `EXECUTOR_CPU_WORKERS`).
+# - `JOB_MAX_ATTEMPTS`: Attempts per processing job before the file is marked as failed (default: 3).
+# - `JOB_RETRY_DELAY`: Seconds before the first retry of a failed job, doubled for every further attempt (default: 2).
+# - `JOB_POLL_INTERVAL`: Seconds an idle worker waits before checking the queue again (default: 1).
+#
+# 10. Folder Watcher Settings:
+# - `FOLDER_SETTLE_SECONDS`: Seconds a watched file's size and modification time must stay unchanged before it is
+#   ingested, so files that are still being written are skipped (default: 2).
+# - `FOLDER_INGEST_WORKERS`: Files from watched folders that are validated and stored concurrently (default: 4).
+#
+# 11. Instrumentation Settings:
+# - `LOG_LEVEL`: Level of the application logs (default: "INFO").
+# - `SERVER_TIMING`: Add a `Server-Timing` header with the timed steps to every response (default: False). Latency
+#   histograms and processed bytes and rows are always collected and served at `GET /metrics`.
+# - `PROFILER_ENABLED`: Profile requests with the sampling profiler and keep the slow ones (default: False).
+# - `PROFILER_RUNTIME_CONTROL`: Allow switching the profiler and dropping its profiles at runtime through
+#   `PUT`/`DELETE /api/v1/system/profiler` (default: False; these endpoints are not authenticated, so only enable it
+#   where the API is not reachable by untrusted clients).
+# - `PROFILER_THRESHOLD`: Seconds a request must take for its profile to be kept (default: 1).
+# - `PROFILER_INTERVAL`: Seconds between two stack samples (default: 0.005).
+# - `PROFILER_MAX_PROFILES`: Profiles kept in the ring buffer (default: 20).
+#
+# 12. Compression Settings:
+# - `COMPRESSION_ENABLED`: Compress responses for clients that accept it (default: True).
+# - `COMPRESSION_ENCODINGS`: Content encodings in order of preference; `br` and `zstd` are only used when the `brotli`
+#   or `zstandard` package is installed (default: br, zstd, gzip).
+# - `COMPRESSION_MIN_SIZE`: Smallest response body that is compressed, in bytes (default: 1024).
+# - `COMPRESSION_GZIP_LEVEL`, `COMPRESSION_BROTLI_QUALITY`, `COMPRESSION_ZSTD_LEVEL`: Compression levels
+#   (defaults: 4, 4 and 3).
+# - `COMPRESSION_OFFLOAD_SIZE`: Bodies and streamed chunks of at least this many bytes are compressed in the I/O
+#   worker pool instead of on the event loop (default: 64KB).
+# - `COMPRESSION_CACHE_MAX_BYTES`: Memory budget of the cached compressed variants of content-addressed responses
+#   (default: 128MB).
+# - `COMPRESSION_CACHE_MAX_ENTRIES`: Maximum number of cached variants (default: 256, 0 disables the cache).
+#
+# 13. Configuration:
 # - The `Config` class sets `case_sensitive` to `True`, ensuring that environment variable names are case-sensitive.
 #
-# 6. Initialization:
+# 14. Initialization:
 # - Ensures that the `UPLOAD_DIR` exists. If it does not, the directory is created (including parent directories if needed).
-# - Creates a `file_mapping.json` file in the `UPLOAD_DIR` if it does not exist.
-#   - Initializes this file with an empty JSON object (`{}`).
+# - File metadata is kept by the metadata store (`app/db/metadata_store.py`), which imports a legacy
+#   `file_mapping.json` on first start.
 #
 # This configuration module provides centralized and environment-variable-friendly settings management for the application.
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Optional
 import os
 
 
@@ -49,8 +111,60 @@ class Settings(BaseSettings):
     ]
 
     # File Settings
-    MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_UPLOAD_SIZE: int = 4 * 1024 * 1024 * 1024  # 4GB
     ALLOWED_EXTENSIONS: set = {".csv", ".json"}
+    ARCHIVE_EXTENSIONS: set = {".zip"}
+    UPLOAD_BATCH_WORKERS: int = 4
+    UPLOAD_BATCH_MAX_FILES: int = 1000
+
+    # Metadata Settings
+    METADATA_BACKEND: str = "sqlite"
+    METADATA_DB: Optional[Path] = None
+
+    # Cache Settings
+    FLIGHT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB
+    FLIGHT_CACHE_MAX_ENTRIES: int = 32
+    HTTP_CACHE_MAX_AGE: int = 0
+
+    # Export Settings
+    EXPORT_CHUNK_ROWS: int = 10000
+
+    # Executor Settings
+    EXECUTOR_IO_WORKERS: int = 8
+    EXECUTOR_CPU_WORKERS: int = max(1, (os.cpu_count() or 2) // 2)
+    EXECUTOR_CPU_PROCESSES: bool = True
+    EXECUTOR_QUEUE_SIZE: int = 64
+    EXECUTOR_QUEUE_TIMEOUT: float = 5.0
+
+    # Job Queue Settings
+    JOB_WORKERS: int = max(1, (os.cpu_count() or 2) // 2)
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY: float = 2.0
+    JOB_POLL_INTERVAL: float = 1.0
+
+    # Folder Watcher Settings
+    FOLDER_SETTLE_SECONDS: float = 2.0
+    FOLDER_INGEST_WORKERS: int = 4
+
+    # Instrumentation Settings
+    LOG_LEVEL: str = "INFO"
+    SERVER_TIMING: bool = False
+    PROFILER_ENABLED: bool = False
+    PROFILER_RUNTIME_CONTROL: bool = False
+    PROFILER_THRESHOLD: float = 1.0
+    PROFILER_INTERVAL: float = 0.005
+    PROFILER_MAX_PROFILES: int = 20
+
+    # Compression Settings
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_ENCODINGS: list = ["br", "zstd", "gzip"]
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 4
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_OFFLOAD_SIZE: int = 64 * 1024  # 64KB
+    COMPRESSION_CACHE_MAX_BYTES: int = 128 * 1024 * 1024  # 128MB
+    COMPRESSION_CACHE_MAX_ENTRIES: int = 256
 
     class Config:
         case_sensitive = True
@@ -62,11 +176,3 @@ settings = Settings()
 # Ensure upload directory exists
 if not settings.UPLOAD_DIR.exists():
     settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-# Ensure file mapping exists
-mapping_file = settings.UPLOAD_DIR / "file_mapping.json"
-if not mapping_file.exists():
-    with open(mapping_file, "w") as f:
-        import json
-
-        json.dump({}, f)
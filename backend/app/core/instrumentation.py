@@ -0,0 +1,262 @@
+# backend/app/core/instrumentation.py
+# This file provides request instrumentation: latency histograms, processed bytes and rows, and Server-Timing.
+# The following functionalities are implemented:
+#
+# 1. Metrics:
+# - `Histogram` and `Counter` keep labelled samples in memory (thread-safe, so worker threads can record too) and
+#   render them in the Prometheus text exposition format (`render_metrics()`, served at `GET /metrics`).
+# - `drone_http_request_duration_seconds{method, route, status}`: latency of every request, labelled with the route
+#   template (e.g. `/api/v1/data/{file_id}`), so the number of series does not grow with the file IDs.
+# - `drone_span_duration_seconds{route, span}`: latency of the steps of a request (metadata lookup, file read,
+#   parse, metrics, serialization, ...), recorded with `span(name)`.
+# - `drone_processed_bytes_total{operation}` and `drone_processed_rows_total{operation}`: bytes and rows handled by
+#   uploads, data responses and exports (`count_processed`).
+#
+# 2. Spans:
+# - `with span("read"):` times a step. Inside a request, spans are collected for the request and recorded with its
+#   route when it completes; outside of requests (e.g. the job queue) they are recorded with the route `background`.
+# - `timed_stream(iterator, name, operation)` times a streamed response body and counts its bytes.
+#
+# 3. Middleware:
+# - `InstrumentationMiddleware` is a plain ASGI middleware (streamed responses pass through unchanged). It measures
+#   every HTTP request and, with `settings.SERVER_TIMING`, adds a `Server-Timing` header with the spans that finished
+#   before the response started (e.g. `lookup;dur=0.4, read;dur=2.1, serialize;dur=12.0, app;dur=15.3`).
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from .config import settings
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Spans of the current request: (name, seconds)
+_request_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "request_spans", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra=()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in pairs) + "}"
+
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}"
+                )
+        return lines
+
+
+class Histogram:
+    """Observations per label set, counted in cumulative buckets."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted((k, (list(c), s)) for k, (c, s) in self._series.items())
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.labelnames, labels, [('le', le)])} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {total:.6f}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+request_duration = Histogram(
+    "drone_http_request_duration_seconds",
+    "Latency of HTTP requests.",
+    ("method", "route", "status"),
+)
+span_duration = Histogram(
+    "drone_span_duration_seconds",
+    "Latency of the steps of a request.",
+    ("route", "span"),
+)
+processed_bytes = Counter(
+    "drone_processed_bytes_total",
+    "Bytes uploaded, served and exported.",
+    ("operation",),
+)
+processed_rows = Counter(
+    "drone_processed_rows_total",
+    "Flight rows served and exported.",
+    ("operation",),
+)
+
+REGISTRY = (request_duration, span_duration, processed_bytes, processed_rows)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a step of the current request (or of background work)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def record_span(name: str, seconds: float) -> None:
+    spans = _request_spans.get()
+    if spans is None:
+        span_duration.observe(("background", name), seconds)
+    else:
+        spans.append((name, seconds))
+
+
+def count_processed(
+    operation: str, nbytes: Optional[int] = None, rows: Optional[int] = None
+) -> None:
+    """Count the bytes and rows handled by an operation."""
+    if nbytes is not None:
+        processed_bytes.inc((operation,), nbytes)
+    if rows is not None:
+        processed_rows.inc((operation,), rows)
+
+
+async def timed_stream(chunks, name: str, operation: str):
+    """Pass a streamed body through, timing it as a span and counting its bytes."""
+    start = time.perf_counter()
+    nbytes = 0
+    try:
+        async for chunk in chunks:
+            nbytes += len(chunk)
+            yield chunk
+    finally:
+        record_span(name, time.perf_counter() - start)
+        count_processed(operation, nbytes=nbytes)
+
+
+def _server_timing(spans: List[Tuple[str, float]], total: float) -> bytes:
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in spans]
+    entries.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(entries).encode("latin-1")
+
+
+class InstrumentationMiddleware:
+    """Measure HTTP requests and their spans; optionally report them in a Server-Timing header."""
+
+    def __init__(self, app, server_timing: bool = settings.SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: List[Tuple[str, float]] = []
+        token = _request_spans.set(spans)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append(
+                        (
+                            b"server-timing",
+                            _server_timing(spans, time.perf_counter() - start),
+                        )
+                    )
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_spans.reset(token)
+            # The route template is known once the router has matched the request
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            request_duration.observe(
+                (scope["method"], route_path, str(status)),
+                time.perf_counter() - start,
+            )
+            for name, seconds in spans:
+                span_duration.observe((route_path, name), seconds)
@@ -0,0 +1,247 @@
+# backend/app/core/profiler.py
+# This file provides an opt-in sampling profiler that keeps the profiles of slow requests.
+# The following functionalities are implemented:
+#
+# 1. Sampling:
+# - While at least one request is profiled, a background thread samples the Python stacks of all threads of the
+#   server (`sys._current_frames()`) every `settings.PROFILER_INTERVAL` seconds: the event loop and the I/O worker
+#   threads, where the request handlers and the work they dispatch run. Idle threads (waiting on a lock or in the
+#   event loop's `select`) are skipped. Work in CPU worker processes is not sampled; with
+#   `EXECUTOR_CPU_PROCESSES=false` it runs on threads and shows up as well.
+# - Every sample is added to all requests in flight, so concurrent requests share samples. The sampler sleeps while
+#   no request is profiled.
+#
+# 2. Slow Request Profiles:
+# - `ProfilerMiddleware` (plain ASGI) profiles every request while the profiler is enabled
+#   (`settings.PROFILER_ENABLED`, or at runtime through `PUT /api/v1/system/profiler`) and keeps the profile only if
+#   the request took at least `threshold` seconds (`settings.PROFILER_THRESHOLD`).
+# - The last `settings.PROFILER_MAX_PROFILES` profiles are kept in a ring buffer; older ones are dropped.
+#
+# 3. Output:
+# - `collapsed(profile)`: one `thread;frame;frame... count` line per stack, the input format of flame graph tools
+#   (e.g. `flamegraph.pl`, speedscope).
+# - `top(profile, limit)`: a pstats-like table of the functions with the most samples, by own (self) and
+#   cumulative samples.
+import itertools
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import PurePath
+from typing import Dict, List, Optional
+from .config import settings
+
+# Top frames of threads that are waiting rather than working
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    # A thread pool worker blocked on its (C-level) work queue
+    ("thread.py", "_worker"),
+}
+
+
+def _label(code) -> str:
+    path = PurePath(code.co_filename)
+    return f"{code.co_name} ({'/'.join(path.parts[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads while requests are profiled and keeps the slow ones."""
+
+    def __init__(
+        self, enabled: bool, threshold: float, interval: float, max_profiles: int
+    ):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.interval = interval
+        self._profiles: deque = deque(maxlen=max(1, max_profiles))
+        self._active: Dict[int, Counter] = {}
+        self._ids = itertools.count(1)
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(
+        self, enabled: Optional[bool] = None, threshold: Optional[float] = None
+    ) -> None:
+        if enabled is not None:
+            self.enabled = enabled
+        if threshold is not None:
+            self.threshold = threshold
+
+    def start(self) -> int:
+        """Start sampling for a request. Returns its token."""
+        with self._lock:
+            token = next(self._ids)
+            self._active[token] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="profiler", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+        return token
+
+    def finish(self, token: int, duration: float, request: Dict) -> None:
+        """Stop sampling for a request; its profile is kept if it was slow."""
+        with self._lock:
+            stacks = self._active.pop(token)
+            if duration < self.threshold or not stacks:
+                return
+            self._profiles.append(
+                {
+                    "id": token,
+                    "timestamp": datetime.now().isoformat(),
+                    "duration": round(duration, 4),
+                    "samples": sum(stacks.values()),
+                    "interval": self.interval,
+                    **request,
+                    "stacks": stacks,
+                }
+            )
+
+    def profiles(self) -> List[Dict]:
+        """The kept profiles without their stacks, most recent first."""
+        with self._lock:
+            return [
+                {k: v for k, v in p.items() if k != "stacks"}
+                for p in reversed(self._profiles)
+            ]
+
+    def get(self, profile_id: int) -> Optional[Dict]:
+        with self._lock:
+            return next((p for p in self._profiles if p["id"] == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "interval": self.interval,
+            "maxProfiles": self._profiles.maxlen,
+            "profiles": self.profiles(),
+        }
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wakeup.clear()
+            if idle:
+                self._wakeup.wait()
+                continue
+
+            stacks = self._sample()
+            with self._lock:
+                for samples in self._active.values():
+                    samples.update(stacks)
+            time.sleep(self.interval)
+
+    def _sample(self) -> List[str]:
+        """Collapsed stacks of all working threads except the sampler."""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        own = threading.get_ident()
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            code = frame.f_code
+            if (
+                ident == own
+                or (PurePath(code.co_filename).name, code.co_name) in IDLE_FRAMES
+            ):
+                continue
+            labels = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _label(code)
+                labels.append(label)
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            stacks.append(";".join(reversed(labels)))
+        return stacks
+
+
+def collapsed(profile: Dict) -> str:
+    """The stacks of a profile in the collapsed-stack format."""
+    return "".join(
+        f"{stack} {count}\n" for stack, count in profile["stacks"].most_common()
+    )
+
+
+def top(profile: Dict, limit: int = 50) -> str:
+    """A pstats-like table of the functions with the most samples."""
+    own, cumulative = Counter(), Counter()
+    for stack, count in profile["stacks"].items():
+        frames = stack.split(";")[1:]
+        own[frames[-1]] += count
+        for frame in set(frames):
+            cumulative[frame] += count
+
+    total = profile["samples"] or 1
+    lines = [
+        f"# {profile['method']} {profile['path']} -> {profile['status']} in {profile['duration']:.3f}s, "
+        f"{profile['samples']} samples every {profile['interval'] * 1000:g}ms",
+        f"{'self%':>7} {'self':>7} {'cum%':>7} {'cum':>7}  function",
+    ]
+    for frame, count in sorted(
+        cumulative.items(), key=lambda item: (-own[item[0]], -item[1])
+    )[:limit]:
+        lines.append(
+            f"{own[frame] / total:>7.1%} {own[frame]:>7} "
+            f"{count / total:>7.1%} {count:>7}  {frame}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+class ProfilerMiddleware:
+    """Profile requests while the profiler is enabled and keep the slow ones."""
+
+    def __init__(self, app, profiler: Optional[SamplingProfiler] = None):
+        self.app = app
+        self.profiler = profiler or sampling_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = self.profiler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            query = scope.get("query_string", b"").decode("latin-1")
+            self.profiler.finish(
+                token,
+                time.perf_counter() - start,
+                {
+                    "method": scope["method"],
+                    "path": scope["path"] + (f"?{query}" if query else ""),
+                    "route": route,
+                    "status": status,
+                },
+            )
+
+
+sampling_profiler = SamplingProfiler(
+    enabled=settings.PROFILER_ENABLED,
+    threshold=settings.PROFILER_THRESHOLD,
+    interval=settings.PROFILER_INTERVAL,
+    max_profiles=settings.PROFILER_MAX_PROFILES,
+)
@@ -0,0 +1,772 @@
+# backend/app/db/metadata_store.py
+# This file provides the metadata store that tracks uploaded files (ID, name, path, timestamp, status, size,
+# content hash, flight metrics) and their processing jobs.
+# The following functionalities are implemented:
+#
+# 1. Store Interface:
+# - `MetadataStore` defines the operations the API relies on: `get`, `list`, `insert`, `insert_many`,
+#   `update` and `delete`, plus the job queue operations `claim_job`, `complete_job`, `fail_job`, `release_job`,
+#   `recover_jobs`, `get_job` and `job_counts`, and the watched-folder operations `list_folder_files`,
+#   `record_folder_file`, the content-addressing operations `find_by_hash` and `count_references`,
+#   `flight_summaries` for fleet analytics and the spatial index operations `index_track`, `remove_track`,
+#   `find_in_area` and `unindexed_paths`, and `revision` for HTTP caching of the file list.
+# - Backends are registered in `_BACKENDS` and selected with `settings.METADATA_BACKEND`, so an
+#   alternative database can be plugged in without touching the endpoints.
+#
+# 2. SQLite Backend:
+# - `SQLiteMetadataStore` keeps the metadata in a single SQLite database (`metadata.db` in `UPLOAD_DIR`
+#   unless `settings.METADATA_DB` is set).
+# - The database runs in WAL mode so readers never block the writer, and every write runs inside a
+#   `BEGIN IMMEDIATE` transaction, so concurrent uploads and deletes can no longer lose entries.
+# - The `files` table is indexed on `id` (primary key), `timestamp` and `status`; listing and lookups
+#   are single indexed queries instead of a full JSON parse.
+# - Each thread gets its own connection; the schema is versioned with `PRAGMA user_version` and
+#   upgraded through the `_MIGRATIONS` list.
+#
+# 3. Processing Jobs:
+# - The `jobs` table (schema version 2) is the persistent queue of the background processing pipeline
+#   (`services/job_queue.py`). `insert_many(records, enqueue=True)` adds the files and their jobs in one transaction.
+# - `complete_job` stores the flight metrics calculated at ingest (`flightMetrics` and `summary`, as JSON in the
+#   `metrics` column, schema version 3) with the file, so listings and reads never recompute them.
+# - Jobs and files move through `pending` -> `running` -> `done` / `failed`; a failed attempt that may be retried
+#   goes back to `pending` with a later `available_at`. The last error is kept on the job and the file.
+#   `release_job` returns a claimed job to `pending` without counting the attempt (e.g. when the worker pools are
+#   saturated and the job could not run at all).
+# - `claim_job` picks the oldest available job and marks it running inside a single `BEGIN IMMEDIATE` transaction,
+#   so several workers never claim the same job. Jobs are deleted together with their file (`ON DELETE CASCADE`).
+# - Files share their stored content (`services/blob_store.py`): `insert_many(records, enqueue=True)` marks a file whose
+#   stored content was already processed as `done` with the existing metrics instead of queueing a job.
+#   `count_references(path)` counts the records sharing a stored file (schema version 5 adds the `hash` column and
+#   the indexes on `hash` and `path`).
+# - `flight_summaries(fields, since, until)` returns the requested whole-flight metrics of all processed files in one
+#   query (`json_extract` on the `metrics` column, so documents are not decoded in Python), which backs the fleet
+#   analytics (`services/fleet_analytics.py`).
+#
+# 4. Spatial Index:
+# - Schema version 6 adds the `track_segments` R*Tree with the bounding boxes of the track segments of every stored
+#   file (`services/spatial_index.py`) and the `tracks` table that maps a stored file to its segment IDs.
+# - `index_track(path, boxes)` replaces the segments of a stored file, `remove_track(path)` drops them when the
+#   file is deleted, and `find_in_area(...)` returns the records whose track intersects a bounding box with a
+#   single R*Tree query. Records sharing a stored file share its track.
+#
+# - Schema version 7 adds the `revision` counter, incremented by triggers on every insert, update and delete of
+#   `files` and `tracks` (so every write path is covered); `revision()` returns it, and the file list uses it as
+#   its entity tag (`services/http_cache.py`).
+#
+# 5. Watched Folders:
+# - The `folder_files` table (schema version 4) remembers every file the folder watcher (`services/folder_watcher.py`)
+#   has seen: its size and modification time (for incremental scans), its SHA-256 content hash (for deduplication),
+#   the outcome (`ingested`, `duplicate` or `invalid`) and the ID of the file it was ingested as.
+#
+# 6. Legacy Migration:
+# - On first start, an existing `file_mapping.json` is imported in one transaction and renamed to
+#   `file_mapping.json.migrated`, so the import only ever runs once.
+#
+# 7. Access:
+# - `get_metadata_store()` returns the process-wide store instance, creating it on first use.
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Columns of the `files` table, in the order they are stored
+FILE_COLUMNS = (
+    "id",
+    "filename",
+    "timestamp",
+    "path",
+    "status",
+    "size",
+    "error",
+    "metrics",
+    "hash",
+)
+
+# Columns stored as JSON text
+JSON_COLUMNS = ("metrics",)
+
+# Processing states of files and jobs
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+# Each entry upgrades the schema by one version (PRAGMA user_version)
+_MIGRATIONS: List[List[str]] = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS files (
+            id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            size INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_files_timestamp ON files(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_files_status ON files(status)",
+    ],
+    [
+        "ALTER TABLE files ADD COLUMN error TEXT",
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_id TEXT NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 1,
+            available_at REAL NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, available_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_file_id ON jobs(file_id)",
+        # Uploads were never marked as processed before; "success" meant "uploaded"
+        "UPDATE files SET status = 'done' WHERE status = 'success'",
+    ],
+    [
+        "ALTER TABLE files ADD COLUMN metrics TEXT",
+    ],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS folder_files (
+            path TEXT PRIMARY KEY,
+            directory TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            hash TEXT,
+            status TEXT NOT NULL,
+            file_id TEXT,
+            error TEXT,
+            seen_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_folder_files_directory ON folder_files(directory)",
+        "CREATE INDEX IF NOT EXISTS idx_folder_files_hash ON folder_files(hash)",
+    ],
+    [
+        "ALTER TABLE files ADD COLUMN hash TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_files_hash ON files(hash)",
+        "CREATE INDEX IF NOT EXISTS idx_files_path ON files(path)",
+    ],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS tracks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL UNIQUE,
+            segments INTEGER NOT NULL
+        )
+        """,
+        "CREATE VIRTUAL TABLE IF NOT EXISTS track_segments "
+        "USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    ],
+    [
+        "CREATE TABLE IF NOT EXISTS revision "
+        "(id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)",
+        # Start from the creation time, so a recreated database does not reuse revisions
+        "INSERT OR IGNORE INTO revision (id, value) "
+        "VALUES (0, CAST(strftime('%s', 'now') AS INTEGER) * 1000)",
+        "CREATE TRIGGER IF NOT EXISTS files_insert_revision AFTER INSERT ON files "
+        "BEGIN UPDATE revision SET value = value + 1; END",
+        "CREATE TRIGGER IF NOT EXISTS files_update_revision AFTER UPDATE ON files "
+        "BEGIN UPDATE revision SET value = value + 1; END",
+        "CREATE TRIGGER IF NOT EXISTS files_delete_revision AFTER DELETE ON files "
+        "BEGIN UPDATE revision SET value = value + 1; END",
+        "CREATE TRIGGER IF NOT EXISTS tracks_insert_revision AFTER INSERT ON tracks "
+        "BEGIN UPDATE revision SET value = value + 1; END",
+        "CREATE TRIGGER IF NOT EXISTS tracks_delete_revision AFTER DELETE ON tracks "
+        "BEGIN UPDATE revision SET value = value + 1; END",
+    ],
+]
+
+# Segment IDs of a track in `track_segments` are `track_id * SEGMENT_ID_STRIDE + n`
+SEGMENT_ID_STRIDE = 1 << 20
+
+# Columns of the `folder_files` table, in the order they are stored
+FOLDER_FILE_COLUMNS = (
+    "path",
+    "directory",
+    "size",
+    "mtime_ns",
+    "hash",
+    "status",
+    "file_id",
+    "error",
+    "seen_at",
+)
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _encode(name: str, value):
+    if name in JSON_COLUMNS and value is not None:
+        return json.dumps(value)
+    return value
+
+
+def _decode(row: sqlite3.Row) -> Dict:
+    record = dict(row)
+    for name in JSON_COLUMNS:
+        if record.get(name) is not None:
+            record[name] = json.loads(record[name])
+    return record
+
+
+class MetadataStore:
+    """Interface for file metadata backends."""
+
+    def get(self, file_id: str) -> Optional[Dict]:
+        """Return the record for a file ID, or None if it is unknown."""
+        raise NotImplementedError
+
+    def list(self) -> List[Dict]:
+        """Return all records, most recent first."""
+        raise NotImplementedError
+
+    def insert(
+        self, record: Dict, enqueue: bool = False, max_attempts: int = 1
+    ) -> Dict:
+        """Insert a single record."""
+        return self.insert_many([record], enqueue=enqueue, max_attempts=max_attempts)[0]
+
+    def insert_many(
+        self, records: Iterable[Dict], enqueue: bool = False, max_attempts: int = 1
+    ) -> List[Dict]:
+        """Insert several records atomically, optionally with a processing job for each.
+
+        Files whose stored content was already processed are inserted as done. Returns the inserted records.
+        """
+        raise NotImplementedError
+
+    def update(self, file_id: str, **fields) -> bool:
+        """Update fields of a record. Returns False if the record does not exist."""
+        raise NotImplementedError
+
+    def delete(self, file_id: str) -> Optional[Dict]:
+        """Delete a record and return it, or None if it did not exist."""
+        raise NotImplementedError
+
+    def claim_job(self) -> Optional[Dict]:
+        """Mark the oldest available pending job as running and return it with the file path."""
+        raise NotImplementedError
+
+    def complete_job(self, job_id: int, metrics: Optional[Dict] = None) -> bool:
+        """Mark a job and its file as done and store the file's metrics. Returns False if the file was deleted."""
+        raise NotImplementedError
+
+    def fail_job(
+        self, job_id: int, error: str, retry_at: Optional[float] = None
+    ) -> None:
+        """Record a failed attempt; the job is retried at retry_at, or marked failed if it is None."""
+        raise NotImplementedError
+
+    def release_job(self, job_id: int, retry_at: float) -> None:
+        """Return a claimed job to the queue without counting the attempt; it is available again at retry_at."""
+        raise NotImplementedError
+
+    def recover_jobs(self, max_attempts: int = 1) -> int:
+        """Requeue interrupted jobs and pending files without a job. Returns the number of requeued jobs."""
+        raise NotImplementedError
+
+    def get_job(self, file_id: str) -> Optional[Dict]:
+        """Return the most recent job of a file, or None."""
+        raise NotImplementedError
+
+    def job_counts(self) -> Dict[str, int]:
+        """Return the number of jobs per status."""
+        raise NotImplementedError
+
+    def list_folder_files(self, directory: str) -> Dict[str, Dict]:
+        """Return the seen files of a watched directory, keyed by path."""
+        raise NotImplementedError
+
+    def record_folder_file(self, entry: Dict) -> None:
+        """Insert or replace the entry of a seen file."""
+        raise NotImplementedError
+
+    def find_by_hash(self, content_hash: str) -> Optional[Dict]:
+        """Return a file with this content hash (a processed one if possible), or None."""
+        raise NotImplementedError
+
+    def count_references(self, path: str) -> int:
+        """Return the number of records that refer to a stored file."""
+        raise NotImplementedError
+
+    def index_track(
+        self, path: str, boxes: Sequence[Tuple[float, float, float, float]]
+    ) -> None:
+        """Replace the track segment boxes (min_lat, max_lat, min_lon, max_lon) of a stored file."""
+        raise NotImplementedError
+
+    def remove_track(self, path: str) -> None:
+        """Remove the track segments of a stored file."""
+        raise NotImplementedError
+
+    def find_in_area(
+        self, min_lat: float, max_lat: float, min_lon: float, max_lon: float
+    ) -> List[Dict]:
+        """Return the records whose track intersects a bounding box, most recent first."""
+        raise NotImplementedError
+
+    def unindexed_paths(self) -> List[str]:
+        """Return the stored files of processed records that have no track segments."""
+        raise NotImplementedError
+
+    def revision(self) -> int:
+        """Return a number that changes whenever a file record or track is added, changed or removed."""
+        raise NotImplementedError
+
+    def flight_summaries(
+        self,
+        fields: Sequence[str],
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Dict]:
+        """Return id, filename, timestamp, path and the given flightMetrics fields of processed files
+        ingested in [since, until)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class SQLiteMetadataStore(MetadataStore):
+    """Metadata store backed by SQLite in WAL mode."""
+
+    def __init__(self, db_path: Path, legacy_mapping: Optional[Path] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        self._apply_migrations()
+        if legacy_mapping is not None:
+            self._migrate_legacy_mapping(Path(legacy_mapping))
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection of the current thread, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in a single write transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def _apply_migrations(self) -> None:
+        """Bring the schema up to the latest version."""
+        with self.transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, statements in enumerate(
+                _MIGRATIONS[version:], start=version + 1
+            ):
+                logger.info(f"Migrating metadata schema to version {target}")
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {target}")
+
+    def _migrate_legacy_mapping(self, mapping_file: Path) -> None:
+        """Import an existing file_mapping.json once."""
+        if not mapping_file.exists():
+            return
+
+        try:
+            with open(mapping_file, "r") as f:
+                mapping = json.load(f)
+        except Exception as e:
+            logger.error(f"Could not read legacy mapping {mapping_file}: {e}")
+            return
+
+        records = []
+        for file_id, info in mapping.items():
+            records.append(
+                {
+                    "id": info.get("id", file_id),
+                    "filename": info["filename"],
+                    "timestamp": info["timestamp"],
+                    "path": info["path"],
+                    "status": info.get("status", DONE),
+                    "size": info.get("size", 0),
+                    "error": None,
+                    "metrics": None,
+                }
+            )
+
+        with self.transaction() as conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO files ({', '.join(FILE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in FILE_COLUMNS)})",
+                [tuple(r[c] for c in FILE_COLUMNS) for r in records],
+            )
+
+        mapping_file.rename(mapping_file.with_name(mapping_file.name + ".migrated"))
+        logger.info(f"Migrated {len(records)} entries from {mapping_file.name}")
+
+    def get(self, file_id: str) -> Optional[Dict]:
+        row = (
+            self._connect()
+            .execute("SELECT * FROM files WHERE id = ?", (file_id,))
+            .fetchone()
+        )
+        return _decode(row) if row is not None else None
+
+    def list(self) -> List[Dict]:
+        rows = self._connect().execute("SELECT * FROM files ORDER BY timestamp DESC")
+        return [_decode(row) for row in rows]
+
+    def insert_many(
+        self, records: Iterable[Dict], enqueue: bool = False, max_attempts: int = 1
+    ) -> List[Dict]:
+        records = [dict(r) for r in records]
+        now = _now()
+        with self.transaction() as conn:
+            jobs = []
+            for record in records:
+                if not enqueue:
+                    continue
+                # Content that was already processed maps to the existing results
+                processed = conn.execute(
+                    "SELECT metrics FROM files WHERE path = ? AND status = ? "
+                    "AND metrics IS NOT NULL LIMIT 1",
+                    (record["path"], DONE),
+                ).fetchone()
+                if processed is not None:
+                    record.update(status=DONE, metrics=json.loads(processed[0]))
+                else:
+                    jobs.append((record["id"], max_attempts, now, now))
+
+            conn.executemany(
+                f"INSERT INTO files ({', '.join(FILE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in FILE_COLUMNS)})",
+                [tuple(_encode(c, r.get(c)) for c in FILE_COLUMNS) for r in records],
+            )
+            conn.executemany(
+                "INSERT INTO jobs (file_id, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                jobs,
+            )
+        return records
+
+    def update(self, file_id: str, **fields) -> bool:
+        unknown = set(fields) - set(FILE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown metadata fields: {', '.join(sorted(unknown))}")
+        if not fields:
+            return self.get(file_id) is not None
+
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE files SET {assignments} WHERE id = ?",
+                (*(_encode(name, value) for name, value in fields.items()), file_id),
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, file_id: str) -> Optional[Dict]:
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM files WHERE id = ?", (file_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        return _decode(row)
+
+    def claim_job(self) -> Optional[Dict]:
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT jobs.*, files.path FROM jobs JOIN files ON files.id = jobs.file_id "
+                "WHERE jobs.status = ? AND jobs.available_at <= ? "
+                "ORDER BY jobs.available_at, jobs.id LIMIT 1",
+                (PENDING, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            job["attempts"] += 1
+            job["status"] = RUNNING
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, job["attempts"], _now(), job["id"]),
+            )
+            conn.execute(
+                "UPDATE files SET status = ? WHERE id = ?", (RUNNING, job["file_id"])
+            )
+        return job
+
+    def complete_job(self, job_id: int, metrics: Optional[Dict] = None) -> bool:
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (DONE, _now(), job_id),
+            )
+            cursor = conn.execute(
+                "UPDATE files SET status = ?, error = NULL, metrics = ? "
+                "WHERE id = (SELECT file_id FROM jobs WHERE id = ?)",
+                (DONE, _encode("metrics", metrics), job_id),
+            )
+        return cursor.rowcount > 0
+
+    def fail_job(
+        self, job_id: int, error: str, retry_at: Optional[float] = None
+    ) -> None:
+        status = PENDING if retry_at is not None else FAILED
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, updated_at = ? "
+                "WHERE id = ?",
+                (status, error, retry_at or 0, _now(), job_id),
+            )
+            conn.execute(
+                "UPDATE files SET status = ?, error = ? "
+                "WHERE id = (SELECT file_id FROM jobs WHERE id = ?)",
+                (status, error, job_id),
+            )
+
+    def release_job(self, job_id: int, retry_at: float) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), available_at = ?, "
+                "updated_at = ? WHERE id = ?",
+                (PENDING, retry_at, _now(), job_id),
+            )
+            conn.execute(
+                "UPDATE files SET status = ? "
+                "WHERE id = (SELECT file_id FROM jobs WHERE id = ?)",
+                (PENDING, job_id),
+            )
+
+    def recover_jobs(self, max_attempts: int = 1) -> int:
+        now = _now()
+        with self.transaction() as conn:
+            # Jobs that were running when the server stopped
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (PENDING, now, RUNNING),
+            ).rowcount
+            # Files that are waiting for processing but have no job (e.g. uploaded before the queue existed)
+            requeued += conn.execute(
+                "INSERT INTO jobs (file_id, max_attempts, created_at, updated_at) "
+                "SELECT id, ?, ?, ? FROM files WHERE status IN (?, ?) AND NOT EXISTS "
+                "(SELECT 1 FROM jobs WHERE jobs.file_id = files.id AND jobs.status = ?)",
+                (max_attempts, now, now, PENDING, RUNNING, PENDING),
+            ).rowcount
+            conn.execute(
+                "UPDATE files SET status = ? WHERE status = ?", (PENDING, RUNNING)
+            )
+        return requeued
+
+    def get_job(self, file_id: str) -> Optional[Dict]:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT * FROM jobs WHERE file_id = ? ORDER BY id DESC LIMIT 1",
+                (file_id,),
+            )
+            .fetchone()
+        )
+        return dict(row) if row is not None else None
+
+    def job_counts(self) -> Dict[str, int]:
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        )
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def list_folder_files(self, directory: str) -> Dict[str, Dict]:
+        rows = self._connect().execute(
+            "SELECT * FROM folder_files WHERE directory = ?", (directory,)
+        )
+        return {row["path"]: dict(row) for row in rows}
+
+    def record_folder_file(self, entry: Dict) -> None:
+        row = tuple(
+            entry.get(c, _now() if c == "seen_at" else None)
+            for c in FOLDER_FILE_COLUMNS
+        )
+        with self.transaction() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO folder_files ({', '.join(FOLDER_FILE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in FOLDER_FILE_COLUMNS)})",
+                row,
+            )
+
+    def find_by_hash(self, content_hash: str) -> Optional[Dict]:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT * FROM files WHERE hash = ? "
+                "ORDER BY status = ? DESC, timestamp LIMIT 1",
+                (content_hash, DONE),
+            )
+            .fetchone()
+        )
+        return _decode(row) if row is not None else None
+
+    def count_references(self, path: str) -> int:
+        return (
+            self._connect()
+            .execute("SELECT COUNT(*) FROM files WHERE path = ?", (path,))
+            .fetchone()[0]
+        )
+
+    def _remove_track(self, conn: sqlite3.Connection, path: str) -> None:
+        track = conn.execute(
+            "SELECT id, segments FROM tracks WHERE path = ?", (path,)
+        ).fetchone()
+        if track is None:
+            return
+        first = track["id"] * SEGMENT_ID_STRIDE
+        conn.executemany(
+            "DELETE FROM track_segments WHERE id = ?",
+            ((first + n,) for n in range(track["segments"])),
+        )
+        conn.execute("DELETE FROM tracks WHERE id = ?", (track["id"],))
+
+    def index_track(
+        self, path: str, boxes: Sequence[Tuple[float, float, float, float]]
+    ) -> None:
+        boxes = list(boxes)[:SEGMENT_ID_STRIDE]
+        with self.transaction() as conn:
+            self._remove_track(conn, path)
+            track_id = conn.execute(
+                "INSERT INTO tracks (path, segments) VALUES (?, ?)", (path, len(boxes))
+            ).lastrowid
+            first = track_id * SEGMENT_ID_STRIDE
+            conn.executemany(
+                "INSERT INTO track_segments VALUES (?, ?, ?, ?, ?)",
+                ((first + n, *box) for n, box in enumerate(boxes)),
+            )
+
+    def remove_track(self, path: str) -> None:
+        with self.transaction() as conn:
+            self._remove_track(conn, path)
+
+    def find_in_area(
+        self, min_lat: float, max_lat: float, min_lon: float, max_lon: float
+    ) -> List[Dict]:
+        rows = self._connect().execute(
+            "SELECT files.* FROM files JOIN tracks ON tracks.path = files.path "
+            "WHERE tracks.id IN ("
+            f"  SELECT DISTINCT id / {SEGMENT_ID_STRIDE} FROM track_segments "
+            "  WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?"
+            ") ORDER BY files.timestamp DESC",
+            (min_lat, max_lat, min_lon, max_lon),
+        )
+        return [_decode(row) for row in rows]
+
+    def unindexed_paths(self) -> List[str]:
+        rows = self._connect().execute(
+            "SELECT DISTINCT path FROM files WHERE status = ? "
+            "AND path NOT IN (SELECT path FROM tracks)",
+            (DONE,),
+        )
+        return [row[0] for row in rows]
+
+    def revision(self) -> int:
+        return self._connect().execute("SELECT value FROM revision").fetchone()[0]
+
+    def flight_summaries(
+        self,
+        fields: Sequence[str],
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Dict]:
+        # Extract only the requested metrics in SQLite instead of decoding every document
+        params = [f"$.flightMetrics.{field}" for field in fields]
+        conditions = ["status = ?", "metrics IS NOT NULL"]
+        params.append(DONE)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp < ?")
+            params.append(until)
+        rows = self._connect().execute(
+            "SELECT id, filename, timestamp, path"
+            + "".join(", json_extract(metrics, ?)" for _ in fields)
+            + f" FROM files WHERE {' AND '.join(conditions)} ORDER BY timestamp",
+            params,
+        )
+        return [
+            {
+                "id": row[0],
+                "filename": row[1],
+                "timestamp": row[2],
+                "path": row[3],
+                "flightMetrics": {
+                    field: value
+                    for field, value in zip(fields, row[4:])
+                    if value is not None
+                },
+            }
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def _create_sqlite_store() -> MetadataStore:
+    db_path = settings.METADATA_DB or settings.UPLOAD_DIR / "metadata.db"
+    return SQLiteMetadataStore(
+        db_path, legacy_mapping=settings.UPLOAD_DIR / "file_mapping.json"
+    )
+
+
+# Available metadata backends, selected with settings.METADATA_BACKEND
+_BACKENDS = {
+    "sqlite": _create_sqlite_store,
+}
+
+_store: Optional[MetadataStore] = None
+_store_lock = threading.Lock()
+
+
+def get_metadata_store() -> MetadataStore:
+    """Get the process-wide metadata store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = settings.METADATA_BACKEND
+                if backend not in _BACKENDS:
+                    raise ValueError(f"Unknown metadata backend: {backend}")
+                _store = _BACKENDS[backend]()
+    return _store
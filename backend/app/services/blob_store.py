@@ -0,0 +1,104 @@
+# backend/app/services/blob_store.py
+# This file provides content-addressed storage for uploaded flight files.
+# The following functionalities are implemented:
+#
+# 1. Blob Layout:
+# - Uploads are stored once per content as `UPLOAD_DIR/blobs/{hash[:2]}/{hash}{extension}`, where `hash` is the
+#   SHA-256 of the file computed while the upload is streamed. The columnar artifact and LOD pyramid are stored
+#   next to the blob, so every file record with the same content shares them.
+#
+# 2. Committing Uploads:
+# - `commit(tmp_path, content_hash, extension)` moves a validated upload into place, or drops it when a blob with
+#   the same content already exists (the existing blob and its artifacts are left untouched, so they stay current).
+# - The blob is pinned until the file record referring to it is inserted (`unpin`), so a concurrent delete of the
+#   last other reference cannot remove it in between.
+#
+# 3. Reference Counting:
+# - The references of a blob are the file records whose `path` points to it (`MetadataStore.count_references`).
+# - `release(path)` removes the blob, its derived data and its spatial index entries once no record and no pending
+#   upload refers to it any more.
+#   Files stored before content addressing (`{timestamp}_{filename}`) are released the same way.
+import logging
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import List
+from ..core.config import settings
+from ..db.metadata_store import get_metadata_store
+from .flight_artifacts import artifact_path, lod_path
+
+logger = logging.getLogger(__name__)
+
+
+def derived_paths(file_path: Path) -> List[Path]:
+    """The stored file and all data derived from it."""
+    base_path, base_name = file_path.parent, file_path.stem
+    return [
+        file_path,  # Original file
+        artifact_path(file_path),  # Columnar artifact
+        lod_path(file_path),  # LOD pyramid
+        base_path / f"{base_name}_processed.json",  # Processed data (legacy)
+        base_path / f"{base_name}_analysis.json",  # Any analysis results
+        base_path / f"{base_name}_metrics.json",  # Any metrics data
+    ]
+
+
+class BlobStore:
+    """Content-addressed file storage with reference counting."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._pins: Counter = Counter()
+
+    def blob_path(self, content_hash: str, extension: str) -> Path:
+        """Get the path of the blob with the given content hash."""
+        return self.root / content_hash[:2] / f"{content_hash}{extension.lower()}"
+
+    def commit(self, tmp_path: Path, content_hash: str, extension: str) -> Path:
+        """Move a validated upload into the store and pin it. Returns the blob path."""
+        path = self.blob_path(content_hash, extension)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._pins[path] += 1
+            if path.exists():
+                logger.debug(f"Blob {path.name} already stored, reusing it")
+                Path(tmp_path).unlink(missing_ok=True)
+            else:
+                os.replace(tmp_path, path)
+        return path
+
+    def unpin(self, path: Path) -> None:
+        """Release the pin of a committed upload once its record exists (or was not created)."""
+        path = Path(path)
+        with self._lock:
+            self._pins[path] -= 1
+            if self._pins[path] <= 0:
+                del self._pins[path]
+
+    def release(self, path: Path) -> List[str]:
+        """Delete a stored file and its derived data if nothing refers to it. Returns the deleted file names."""
+        path = Path(path)
+        deleted = []
+        with self._lock:
+            if self._pins[path] > 0:
+                return deleted
+            references = get_metadata_store().count_references(str(path))
+            if references > 0:
+                logger.debug(f"{path.name} is still referenced by {references} files")
+                return deleted
+
+            get_metadata_store().remove_track(str(path))
+            for derived in derived_paths(path):
+                try:
+                    if derived.exists():
+                        derived.unlink()
+                        deleted.append(derived.name)
+                        logger.debug(f"Deleted file: {derived}")
+                except Exception as e:
+                    logger.error(f"Error deleting file {derived}: {e}")
+        return deleted
+
+
+blob_store = BlobStore(settings.UPLOAD_DIR / "blobs")
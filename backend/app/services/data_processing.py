@@ -3,118 +3,90 @@
 # The following functionalities are implemented:
 #
 # 1. File Content Reading:
-# - The `read_file_content` function reads the content of a given file (CSV or JSON).
-# - It validates the existence of the file and raises an error if the file is not found.
-# - For CSV files:
-#   - The content is parsed into a pandas DataFrame.
-#   - Each row is converted into a dictionary with the required structure:
-#     - "timestamp" in HH:MM:SS format.
-#     - "gps" as a dictionary with "latitude", "longitude", and "altitude".
-#     - "radar" as a dictionary with "distance".
-# - For JSON files:
-#   - The content is loaded into a Python object.
-#   - If the file contains a single object, it is converted into a list.
-#   - Timestamps are validated and formatted as HH:MM:SS if necessary.
+# - The `read_file_content` function reads the content of a given file (CSV or JSON) as record dictionaries:
+#   - "timestamp" in HH:MM:SS format.
+#   - "gps" as a dictionary with "latitude", "longitude", and "altitude".
+#   - "radar" as a dictionary with "distance".
+# - Parsing is done by the ingestion module (`ingestion.py`), the single reader for flight files.
 # - Errors during file reading or processing raise a `ValueError` with detailed information.
 #
 # 2. File Processing:
-# - The `process_file` function processes an uploaded file using its ID and path.
-# - It reads the file content using `read_file_content` and performs additional processing:
-#   - Ensures that all timestamps are formatted as HH:MM:SS strings.
-# - The processed data is saved to a new JSON file with the same base name as the original file, suffixed with `_processed`.
+# - The `process_file` function processes an uploaded file using its ID and path. It is run once per upload by the
+#   background job queue (`job_queue.py`), which records the status and retries failed attempts.
+# - The work is done by `build_flight_artifacts(file_path)`, which runs in the CPU worker pool
+#   (`executor.cpu_pool`, a process pool by default) so parsing does not block the event loop:
+#   - It parses the file straight into `FlightColumns` with `ingestion.read_flight`.
+#   - The columns are saved as a binary columnar artifact
+#     (`{stem}_columns.v{ARTIFACT_VERSION}.npy`, see `flight_artifacts.py`) that the data and export endpoints memory-map.
+#   - The level-of-detail pyramid for chart and map downsampling (`downsampling.build_lod`) is stored next to it.
+#   - The whole-flight metrics (`flightMetrics` and `summary`) are calculated from the same columns and returned, so
+#     the job queue stores them in the metadata store and they are never recomputed on reads.
+#   - The bounding boxes of the track segments are then added to the spatial index (`spatial_index.index_file`).
+# - `flight_summary(file_path)` calculates the whole-flight metrics from the artifact, also in a worker process, for
+#   files that were processed before metrics were stored.
 # - Any errors during processing are logged and raised for further handling.
 #
-# 3. Logging:
-# - The module uses the `logging` library to log debug and error messages for troubleshooting.
+# 3. Logging and Instrumentation:
+# - The module uses the `logging` library to log debug and error messages for troubleshooting. The log level is
+#   configured once for the application (`settings.LOG_LEVEL`, see `main.py`).
+# - `process_file` times parsing (with the artifacts and metrics) and indexing as spans and counts the processed rows
+#   (`core/instrumentation.py`).
 #
 # This module supports integration with a file upload and processing pipeline to validate, process, and store drone-related data.
-import json
-import csv
-import pandas as pd
 import logging
 from pathlib import Path
-from typing import List, Dict
-from datetime import datetime
-from io import StringIO
+from typing import List, Dict, Optional
+from ..core.instrumentation import count_processed, span
+from .downsampling import build_lod
+from .executor import cpu_pool
+from .flight_artifacts import load_artifact, write_artifact, write_lod
+from .flight_columns import calculate_summary
+from .ingestion import read_flight, read_records
+from .spatial_index import index_file
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
 def read_file_content(file_path: str | Path) -> List[Dict]:
     """Read and process file content."""
-    logger.debug(f"Reading file: {file_path}")
+    return read_records(file_path)
 
-    # Convert string path to Path object
-    file_path = Path(file_path) if isinstance(file_path, str) else file_path
 
-    if not file_path.exists():
-        raise ValueError(f"File not found: {file_path}")
+def build_flight_artifacts(file_path: str | Path) -> Optional[Dict]:
+    """Parse a file, write its columnar artifact and LOD pyramid and return its metrics (None if empty)."""
+    # Parse the file straight into columns and save them as a binary columnar artifact
+    columns = read_flight(file_path)
+    write_artifact(Path(file_path), columns)
 
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        if file_path.suffix.lower() == ".csv":
-            df = pd.read_csv(StringIO(content))
-
-            # Convert to list of dicts
-            data = []
-            for _, row in df.iterrows():
-                processed_row = {
-                    "timestamp": row["timestamp"],  # Already in HH:MM:SS format
-                    "gps": {
-                        "latitude": float(row["latitude"]),
-                        "longitude": float(row["longitude"]),
-                        "altitude": float(row["altitude"]),
-                    },
-                    "radar": {"distance": float(row["radar_distance"])},
-                }
-                data.append(processed_row)
+    # Precompute the level-of-detail pyramid for downsampled reads
+    write_lod(Path(file_path), build_lod(columns))
 
-            return data
+    # Whole-flight metrics, stored with the file's metadata
+    return calculate_summary(columns) if len(columns) else None
 
-        else:  # JSON file
-            data = json.loads(content)
-            if isinstance(data, dict):
-                data = [data]
 
-            # Validate and ensure timestamp format
-            for item in data:
-                # Timestamp should already be in HH:MM:SS format
-                if not isinstance(item["timestamp"], str):
-                    item["timestamp"] = item["timestamp"].strftime("%H:%M:%S")
+def flight_summary(file_path: str | Path) -> Optional[Dict]:
+    """Calculate the whole-flight metrics from the columnar artifact of a file."""
+    columns = load_artifact(Path(file_path))
+    if columns is None or len(columns) == 0:
+        return None
+    return calculate_summary(columns)
 
-            return data
-
-    except Exception as e:
-        logger.error(f"Error processing file: {e}")
-        raise ValueError(f"Error processing file: {str(e)}")
 
-
-async def process_file(file_id: str, file_path: str | Path) -> None:
-    """Process uploaded file."""
+async def process_file(file_id: str, file_path: str | Path) -> Optional[Dict]:
+    """Process uploaded file. Returns the flight metrics."""
     logger.info(f"Processing file {file_id}")
 
     try:
-        # Read and validate the file
-        data = read_file_content(file_path)
-
-        # Process the data
-        for item in data:
-            if not isinstance(item["timestamp"], str):
-                item["timestamp"] = datetime.strptime(
-                    str(item["timestamp"]), "%H:%M:%S"
-                ).strftime("%H:%M:%S")
-
-        # Save processed results
-        file_path = Path(file_path)  # Convert to Path object
-        results_path = file_path.with_name(f"{file_path.stem}_processed.json")
-        with open(results_path, "w") as f:
-            json.dump(data, f, indent=2)
-
-        logger.info(f"Successfully processed file {file_id}")
+        # Parsing and metrics run in the CPU worker pool, off the event loop
+        with span("parse"):
+            metrics = await cpu_pool.run(build_flight_artifacts, str(file_path))
+        with span("index"):
+            await index_file(str(file_path))
+        rows = metrics["flightMetrics"]["totalPoints"] if metrics else 0
+        count_processed("process", rows=rows)
+        logger.info(f"Successfully processed file {file_id} ({rows} rows)")
+        return metrics
 
     except Exception as e:
         logger.error(f"Error processing file {file_id}: {e}")
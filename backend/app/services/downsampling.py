@@ -0,0 +1,215 @@
+# backend/app/services/downsampling.py
+# This file provides shape-preserving downsampling of flights for charts and maps, and the precomputed
+# level-of-detail (LOD) pyramids that let the data endpoint serve any resolution cheaply.
+# The following functionalities are implemented:
+#
+# 1. Time Series Downsampling:
+# - `lttb_indices(x, y, n_out)` selects `n_out` points with Largest-Triangle-Three-Buckets, which keeps
+#   peaks and valleys that plain striding would drop.
+# - `series_indices(columns, n_out)` applies LTTB to altitude and radar distance (half of the budget each)
+#   and merges the selections, so both chart lines keep their shape.
+#
+# 2. GPS Track Simplification:
+# - `track_order(columns, max_points)` ranks track points with a greedy Douglas–Peucker: starting from the
+#   end points, the point deviating most from its current segment is added next.
+# - The first `k` entries of this order are the Douglas–Peucker simplification with `k` points, so a single
+#   ranking serves every resolution up to `max_points`.
+# - Points lying exactly on their segment (e.g. while hovering) are never ranked, so the order can be shorter
+#   than `max_points`.
+#
+# 3. LOD Pyramids:
+# - `build_lod(columns)` precomputes LTTB selections for `LOD_LEVELS` and the track order (up to
+#   `TRACK_LOD_POINTS` points). It is stored per file by `flight_artifacts.write_lod`.
+# - `select_series(...)` and `select_track(...)` answer a request for `max_points` points of a window from
+#   the pyramid in O(output) time, and fall back to computing LTTB/Douglas–Peucker on the window itself
+#   when the pyramid is missing or too coarse for the window.
+import heapq
+from typing import Dict, Optional, Union
+import numpy as np
+from .flight_columns import FlightColumns
+
+# Precomputed time series resolutions (number of points)
+LOD_LEVELS = (256, 1024, 4096, 16384)
+
+# Number of track points ranked at ingest time
+TRACK_LOD_POINTS = 16384
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Select n_out point indices with Largest-Triangle-Three-Buckets."""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:n_out], dtype=np.int64)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area between the previous point, candidates and next average
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def series_indices(columns: FlightColumns, n_out: int) -> np.ndarray:
+    """LTTB over altitude and radar distance, merged into one sorted selection."""
+    if n_out >= len(columns):
+        return np.arange(len(columns))
+
+    altitude = lttb_indices(columns.seconds, columns.altitude, max(n_out // 2, 2))
+    distance = lttb_indices(
+        columns.seconds, columns.distance, max(n_out - n_out // 2, 2)
+    )
+    return np.union1d(altitude, distance)
+
+
+def _segment_deviation(
+    x: np.ndarray, y: np.ndarray, start: int, end: int
+) -> Optional[tuple]:
+    """Point between start and end farthest from the segment, as (distance, index)."""
+    if end - start < 2:
+        return None
+
+    px = x[start + 1 : end]
+    py = y[start + 1 : end]
+    dx = x[end] - x[start]
+    dy = y[end] - y[start]
+    length_sq = dx * dx + dy * dy
+
+    if length_sq == 0:
+        distances = np.hypot(px - x[start], py - y[start])
+    else:
+        # Distance to the closest point of the segment
+        t = np.clip(((px - x[start]) * dx + (py - y[start]) * dy) / length_sq, 0, 1)
+        distances = np.hypot(px - (x[start] + t * dx), py - (y[start] + t * dy))
+
+    i = int(np.argmax(distances))
+    return float(distances[i]), start + 1 + i
+
+
+def track_order(columns: FlightColumns, max_points: int) -> np.ndarray:
+    """Rank track points by greedy Douglas–Peucker significance."""
+    n = len(columns)
+    if n <= 2:
+        return np.arange(n)
+
+    # Equirectangular projection, good enough to compare deviations
+    y = np.asarray(columns.latitude, dtype=np.float64)
+    x = np.asarray(columns.longitude, dtype=np.float64) * np.cos(
+        np.radians(float(np.mean(y)))
+    )
+
+    order = [0, n - 1]
+    heap = []
+
+    def push(start: int, end: int) -> None:
+        deviation = _segment_deviation(x, y, start, end)
+        # Points on the segment add nothing (and would degrade the ranking to O(n^2))
+        if deviation is not None and deviation[0] > 0:
+            heapq.heappush(heap, (-deviation[0], deviation[1], start, end))
+
+    push(0, n - 1)
+    while heap and len(order) < max_points:
+        _, index, start, end = heapq.heappop(heap)
+        order.append(index)
+        push(start, index)
+        push(index, end)
+
+    return np.asarray(order, dtype=np.int64)
+
+
+def build_lod(columns: FlightColumns) -> Dict[str, np.ndarray]:
+    """Precompute the LOD pyramid of a flight."""
+    lod = {
+        f"series_{level}": series_indices(columns, level)
+        for level in LOD_LEVELS
+        if level < len(columns)
+    }
+    lod["track_order"] = track_order(columns, TRACK_LOD_POINTS)
+    return lod
+
+
+def select_series(
+    columns: FlightColumns,
+    selection: Union[slice, np.ndarray],
+    max_points: int,
+    lod: Optional[Dict[str, np.ndarray]] = None,
+) -> np.ndarray:
+    """Indices (into the flight) of at most max_points time series points of a window."""
+    if not isinstance(selection, slice):
+        # Unordered flights select by index array; downsample the selection directly
+        return selection[series_indices(columns.take(selection), max_points)]
+
+    start, stop = selection.start, selection.stop
+    if stop - start <= max_points:
+        return np.arange(start, stop)
+
+    if lod is not None:
+        # Finest precomputed level that fits the budget inside the window
+        for level in reversed(LOD_LEVELS):
+            indices = lod.get(f"series_{level}")
+            if indices is None:
+                continue
+            lo, hi = np.searchsorted(indices, [start, stop])
+            if hi - lo <= max_points:
+                if 2 * (hi - lo) >= max_points:
+                    return indices[lo:hi]
+                break
+
+    window = columns.take(selection)
+    return start + series_indices(window, max_points)
+
+
+def select_track(
+    columns: FlightColumns,
+    selection: Union[slice, np.ndarray],
+    max_points: int,
+    lod: Optional[Dict[str, np.ndarray]] = None,
+) -> np.ndarray:
+    """Indices (into the flight) of at most max_points track points of a window."""
+    if not isinstance(selection, slice):
+        order = track_order(columns.take(selection), max_points)
+        return selection[np.sort(order)]
+
+    start, stop = selection.start, selection.stop
+    if stop - start <= max_points:
+        return np.arange(start, stop)
+
+    if lod is not None and "track_order" in lod:
+        order = lod["track_order"]
+        # A ranking shorter than its budget holds every significant point
+        complete = len(order) < min(TRACK_LOD_POINTS, len(columns))
+        # Scan enough of the ranking to expect max_points hits inside the window
+        needed = int(np.ceil(max_points * len(columns) / (stop - start)))
+        if needed <= len(order) or complete:
+            candidates = order if complete else order[: 2 * needed]
+            inside = candidates[(candidates >= start) & (candidates < stop)]
+            if complete:
+                # Keep the window's end points, the ranking only covers the whole flight's
+                inner = inside[(inside != start) & (inside != stop - 1)]
+                inside = np.concatenate(([start, stop - 1], inner))
+            if len(inside) >= max_points or complete:
+                return np.sort(inside[:max_points])
+
+    window = columns.take(selection)
+    return start + np.sort(track_order(window, max_points))
@@ -0,0 +1,224 @@
+# backend/app/services/executor.py
+# This file provides the worker pools that keep blocking work off the event loop.
+# The following functionalities are implemented:
+#
+# 1. Worker Pools:
+# - `io_pool`: a thread pool for file I/O and work on memory-mapped columns (saving uploads, loading
+#   artifacts, building data pages, formatting export chunks).
+# - `cpu_pool`: a process pool for parsing raw files and calculating metrics, so pure-Python work does not hold
+#   the GIL of the server process. With `settings.EXECUTOR_CPU_PROCESSES` disabled it runs on threads instead.
+# - `await pool.run(func, *args, **kwargs)` runs a function on a pool; `pool.iterate(iterator)` advances a blocking
+#   iterator on the pool (e.g. for streaming responses). Process pool tasks must be picklable module-level
+#   functions and should exchange file paths and small results rather than flight data.
+#
+# 2. Bounded Queue and Backpressure:
+# - Each pool admits at most its number of workers plus `settings.EXECUTOR_QUEUE_SIZE` tasks.
+# - Further callers wait for a free slot for up to `settings.EXECUTOR_QUEUE_TIMEOUT` seconds and are then
+#   rejected with `PoolSaturated`, so overload turns into fast failures instead of a growing backlog. The API answers
+#   it with HTTP 503 and a `Retry-After` header (`main.py`); background callers (job queue, folder watcher) retry
+#   the work later instead of failing it.
+#
+# 3. Statistics:
+# - `stats()` reports per pool the number of running and queued tasks, callers waiting for admission, counters
+#   of completed/failed/rejected tasks and the queue wait and run time (average, p95, max) of recent tasks.
+#
+# 4. Lifecycle:
+# - Pools are created lazily on first use; `shutdown_pools()` stops them when the application shuts down.
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+import numpy as np
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Number of recent tasks the latency statistics are computed from
+LATENCY_WINDOW = 1024
+
+_DONE = object()
+
+
+class PoolSaturated(Exception):
+    """A worker pool had no free slot within its queue timeout."""
+
+    def __init__(self, pool: str, retry_after: int = 1):
+        super().__init__(f"Executor pool '{pool}' is full, please retry later")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+def _timed_call(func: Callable, *args) -> tuple:
+    """Run func in a worker and report when it started (wall clock, comparable across processes)."""
+    started = time.time()
+    return started, func(*args)
+
+
+class WorkerPool:
+    """An executor with a bounded number of admitted tasks and latency statistics."""
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        queue_size: int,
+        queue_timeout: float,
+        processes: bool = False,
+    ):
+        self.name = name
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self.processes = processes
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_times = deque(maxlen=LATENCY_WINDOW)
+        self._run_times = deque(maxlen=LATENCY_WINDOW)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.processes:
+                    # spawn: forking a process that runs threads and SQLite connections is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix=f"{self.name}-pool"
+                    )
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # A semaphore belongs to one event loop; recreate it when the loop changes
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers + self.queue_size)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _acquire(self) -> asyncio.Semaphore:
+        slots = self._get_slots()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+            return slots
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            logger.warning(f"Executor pool '{self.name}' is full, rejecting task")
+            raise PoolSaturated(self.name)
+        finally:
+            self._waiting -= 1
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) on the pool, waiting for a free slot if the queue is full."""
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        slots = await self._acquire()
+        self._in_flight += 1
+        submitted = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next task
+            with self._lock:
+                self._executor = None
+            self._failed += 1
+            raise
+        except BaseException:
+            self._failed += 1
+            raise
+        else:
+            finished = time.time()
+            self._completed += 1
+            self._wait_times.append(max(0.0, started - submitted))
+            self._run_times.append(finished - started)
+            return result
+        finally:
+            self._in_flight -= 1
+            slots.release()
+
+    async def iterate(self, iterator: Iterator) -> AsyncIterator:
+        """Advance a blocking iterator on the pool, one item per task."""
+        while True:
+            item = await self.run(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+
+    @staticmethod
+    def _latency(samples: deque) -> dict:
+        if not samples:
+            return {"avgMs": None, "p95Ms": None, "maxMs": None}
+        values = np.fromiter(samples, dtype=np.float64, count=len(samples)) * 1000
+        return {
+            "avgMs": round(float(values.mean()), 3),
+            "p95Ms": round(float(np.percentile(values, 95)), 3),
+            "maxMs": round(float(values.max()), 3),
+        }
+
+    def stats(self) -> dict:
+        """Queue depth, counters and latency of the pool."""
+        return {
+            "kind": "process" if self.processes else "thread",
+            "workers": self.workers,
+            "queueSize": self.queue_size,
+            "running": min(self._in_flight, self.workers),
+            "queued": max(0, self._in_flight - self.workers),
+            "waiting": self._waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "queueWait": self._latency(self._wait_times),
+            "runTime": self._latency(self._run_times),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers of the pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+io_pool = WorkerPool(
+    "io",
+    workers=settings.EXECUTOR_IO_WORKERS,
+    queue_size=settings.EXECUTOR_QUEUE_SIZE,
+    queue_timeout=settings.EXECUTOR_QUEUE_TIMEOUT,
+)
+cpu_pool = WorkerPool(
+    "cpu",
+    workers=settings.EXECUTOR_CPU_WORKERS,
+    queue_size=settings.EXECUTOR_QUEUE_SIZE,
+    queue_timeout=settings.EXECUTOR_QUEUE_TIMEOUT,
+    processes=settings.EXECUTOR_CPU_PROCESSES,
+)
+
+
+def executor_stats() -> dict:
+    """Statistics of all worker pools."""
+    return {"io": io_pool.stats(), "cpu": cpu_pool.stats()}
+
+
+def shutdown_pools() -> None:
+    """Stop all worker pools."""
+    io_pool.shutdown()
+    cpu_pool.shutdown()
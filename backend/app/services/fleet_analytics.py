@@ -0,0 +1,228 @@
+# backend/app/services/fleet_analytics.py
+# This file provides aggregate analytics across all processed flights (the fleet archive).
+# The following functionalities are implemented:
+#
+# 1. Summary-Based Aggregates:
+# - Work on the whole-flight metrics stored with every file at ingest (`MetadataStore.flight_summaries`), so
+#   fleet-wide questions never open flight data: one query and a few NumPy reductions over one value per flight.
+# - `fleet_summary(flights)`: number of flights, total flight time and points, highest altitude and closest
+#   radar distance of the fleet.
+# - `metric_distribution(flights, metric, bins)`: histogram, percentiles and top flights of one flight metric
+#   (e.g. the max altitude distribution).
+# - `daily_totals(flights)`: flights, flight time and points per ingest day.
+#
+# 2. Point-Level Queries (Map-Reduce):
+# - `map_artifacts(func, paths, *args)` splits the flight paths into chunks and maps `func` over them in the CPU
+#   worker pool (`services/executor.py`); each task memory-maps the columnar artifacts of its chunk and returns
+#   small per-flight results, which the caller reduces.
+# - `closest_approaches(flights, limit, threshold)` locates the closest radar approach of the flights (time,
+#   position, altitude) and counts the points below `threshold`. The stored `minDistance` of every flight
+#   preselects the candidates, so only artifacts that can contribute to the answer are read.
+#
+# Timestamps of the flight files carry no date, so days refer to the ingest timestamp of a file.
+import asyncio
+import logging
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .executor import cpu_pool
+from .flight_artifacts import load_artifact
+
+logger = logging.getLogger(__name__)
+
+# Numeric whole-flight metrics that can be aggregated
+METRIC_FIELDS = (
+    "duration",
+    "maxAltitude",
+    "minAltitude",
+    "avgAltitude",
+    "maxDistance",
+    "minDistance",
+    "avgDistance",
+    "totalPoints",
+)
+
+PERCENTILES = (50, 90, 99)
+TOP_FLIGHTS = 5
+
+
+def _metric_values(flights: List[Dict], metric: str) -> np.ndarray:
+    """One metric of every flight (NaN where it is missing)."""
+    return np.array(
+        [f["flightMetrics"].get(metric, np.nan) for f in flights], dtype=np.float64
+    )
+
+
+def _flight_ref(flight: Dict, value: float) -> Dict:
+    return {
+        "id": flight["id"],
+        "filename": flight["filename"],
+        "timestamp": flight["timestamp"],
+        "value": round(float(value), 3),
+    }
+
+
+def fleet_summary(flights: List[Dict]) -> Dict:
+    """Totals and extremes of the fleet."""
+    summary = {
+        "flights": len(flights),
+        "totalDuration": 0.0,
+        "totalPoints": 0,
+        "maxAltitude": None,
+        "minDistance": None,
+    }
+    if not flights:
+        return summary
+
+    durations = _metric_values(flights, "duration")
+    points = _metric_values(flights, "totalPoints")
+    summary["totalDuration"] = round(float(np.nansum(durations)), 2)
+    summary["totalPoints"] = int(np.nansum(points))
+
+    for key, values, pick in (
+        ("maxAltitude", _metric_values(flights, "maxAltitude"), np.nanargmax),
+        ("minDistance", _metric_values(flights, "minDistance"), np.nanargmin),
+    ):
+        if not np.all(np.isnan(values)):
+            index = int(pick(values))
+            summary[key] = _flight_ref(flights[index], values[index])
+    return summary
+
+
+def metric_distribution(flights: List[Dict], metric: str, bins: int) -> Dict:
+    """Histogram, statistics and top flights of one flight metric."""
+    values = _metric_values(flights, metric)
+    present = ~np.isnan(values)
+    finite = values[present]
+
+    distribution = {"metric": metric, "flights": int(len(finite))}
+    if len(finite) == 0:
+        return {**distribution, "histogram": [], "stats": None, "top": []}
+
+    counts, edges = np.histogram(finite, bins=bins)
+    distribution["histogram"] = [
+        {"min": round(float(lo), 3), "max": round(float(hi), 3), "count": int(count)}
+        for lo, hi, count in zip(edges[:-1], edges[1:], counts)
+    ]
+    distribution["stats"] = {
+        "min": round(float(finite.min()), 3),
+        "max": round(float(finite.max()), 3),
+        "mean": round(float(finite.mean()), 3),
+        **{
+            f"p{p}": round(float(v), 3)
+            for p, v in zip(PERCENTILES, np.percentile(finite, PERCENTILES))
+        },
+    }
+
+    # Flights with the highest values
+    indices = np.flatnonzero(present)
+    top = indices[np.argsort(-finite, kind="stable")[:TOP_FLIGHTS]]
+    distribution["top"] = [_flight_ref(flights[i], values[i]) for i in top]
+    return distribution
+
+
+def daily_totals(flights: List[Dict]) -> List[Dict]:
+    """Flights, flight time and points per ingest day."""
+    days = defaultdict(lambda: {"flights": 0, "duration": 0.0, "points": 0})
+    for flight in flights:
+        day = days[flight["timestamp"][:10]]
+        metrics = flight["flightMetrics"]
+        day["flights"] += 1
+        day["duration"] += metrics.get("duration", 0.0)
+        day["points"] += metrics.get("totalPoints", 0)
+
+    return [
+        {"date": date, **totals, "duration": round(totals["duration"], 2)}
+        for date, totals in sorted(days.items())
+    ]
+
+
+def _chunk_approaches(
+    paths: List[str], threshold: Optional[float]
+) -> List[Optional[Dict]]:
+    """Closest approach (and points below threshold) of each flight of a chunk. Runs in a CPU worker."""
+    results = []
+    for path in paths:
+        columns = load_artifact(Path(path))
+        if columns is None or len(columns) == 0:
+            results.append(None)
+            continue
+
+        index = int(np.argmin(columns.distance))
+        result = {
+            "distance": round(float(columns.distance[index]), 3),
+            "time": columns.timestamp_at(index),
+            "latitude": float(columns.latitude[index]),
+            "longitude": float(columns.longitude[index]),
+            "altitude": float(columns.altitude[index]),
+        }
+        if threshold is not None:
+            result["pointsBelow"] = int(np.count_nonzero(columns.distance <= threshold))
+        results.append(result)
+    return results
+
+
+async def map_artifacts(func: Callable, paths: List[str], *args) -> List:
+    """Map func over chunks of flight paths in the CPU pool and concatenate the per-flight results."""
+    if not paths:
+        return []
+    # A few chunks per worker balance the load without flooding the pool's queue
+    chunks = min(
+        len(paths), cpu_pool.workers * 4, cpu_pool.workers + cpu_pool.queue_size
+    )
+    size = math.ceil(len(paths) / chunks)
+    results = await asyncio.gather(
+        *(
+            cpu_pool.run(func, paths[start : start + size], *args)
+            for start in range(0, len(paths), size)
+        )
+    )
+    return [result for chunk in results for result in chunk]
+
+
+async def closest_approaches(
+    flights: List[Dict], limit: int, threshold: Optional[float] = None
+) -> Dict:
+    """Closest radar approaches of the fleet, located in the flight data."""
+    distances = _metric_values(flights, "minDistance")
+    known = np.flatnonzero(~np.isnan(distances))
+
+    # Preselect with the stored minimum distance of every flight
+    if threshold is not None:
+        candidates = known[distances[known] <= threshold]
+    else:
+        candidates = known[np.argsort(distances[known], kind="stable")[:limit]]
+    candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+
+    located = await map_artifacts(
+        _chunk_approaches, [flights[i]["path"] for i in candidates], threshold
+    )
+
+    approaches = []
+    for i, approach in zip(candidates, located):
+        flight = flights[i]
+        entry = {
+            "id": flight["id"],
+            "filename": flight["filename"],
+            "timestamp": flight["timestamp"],
+            "distance": round(float(distances[i]), 3),
+            "time": None,
+            "latitude": None,
+            "longitude": None,
+            "altitude": None,
+        }
+        if approach is not None:
+            entry.update(approach)
+        approaches.append(entry)
+
+    result = {
+        "flights": len(flights),
+        "threshold": threshold,
+        "approaches": approaches[:limit],
+    }
+    if threshold is not None:
+        result["flightsBelow"] = len(approaches)
+        result["pointsBelow"] = sum(a.get("pointsBelow", 0) for a in approaches)
+    return result
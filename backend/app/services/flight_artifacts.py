@@ -0,0 +1,136 @@
+# backend/app/services/flight_artifacts.py
+# This file provides the binary columnar artifact that the background processing step stores next to each
+# uploaded file, so the read endpoints do not have to parse the raw CSV/JSON again.
+# The following functionalities are implemented:
+#
+# 1. Artifact Layout:
+# - The artifact is a single NumPy `.npy` file holding a structured array with one field per column
+#   (`timestamp` as fixed-width bytes, `seconds`, `latitude`, `longitude`, `altitude`, `distance` as float64).
+# - It is stored as `{stem}_columns.v{ARTIFACT_VERSION}.npy` next to the source file. Bumping
+#   `ARTIFACT_VERSION` makes older artifacts invisible, so they are rebuilt or bypassed.
+#
+# 2. Writing:
+# - `write_artifact(source_path, columns)` writes to a uniquely named temporary file and renames it into place, so
+#   readers never see a partially written artifact and files sharing a blob can be processed concurrently.
+#
+# 3. LOD Pyramids:
+# - `write_lod(source_path, lod)` stores the level-of-detail index arrays of `downsampling.build_lod` as
+#   `{stem}_lod.v{ARTIFACT_VERSION}.npz`; `load_lod(source_path)` reads them back (None if missing or stale).
+#
+# 4. Reading:
+# - `load_artifact(source_path)` memory-maps the artifact and returns `FlightColumns` whose arrays are views
+#   into the mapping (no copy, pages are loaded on demand).
+# - It returns None when the artifact is missing, older than the source file, or unreadable, so callers
+#   can fall back to parsing the raw file.
+import os
+import logging
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+from .flight_columns import FlightColumns, parse_timestamps
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1
+
+_FLOAT_FIELDS = ("seconds", "latitude", "longitude", "altitude", "distance")
+
+
+def artifact_path(source_path: Path) -> Path:
+    """Get the artifact path belonging to a source file."""
+    source_path = Path(source_path)
+    return source_path.with_name(f"{source_path.stem}_columns.v{ARTIFACT_VERSION}.npy")
+
+
+def write_artifact(source_path: Path, columns: FlightColumns) -> Path:
+    """Write the columnar artifact of a source file atomically."""
+    timestamps = np.char.encode(columns.timestamp_strings(), "ascii")
+    dtype = [("timestamp", timestamps.dtype)] + [
+        (name, "<f8") for name in _FLOAT_FIELDS
+    ]
+
+    table = np.empty(len(columns), dtype=dtype)
+    table["timestamp"] = timestamps
+    for name in _FLOAT_FIELDS:
+        table[name] = getattr(columns, name)
+
+    path = artifact_path(source_path)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, table, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+    logger.debug(f"Wrote artifact {path.name} ({len(columns)} rows)")
+    return path
+
+
+def load_artifact(source_path: Path) -> Optional[FlightColumns]:
+    """Memory-map the artifact of a source file, or None if missing or stale."""
+    source_path = Path(source_path)
+    path = artifact_path(source_path)
+
+    try:
+        if path.stat().st_mtime_ns < source_path.stat().st_mtime_ns:
+            logger.debug(f"Artifact {path.name} is stale")
+            return None
+
+        table = np.load(path, mmap_mode="r", allow_pickle=False)
+        if table.dtype.names != ("timestamp",) + _FLOAT_FIELDS:
+            logger.warning(f"Artifact {path.name} has an unexpected layout")
+            return None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read artifact {path.name}: {e}")
+        return None
+
+    start_second = (
+        int(parse_timestamps(table["timestamp"][:1].astype(str))[0])
+        if len(table)
+        else 0
+    )
+    return FlightColumns(
+        timestamps=table["timestamp"],
+        seconds=table["seconds"],
+        latitude=table["latitude"],
+        longitude=table["longitude"],
+        altitude=table["altitude"],
+        distance=table["distance"],
+        start_second=start_second,
+    )
+
+
+def lod_path(source_path: Path) -> Path:
+    """Get the LOD pyramid path belonging to a source file."""
+    source_path = Path(source_path)
+    return source_path.with_name(f"{source_path.stem}_lod.v{ARTIFACT_VERSION}.npz")
+
+
+def write_lod(source_path: Path, lod: Dict[str, np.ndarray]) -> Path:
+    """Write the LOD pyramid of a source file atomically."""
+    path = lod_path(source_path)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **lod)
+    os.replace(tmp_path, path)
+
+    logger.debug(f"Wrote LOD pyramid {path.name} ({', '.join(lod)})")
+    return path
+
+
+def load_lod(source_path: Path) -> Optional[Dict[str, np.ndarray]]:
+    """Read the LOD pyramid of a source file, or None if missing or stale."""
+    source_path = Path(source_path)
+    path = lod_path(source_path)
+
+    try:
+        if path.stat().st_mtime_ns < source_path.stat().st_mtime_ns:
+            return None
+        with np.load(path, allow_pickle=False) as archive:
+            return {name: archive[name] for name in archive.files}
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read LOD pyramid {path.name}: {e}")
+        return None
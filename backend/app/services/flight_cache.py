@@ -0,0 +1,112 @@
+# backend/app/services/flight_cache.py
+# This file provides an in-process cache for parsed flights, so repeated requests for the same file
+# do not re-read the file and re-calculate its metrics.
+# The following functionalities are implemented:
+#
+# 1. Cache Entries:
+# - Entries are keyed by file ID and carry a signature of the source file (modification time and size).
+# - A lookup with a different signature is treated as a miss and drops the outdated entry.
+#
+# 2. Eviction:
+# - The cache is bounded both by the number of entries (`settings.FLIGHT_CACHE_MAX_ENTRIES`) and by the
+#   estimated memory footprint of the cached values (`settings.FLIGHT_CACHE_MAX_BYTES`).
+# - The least recently used entries are evicted first. Values larger than the byte budget are not cached.
+#
+# 3. Invalidation and Statistics:
+# - `invalidate(file_id)` removes an entry, e.g. when the file is deleted.
+# - `stats()` reports hits, misses, evictions and the current size of the cache.
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from ..core.config import settings
+
+Signature = Tuple[int, int]
+
+
+def file_signature(file_path: Path) -> Signature:
+    """Get the (mtime_ns, size) signature of a file."""
+    stat = file_path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FlightCache:
+    """Size-bounded LRU cache for parsed flights."""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Signature, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_id: str, signature: Signature) -> Optional[Any]:
+        """Get a cached value if it matches the file signature."""
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is None or entry[0] != signature:
+                if entry is not None:
+                    self._remove(file_id)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(file_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, file_id: str, signature: Signature, value: Any, nbytes: int) -> None:
+        """Store a value, evicting least recently used entries as needed."""
+        if self.max_entries <= 0 or nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if file_id in self._entries:
+                self._remove(file_id)
+
+            self._entries[file_id] = (signature, value, nbytes)
+            self._bytes += nbytes
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, file_id: str) -> None:
+        """Drop the entry of a file, if cached."""
+        with self._lock:
+            if file_id in self._entries:
+                self._remove(file_id)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, file_id: str) -> None:
+        _, _, nbytes = self._entries.pop(file_id)
+        self._bytes -= nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+            }
+
+
+flight_cache = FlightCache(
+    max_bytes=settings.FLIGHT_CACHE_MAX_BYTES,
+    max_entries=settings.FLIGHT_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,360 @@
+# backend/app/services/flight_columns.py
+# This file provides the columnar representation of a flight and the vectorized metrics engine.
+# The following functionalities are implemented:
+#
+# 1. Columnar Flight Data:
+# - `FlightColumns` holds one NumPy array per field instead of one nested dictionary per record:
+#   - `timestamps`: The original HH:MM:SS strings (str or ASCII bytes, e.g. when memory-mapped from an artifact).
+#   - `seconds`: Seconds since the first record (float64).
+#   - `latitude`, `longitude`, `altitude`, `distance`: GPS and radar values (float64).
+#   - `start_second`: Seconds since midnight of the first record.
+# - `FlightColumns.from_records(records)` builds the columns from the record dictionaries used by the API.
+# - `to_records(fields)` converts the columns back into record dictionaries, optionally projected onto a subset
+#   of the dotted paths in `RECORD_FIELDS` (e.g. only `gps.altitude`).
+# - `window(start_second, end_second)` finds the records of a time window with a binary search over the
+#   (chronological) seconds column; `take(index)` selects records without copying when given a slice.
+#
+# 2. Timestamp Parsing:
+# - `parse_timestamps(timestamps)` converts HH:MM:SS strings into seconds since midnight in one pass.
+#   - Zero-padded timestamps are decoded directly from their character codes.
+#   - Other layouts (e.g. `9:05:00`) fall back to `pandas.to_timedelta`.
+#
+# 3. Metrics Calculation:
+# - `calculate_summary(columns)` computes the whole-flight `flightMetrics` and `summary` with array operations.
+# - `build_time_series(columns, flight_metrics)` builds the `timeSeries` points for any subset of a flight;
+#   durations stay relative to the flight start and normalization uses the whole flight's range.
+# - `time_series_columns(columns, flight_metrics)` returns the same values column by column, for the columnar
+#   response formats (`flight_encoding.py`).
+# - `calculate_metrics(columns)` combines both. The output matches the `flightMetrics`/`timeSeries`/`summary`
+#   schema of the data endpoint, including durations in minutes rounded to two decimals.
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+# Dotted record paths and the column attribute holding them
+RECORD_FIELDS = {
+    "timestamp": "timestamps",
+    "gps.latitude": "latitude",
+    "gps.longitude": "longitude",
+    "gps.altitude": "altitude",
+    "radar.distance": "distance",
+}
+
+
+def parse_timestamps(timestamps: Sequence[str]) -> np.ndarray:
+    """Convert HH:MM:SS strings into seconds since midnight (int64)."""
+    values = np.asarray(timestamps, dtype=str)
+    if values.size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if values.dtype.itemsize == 8 * 4 and np.all(np.char.str_len(values) == 8):
+        # Fixed-width "HH:MM:SS": read the digits straight from the UCS-4 code points
+        codes = values.view(np.uint32).reshape(-1, 8).astype(np.int64) - ord("0")
+        separators = codes[:, [2, 5]] == ord(":") - ord("0")
+        digits = codes[:, [0, 1, 3, 4, 6, 7]]
+        if separators.all() and ((digits >= 0) & (digits <= 9)).all():
+            hours = codes[:, 0] * 10 + codes[:, 1]
+            minutes = codes[:, 3] * 10 + codes[:, 4]
+            seconds = codes[:, 6] * 10 + codes[:, 7]
+            return hours * 3600 + minutes * 60 + seconds
+
+    deltas = pd.to_timedelta(pd.Series(values), errors="raise")
+    return (deltas.dt.total_seconds().to_numpy()).astype(np.int64)
+
+
+@dataclass
+class FlightColumns:
+    """Flight data stored as one array per field."""
+
+    timestamps: np.ndarray
+    seconds: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    altitude: np.ndarray
+    distance: np.ndarray
+    start_second: int = 0
+
+    def __len__(self) -> int:
+        return len(self.seconds)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the column arrays."""
+        return sum(
+            column.nbytes
+            for column in (
+                self.timestamps,
+                self.seconds,
+                self.latitude,
+                self.longitude,
+                self.altitude,
+                self.distance,
+            )
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        timestamps: Sequence[str],
+        latitude: Sequence[float],
+        longitude: Sequence[float],
+        altitude: Sequence[float],
+        distance: Sequence[float],
+    ) -> "FlightColumns":
+        """Build columns from per-field sequences."""
+        timestamps = np.asarray(timestamps, dtype=str)
+        seconds_of_day = parse_timestamps(timestamps)
+        start_second = int(seconds_of_day[0]) if len(seconds_of_day) else 0
+        return cls(
+            timestamps=timestamps,
+            seconds=(seconds_of_day - start_second).astype(np.float64),
+            latitude=np.asarray(latitude, dtype=np.float64),
+            longitude=np.asarray(longitude, dtype=np.float64),
+            altitude=np.asarray(altitude, dtype=np.float64),
+            distance=np.asarray(distance, dtype=np.float64),
+            start_second=start_second,
+        )
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> "FlightColumns":
+        """Build columns from record dictionaries."""
+        return cls.from_arrays(
+            [str(d["timestamp"]) for d in records],
+            [d["gps"]["latitude"] for d in records],
+            [d["gps"]["longitude"] for d in records],
+            [d["gps"]["altitude"] for d in records],
+            [d["radar"]["distance"] for d in records],
+        )
+
+    def to_records(self, fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Convert the columns back into record dictionaries.
+
+        `fields` restricts the records to the given dotted paths of RECORD_FIELDS.
+        """
+        if fields is not None:
+            return self._project_records(fields)
+
+        return [
+            {
+                "timestamp": timestamp,
+                "gps": {"latitude": lat, "longitude": lon, "altitude": alt},
+                "radar": {"distance": dist},
+            }
+            for timestamp, lat, lon, alt, dist in zip(
+                self.timestamp_strings().tolist(),
+                self.latitude.tolist(),
+                self.longitude.tolist(),
+                self.altitude.tolist(),
+                self.distance.tolist(),
+            )
+        ]
+
+    def _project_records(self, fields: Sequence[str]) -> List[dict]:
+        """Build records containing only the selected fields."""
+        paths = [path for path in RECORD_FIELDS if path in fields]
+        keys = [tuple(path.split(".")) for path in paths]
+        values = [
+            (
+                self.timestamp_strings()
+                if path == "timestamp"
+                else getattr(self, RECORD_FIELDS[path])
+            ).tolist()
+            for path in paths
+        ]
+
+        records = []
+        for row in zip(*values):
+            record = {}
+            for key, value in zip(keys, row):
+                if len(key) == 1:
+                    record[key[0]] = value
+                else:
+                    record.setdefault(key[0], {})[key[1]] = value
+            records.append(record)
+        return records
+
+    def timestamp_at(self, index: int) -> str:
+        """Timestamp of a single record as str."""
+        value = self.timestamps[index]
+        return value.decode("ascii") if isinstance(value, bytes) else str(value)
+
+    def take(self, index: Union[slice, np.ndarray]) -> "FlightColumns":
+        """Select records by slice (views) or index array (copies)."""
+        return FlightColumns(
+            timestamps=self.timestamps[index],
+            seconds=self.seconds[index],
+            latitude=self.latitude[index],
+            longitude=self.longitude[index],
+            altitude=self.altitude[index],
+            distance=self.distance[index],
+            start_second=self.start_second,
+        )
+
+    @cached_property
+    def is_sorted(self) -> bool:
+        """Whether the records are in chronological order."""
+        return bool(np.all(self.seconds[1:] >= self.seconds[:-1]))
+
+    def window(
+        self, start_second: Optional[int] = None, end_second: Optional[int] = None
+    ) -> Union[slice, np.ndarray]:
+        """Select records between two times of day (seconds since midnight, inclusive).
+
+        Chronological flights are searched with a binary search and yield a slice;
+        unordered flights fall back to a boolean mask and yield an index array.
+        """
+        low = -np.inf if start_second is None else start_second - self.start_second
+        high = np.inf if end_second is None else end_second - self.start_second
+
+        if self.is_sorted:
+            lo = int(np.searchsorted(self.seconds, low, side="left"))
+            hi = int(np.searchsorted(self.seconds, high, side="right"))
+            return slice(lo, max(lo, hi))
+
+        return np.flatnonzero((self.seconds >= low) & (self.seconds <= high))
+
+    def timestamp_strings(self) -> np.ndarray:
+        """Timestamps as a str array, decoding byte strings if needed."""
+        if self.timestamps.dtype.kind == "S":
+            return self.timestamps.astype(str)
+        return np.asarray(self.timestamps, dtype=str)
+
+    def minutes(self) -> np.ndarray:
+        """Minutes since midnight of every record."""
+        seconds_of_day = self.seconds.astype(np.int64) + self.start_second
+        # Same operation order as hour * 60 + minute + second / 60
+        return (seconds_of_day // 60).astype(np.float64) + (seconds_of_day % 60) / 60
+
+
+def _sequential_sum(values: np.ndarray) -> float:
+    """Left-to-right sum, identical to Python's sum() on the same floats."""
+    return float(np.cumsum(values)[-1])
+
+
+def _normalize(values: np.ndarray, minimum: float, maximum: float) -> list:
+    """Scale values to [0, 1]; constant series map to 0."""
+    if maximum == minimum:
+        return [0] * len(values)
+    return _normalize_array(values, minimum, maximum).tolist()
+
+
+def _normalize_array(values: np.ndarray, minimum: float, maximum: float) -> np.ndarray:
+    if maximum == minimum:
+        return np.zeros(len(values))
+    return (values - minimum) / (maximum - minimum)
+
+
+def calculate_summary(columns: FlightColumns) -> Dict:
+    """Calculate the flight metrics and summary of the whole flight."""
+    if len(columns) == 0:
+        raise ValueError("No data provided")
+
+    altitude = columns.altitude
+    distance = columns.distance
+
+    minutes = columns.minutes()
+    total_duration = float(minutes[-1] - minutes[0])
+
+    max_altitude = float(altitude.max())
+    min_altitude = float(altitude.min())
+    avg_altitude = _sequential_sum(altitude) / len(altitude)
+    max_distance = float(distance.max())
+    min_distance = float(distance.min())
+    avg_distance = _sequential_sum(distance) / len(distance)
+
+    return {
+        "flightMetrics": {
+            "duration": round(total_duration, 2),
+            "maxAltitude": max_altitude,
+            "minAltitude": min_altitude,
+            "avgAltitude": round(avg_altitude, 2),
+            "maxDistance": max_distance,
+            "minDistance": min_distance,
+            "avgDistance": round(avg_distance, 2),
+            "totalPoints": len(columns),
+            "startTime": columns.timestamp_at(0),
+            "endTime": columns.timestamp_at(-1),
+        },
+        "summary": {
+            "altitude": {
+                "max": max_altitude,
+                "min": min_altitude,
+                "avg": round(avg_altitude, 2),
+                "change": round(float(altitude[-1] - altitude[0]), 2),
+            },
+            "radar": {
+                "max": max_distance,
+                "min": min_distance,
+                "avg": round(avg_distance, 2),
+                "change": round(float(distance[-1] - distance[0]), 2),
+            },
+        },
+    }
+
+
+def _durations(columns: FlightColumns) -> np.ndarray:
+    """Minutes since the start of the flight (also for windows), rounded to two decimals."""
+    start_minutes = columns.start_second // 60 + (columns.start_second % 60) / 60
+    return np.round(columns.minutes() - start_minutes, 2)
+
+
+def time_series_columns(
+    columns: FlightColumns, flight_metrics: Dict
+) -> Dict[str, np.ndarray]:
+    """The numeric `timeSeries` fields as columns instead of points."""
+    return {
+        "duration": _durations(columns),
+        "altitude": columns.altitude,
+        "distance": columns.distance,
+        "normalizedAltitude": _normalize_array(
+            columns.altitude,
+            flight_metrics["minAltitude"],
+            flight_metrics["maxAltitude"],
+        ),
+        "normalizedDistance": _normalize_array(
+            columns.distance,
+            flight_metrics["minDistance"],
+            flight_metrics["maxDistance"],
+        ),
+    }
+
+
+def build_time_series(columns: FlightColumns, flight_metrics: Dict) -> List[dict]:
+    """Build time series points, normalized against the whole flight's range."""
+    altitude = columns.altitude
+    distance = columns.distance
+
+    return [
+        {
+            "duration": duration,
+            "altitude": alt,
+            "distance": dist,
+            "normalizedAltitude": norm_alt,
+            "normalizedDistance": norm_dist,
+            "time": timestamp,
+        }
+        for duration, alt, dist, norm_alt, norm_dist, timestamp in zip(
+            _durations(columns).tolist(),
+            altitude.tolist(),
+            distance.tolist(),
+            _normalize(
+                altitude, flight_metrics["minAltitude"], flight_metrics["maxAltitude"]
+            ),
+            _normalize(
+                distance, flight_metrics["minDistance"], flight_metrics["maxDistance"]
+            ),
+            columns.timestamp_strings().tolist(),
+        )
+    ]
+
+
+def calculate_metrics(columns: FlightColumns) -> Dict:
+    """Calculate all metrics for the dataset."""
+    summary = calculate_summary(columns)
+    return {
+        "flightMetrics": summary["flightMetrics"],
+        "timeSeries": build_time_series(columns, summary["flightMetrics"]),
+        "summary": summary["summary"],
+    }
@@ -0,0 +1,133 @@
+# backend/app/services/flight_comparison.py
+# This file provides the server-side alignment of several flights for side-by-side comparison.
+# The following functionalities are implemented:
+#
+# 1. Common Grid:
+# - `align="elapsed"`: flights are compared by seconds since their first record, on a grid from 0 to the duration
+#   of the longest flight. Grid points after the end of a shorter flight are `null` for that flight.
+# - `align="progress"`: flights are compared by the fraction of their own duration (0 to 1), so flights of
+#   different length are stretched onto each other.
+#
+# 2. Resampling:
+# - Altitude and radar distance of every flight are resampled onto the grid with linear interpolation
+#   (`np.interp`), one vectorized call per column, so the cost depends on the flight size only once.
+#
+# 3. Deltas:
+# - The first flight is the reference. For every other flight, the aligned altitude and distance differences to
+#   the reference, their root-mean-square over the overlapping grid points and the differences of the
+#   whole-flight metrics (`flightMetrics`) are returned.
+#
+# This module lets comparison views render aligned, downsampled columns instead of aligning full datasets in the browser.
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .flight_columns import FlightColumns
+
+logger = logging.getLogger(__name__)
+
+ALIGN_MODES = ("elapsed", "progress")
+MAX_COMPARED_FLIGHTS = 8
+
+# Whole-flight metrics whose differences are reported
+DELTA_METRICS = (
+    "duration",
+    "maxAltitude",
+    "minAltitude",
+    "avgAltitude",
+    "maxDistance",
+    "minDistance",
+    "avgDistance",
+    "totalPoints",
+)
+
+
+def _to_list(values: np.ndarray) -> List[Optional[float]]:
+    """Round a column for JSON and turn missing values into None."""
+    return [None if v != v else v for v in np.round(values, 3).tolist()]
+
+
+def _sorted_columns(
+    columns: FlightColumns,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Seconds, altitude and distance in chronological order."""
+    if columns.is_sorted:
+        return columns.seconds, columns.altitude, columns.distance
+    order = np.argsort(columns.seconds, kind="stable")
+    return columns.seconds[order], columns.altitude[order], columns.distance[order]
+
+
+def _rmse(delta: np.ndarray) -> Optional[float]:
+    """Root-mean-square of a delta column over the grid points both flights cover."""
+    overlap = delta[~np.isnan(delta)]
+    if len(overlap) == 0:
+        return None
+    return round(float(np.sqrt(np.mean(overlap**2))), 3)
+
+
+def compare_flights(
+    flights: List[Tuple[Dict, FlightColumns, Dict]], points: int, align: str
+) -> Dict:
+    """Resample flights onto a common grid. Takes (file record, columns, flightMetrics) per flight."""
+    resolved = [_sorted_columns(columns) for _, columns, _ in flights]
+    durations = [float(seconds[-1] - seconds[0]) for seconds, _, _ in resolved]
+
+    if align == "progress":
+        grid = np.linspace(0.0, 1.0, points)
+    else:
+        grid = np.linspace(0.0, max(durations), points)
+
+    aligned = []
+    for (seconds, altitude, distance), duration in zip(resolved, durations):
+        if align == "progress":
+            # Stretch each flight onto its own duration
+            at = seconds[0] + grid * duration
+            left = right = None
+        else:
+            at = seconds[0] + grid
+            left = right = np.nan
+        aligned.append(
+            (
+                np.interp(at, seconds, altitude, left=left, right=right),
+                np.interp(at, seconds, distance, left=left, right=right),
+            )
+        )
+
+    reference_altitude, reference_distance = aligned[0]
+    reference_metrics = flights[0][2]
+
+    results = []
+    for (record, columns, metrics), (altitude, distance), duration in zip(
+        flights, aligned, durations
+    ):
+        result = {
+            "id": record["id"],
+            "filename": record["filename"],
+            "durationSeconds": duration,
+            "points": len(columns),
+            "altitude": _to_list(altitude),
+            "distance": _to_list(distance),
+            "flightMetrics": metrics,
+            "deltas": None,
+        }
+        if results:
+            altitude_delta = altitude - reference_altitude
+            distance_delta = distance - reference_distance
+            result["deltas"] = {
+                "altitude": _to_list(altitude_delta),
+                "distance": _to_list(distance_delta),
+                "altitudeRmse": _rmse(altitude_delta),
+                "distanceRmse": _rmse(distance_delta),
+                "flightMetrics": {
+                    key: round(metrics[key] - reference_metrics[key], 3)
+                    for key in DELTA_METRICS
+                    if key in metrics and key in reference_metrics
+                },
+            }
+        results.append(result)
+
+    return {
+        "align": align,
+        "reference": flights[0][0]["id"],
+        "grid": np.round(grid, 4 if align == "progress" else 3).tolist(),
+        "flights": results,
+    }
@@ -0,0 +1,147 @@
+# backend/app/services/flight_encoding.py
+# This file provides the response encodings of the data endpoint and their content negotiation.
+# The following functionalities are implemented:
+#
+# 1. Formats:
+# - **records** (`application/json`, the default): `data` and `timeSeries` as arrays of objects, one per row.
+# - **columns** (`application/vnd.drone.columns+json`): `data` and `timeSeries` as objects of arrays
+#   (`{"altitude": [...], ...}`), so key names are not repeated on every row.
+# - **binary** (`application/vnd.drone.columns`): the columnar document with every array stored as raw
+#   little-endian typed array (float64, timestamps as int32 seconds since midnight), which the browser reads with
+#   `Float64Array`/`Int32Array` views without parsing numbers (see `frontend/src/api/client.ts`):
+#   - bytes 0-3: magic `DRC1`; bytes 4-7: uint32 length of the JSON header (padded to 8 bytes)
+#   - JSON header: the document, with every array replaced by `{"$array": dtype, "offset": n, "length": n}`
+#   - array data: offsets relative to the end of the header, each array aligned to 8 bytes
+# - JSON is encoded with `orjson` (with native NumPy array support) when it is installed, `json` otherwise.
+#
+# 2. Content Negotiation:
+# - `negotiate(accept, format)` picks the format from the `format` query parameter or the `Accept` header
+#   (highest quality first); anything else gets the records format.
+import json
+import struct
+from typing import Dict, Optional, Sequence
+import numpy as np
+from .flight_columns import RECORD_FIELDS, FlightColumns, time_series_columns
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up
+    orjson = None
+
+MEDIA_RECORDS = "application/json"
+MEDIA_COLUMNS = "application/vnd.drone.columns+json"
+MEDIA_BINARY = "application/vnd.drone.columns"
+FORMATS = {"records": MEDIA_RECORDS, "columns": MEDIA_COLUMNS, "binary": MEDIA_BINARY}
+
+BINARY_MAGIC = b"DRC1"
+BINARY_DTYPES = {"f": ("float64", "<f8"), "i": ("int32", "<i4"), "u": ("int32", "<i4")}
+ALIGNMENT = 8
+
+
+def negotiate(accept: Optional[str], format: Optional[str] = None) -> str:
+    """Media type of the response, from the format parameter or the Accept header."""
+    if format is not None:
+        return FORMATS[format]
+
+    best, best_quality = MEDIA_RECORDS, 0.0
+    for entry in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        if media_type not in FORMATS.values():
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def _timestamps(columns: FlightColumns, binary: bool) -> np.ndarray:
+    if binary:
+        return (columns.seconds.astype(np.int64) + columns.start_second).astype(
+            np.int32
+        )
+    return columns.timestamp_strings()
+
+
+def data_columns(
+    columns: FlightColumns, projection: Optional[Sequence[str]], binary: bool
+) -> Dict[str, np.ndarray]:
+    """The records of a page as columns, keyed by field name (e.g. `latitude`)."""
+    data = {}
+    for path, attribute in RECORD_FIELDS.items():
+        if projection is not None and path not in projection:
+            continue
+        if path == "timestamp":
+            data["timestamp"] = _timestamps(columns, binary)
+        else:
+            data[attribute] = getattr(columns, attribute)
+    return data
+
+
+def series_columns(
+    columns: FlightColumns, flight_metrics: Dict, binary: bool
+) -> Dict[str, np.ndarray]:
+    """The `timeSeries` of a page as columns."""
+    return {
+        **time_series_columns(columns, flight_metrics),
+        "time": _timestamps(columns, binary),
+    }
+
+
+def _default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def encode_json(content) -> bytes:
+    """Encode a document as JSON; NumPy arrays are written as lists."""
+    if orjson is not None:
+        return orjson.dumps(
+            content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def _pad(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def encode_binary(content) -> bytes:
+    """Encode a document with its arrays as raw typed arrays."""
+    buffers = []
+    offset = 0
+
+    def describe(value):
+        nonlocal offset
+        if isinstance(value, np.ndarray):
+            name, dtype = BINARY_DTYPES[value.dtype.kind]
+            data = np.ascontiguousarray(value, dtype=dtype).tobytes()
+            buffers.append(data + bytes(_pad(len(data))))
+            descriptor = {"$array": name, "offset": offset, "length": len(value)}
+            offset += len(buffers[-1])
+            return descriptor
+        if isinstance(value, dict):
+            return {key: describe(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [describe(item) for item in value]
+        return value
+
+    header = encode_json(describe(content))
+    # Pad with JSON whitespace, so the array data starts aligned
+    header += b" " * _pad(len(BINARY_MAGIC) + 4 + len(header))
+    return b"".join([BINARY_MAGIC, struct.pack("<I", len(header)), header, *buffers])
+
+
+def encode(content, media_type: str) -> bytes:
+    """Encode a response document in the negotiated format."""
+    if media_type == MEDIA_BINARY:
+        return encode_binary(content)
+    return encode_json(content)
@@ -0,0 +1,83 @@
+# backend/app/services/flight_export.py
+# This file provides streaming writers for exporting flights as CSV or JSON.
+# The following functionalities are implemented:
+#
+# 1. Chunked Formatting:
+# - `iter_csv(columns, chunk_rows)` and `iter_json(columns, chunk_rows)` yield the export document piece by
+#   piece, formatting `chunk_rows` records at a time from the (memory-mapped) flight columns.
+# - Only one chunk is held in memory at a time, so memory use stays constant regardless of flight size.
+# - The output is identical to the former in-memory export:
+#   - **CSV**: header `timestamp,latitude,longitude,altitude,radar_distance`, coordinates with 4 decimals,
+#     altitude and distance rounded to integers, `\n` line endings.
+#   - **JSON**: an array formatted like `json.dumps(..., indent=2)`.
+import csv
+import json
+from io import StringIO
+from typing import Iterator
+from .flight_columns import FlightColumns
+
+CSV_HEADER = ["timestamp", "latitude", "longitude", "altitude", "radar_distance"]
+
+_JSON_ITEM = """  {{
+    "timestamp": {timestamp},
+    "gps": {{
+      "latitude": {latitude!r},
+      "longitude": {longitude!r},
+      "altitude": {altitude}
+    }},
+    "radar": {{
+      "distance": {distance}
+    }}
+  }}"""
+
+
+def _chunks(columns: FlightColumns, chunk_rows: int) -> Iterator[FlightColumns]:
+    """Split columns into consecutive chunks (views, no copy)."""
+    for start in range(0, len(columns), chunk_rows):
+        yield columns.take(slice(start, start + chunk_rows))
+
+
+def iter_csv(columns: FlightColumns, chunk_rows: int = 10000) -> Iterator[str]:
+    """Yield the CSV export of a flight in chunks."""
+    output = StringIO(newline="")
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(CSV_HEADER)
+    yield output.getvalue()
+
+    for chunk in _chunks(columns, chunk_rows):
+        output = StringIO(newline="")
+        writer = csv.writer(output, lineterminator="\n")
+        for item in chunk.to_records():
+            writer.writerow(
+                [
+                    item["timestamp"],
+                    f"{item['gps']['latitude']:.4f}",
+                    f"{item['gps']['longitude']:.4f}",
+                    str(int(round(item["gps"]["altitude"]))),
+                    str(int(round(item["radar"]["distance"]))),
+                ]
+            )
+        yield output.getvalue()
+
+
+def iter_json(columns: FlightColumns, chunk_rows: int = 10000) -> Iterator[str]:
+    """Yield the JSON export of a flight in chunks."""
+    if len(columns) == 0:
+        yield "[]"
+        return
+
+    separator = "[\n"
+    for chunk in _chunks(columns, chunk_rows):
+        items = [
+            _JSON_ITEM.format(
+                timestamp=json.dumps(item["timestamp"]),
+                latitude=round(float(item["gps"]["latitude"]), 4),
+                longitude=round(float(item["gps"]["longitude"]), 4),
+                altitude=int(round(item["gps"]["altitude"])),
+                distance=int(round(item["radar"]["distance"])),
+            )
+            for item in chunk.to_records()
+        ]
+        yield separator + ",\n".join(items)
+        separator = ",\n"
+    yield "\n]"
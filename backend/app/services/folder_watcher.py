@@ -0,0 +1,373 @@
+# backend/app/services/folder_watcher.py
+# This file provides the ingestion of flight files that are dropped into a watched folder.
+# The following functionalities are implemented:
+#
+# 1. Watching:
+# - `FolderWatcher.watch(path)` starts a `watchdog` observer on a directory (replacing the previous one) and
+#   queues an incremental scan, so files that arrived while nothing was watching are picked up as well.
+# - Created, modified and moved-in `.csv`/`.json` files are handed from the observer thread to the event loop.
+#
+# 2. Debouncing:
+# - A file is only ingested once its size and modification time stayed unchanged for
+#   `settings.FOLDER_SETTLE_SECONDS`, so logs that are still being copied into the folder are never read half-written.
+#
+# 3. Ingestion:
+# - Files go through the same pipeline as uploads: `save_upload_file` validates and stores them in a single
+#   streaming pass, and `job_queue.submit` registers them together with their processing job.
+# - Before that, the content is hashed (SHA-256); a file whose content was already ingested (uploaded or from a
+#   watched folder) is recorded as a `duplicate` of the existing file instead of being stored again. Files with the
+#   same content that are ingested at the same time share the outcome of the first; if that one is cancelled, the
+#   next one takes over.
+# - At most `settings.FOLDER_INGEST_WORKERS` files are ingested concurrently; hashing and disk I/O run in the
+#   I/O worker pool (`services/executor.py`).
+# - When a worker pool is saturated (`PoolSaturated`), the file is reported as `deferred`, not recorded, and queued
+#   again, so it is ingested once it has stayed unchanged for the settle time again.
+#
+# 4. Incremental Scans:
+# - `scan(path)` lists the directory and ingests only files whose size or modification time differ from what the
+#   metadata store remembers (`folder_files` table); every outcome is recorded there, including invalid files,
+#   so a scan of an unchanged folder does not read any file.
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from fastapi import HTTPException, UploadFile
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from ..core.config import settings
+from ..db.metadata_store import get_metadata_store
+from ..utils.file_handlers import save_upload_file
+from ..utils.file_validator import READ_CHUNK_SIZE
+from .blob_store import blob_store
+from .executor import PoolSaturated, io_pool
+from .job_queue import job_queue
+
+logger = logging.getLogger(__name__)
+
+# Outcomes recorded for seen files
+INGESTED, DUPLICATE, INVALID = "ingested", "duplicate", "invalid"
+# Outcome of a file that could not be ingested yet (not recorded)
+DEFERRED = "deferred"
+
+
+def is_flight_file(path: Path) -> bool:
+    """Check if a path has a supported flight file extension."""
+    return (
+        path.suffix.lower() in settings.ALLOWED_EXTENSIONS
+        and not path.name.startswith(".")
+    )
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def list_flight_files(directory: Path) -> Dict[str, os.stat_result]:
+    """Stat all flight files directly inside a directory."""
+    files = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and is_flight_file(Path(entry.name)):
+                files[str(Path(entry.path).resolve())] = entry.stat()
+    return files
+
+
+class FileEventHandler(FileSystemEventHandler):
+    """Forwards new and changed flight files from the observer thread to the watcher."""
+
+    def __init__(self, watcher: "FolderWatcher", loop: asyncio.AbstractEventLoop):
+        self.watcher = watcher
+        self.loop = loop
+
+    def _forward(self, path: str) -> None:
+        if is_flight_file(Path(path)):
+            self.loop.call_soon_threadsafe(self.watcher.notify, Path(path).resolve())
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._forward(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._forward(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._forward(event.dest_path)
+
+
+class FolderWatcher:
+    """Watches a directory and ingests settled flight files through the upload pipeline."""
+
+    def __init__(self, settle_seconds: float, workers: int):
+        self.settle_seconds = settle_seconds
+        self.workers = max(1, workers)
+        self.path: Optional[Path] = None
+        self._observer: Optional[Observer] = None
+        self._pending: Dict[Path, tuple] = {}
+        self._debounce_task: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # A semaphore belongs to one event loop; recreate it when the loop changes
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._slots_loop = loop
+        return self._slots
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def watch(self, path: Path) -> Path:
+        """Start watching a directory instead of the current one."""
+        path = Path(path).resolve()
+        self.stop()
+
+        observer = Observer()
+        observer.schedule(
+            FileEventHandler(self, asyncio.get_running_loop()),
+            str(path),
+            recursive=False,
+        )
+        observer.start()
+        self._observer, self.path = observer, path
+        logger.info(f"Watching {path} for flight files")
+
+        # Pick up files that arrived while the folder was not watched
+        self._spawn(self.scan(path))
+        return path
+
+    def stop(self) -> None:
+        """Stop watching; files that are already being ingested are finished."""
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join()
+        self._pending.clear()
+        if self._debounce_task is not None:
+            self._debounce_task.cancel()
+            self._debounce_task = None
+        self.path = None
+
+    def notify(self, path: Path) -> None:
+        """Queue a created or modified file; it is ingested once it stopped changing."""
+        self._pending[path] = (None, time.monotonic())
+        if self._debounce_task is None or self._debounce_task.done():
+            self._debounce_task = asyncio.create_task(self._debounce())
+
+    async def _debounce(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.settle_seconds / 2)
+            now = time.monotonic()
+            for path, (signature, since) in list(self._pending.items()):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    self._pending.pop(path, None)
+                    continue
+
+                current = (stat.st_size, stat.st_mtime_ns)
+                if current != signature:
+                    self._pending[path] = (current, now)
+                elif now - since >= self.settle_seconds:
+                    self._pending.pop(path, None)
+                    self._spawn(self.ingest(path))
+
+    async def _wait_until_settled(
+        self, path: Path, stat: os.stat_result
+    ) -> os.stat_result:
+        """Wait until a file stopped changing; files untouched for the settle time are returned at once."""
+        while time.time() - stat.st_mtime < self.settle_seconds:
+            await asyncio.sleep(self.settle_seconds / 2)
+            current = await io_pool.run(path.stat)
+            if (current.st_size, current.st_mtime_ns) == (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                return current
+            stat = current
+        return stat
+
+    async def scan(self, path: Optional[Path] = None) -> Dict:
+        """Ingest new and changed flight files of a directory, skipping files already seen."""
+        directory = Path(path).resolve() if path is not None else self.path
+        if directory is None:
+            raise ValueError("No directory to scan")
+
+        store = get_metadata_store()
+        files = await io_pool.run(list_flight_files, directory)
+        seen = await io_pool.run(store.list_folder_files, str(directory))
+
+        changed = [
+            Path(file_path)
+            for file_path, stat in files.items()
+            if file_path not in seen
+            or (seen[file_path]["size"], seen[file_path]["mtime_ns"])
+            != (stat.st_size, stat.st_mtime_ns)
+        ]
+        results = await asyncio.gather(*(self.ingest(p) for p in changed))
+
+        logger.info(
+            f"Scanned {directory}: {len(files)} files, {len(changed)} new or changed"
+        )
+        return {
+            "path": str(directory),
+            "scanned": len(files),
+            "skipped": len(files) - len(changed),
+            "files": [r for r in results if r is not None],
+        }
+
+    async def ingest(self, path: Path) -> Optional[Dict]:
+        """Validate, deduplicate and store one file from a watched folder."""
+        async with self._get_slots():
+            try:
+                entry = await self._ingest_file(path)
+            except PoolSaturated as e:
+                entry = {"path": str(path), "status": DEFERRED, "error": str(e)}
+            if entry is None:
+                return None
+
+            if entry["status"] == DEFERRED:
+                # Try again later instead of recording the file as invalid
+                logger.warning(f"Deferred ingestion of {path}: {entry['error']}")
+                self.notify(path)
+            elif entry["status"] == INVALID:
+                logger.warning(f"Skipped invalid file {path}: {entry['error']}")
+
+            return {
+                "path": entry["path"],
+                "status": entry["status"],
+                "id": entry.get("file_id"),
+                "error": entry.get("error"),
+            }
+
+    async def _ingest_file(self, path: Path) -> Optional[Dict]:
+        try:
+            stat = await io_pool.run(path.stat)
+            stat = await self._wait_until_settled(path, stat)
+        except FileNotFoundError:
+            return None
+
+        entry = {
+            "path": str(path),
+            "directory": str(path.parent),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        try:
+            entry["hash"] = await io_pool.run(hash_file, path)
+        except FileNotFoundError:
+            return None
+        entry.update(await self._ingest_once(path, entry["hash"]))
+
+        if entry["status"] != DEFERRED:
+            await io_pool.run(get_metadata_store().record_folder_file, entry)
+        return entry
+
+    async def _ingest_once(self, path: Path, content_hash: str) -> Dict:
+        # A file with the same content is already being ingested: share its outcome
+        first = self._in_flight.get(content_hash)
+        if first is not None:
+            try:
+                outcome = await asyncio.shield(first)
+            except asyncio.CancelledError:
+                if not first.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The first ingest was cancelled before it finished: take over
+                return await self._ingest_once(path, content_hash)
+            if outcome["status"] in (INVALID, DEFERRED):
+                return outcome
+            return {"status": DUPLICATE, "file_id": outcome["file_id"]}
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[content_hash] = future
+        try:
+            outcome = await self._ingest_outcome(path, content_hash)
+            future.set_result(outcome)
+            return outcome
+        finally:
+            self._in_flight.pop(content_hash, None)
+            if not future.done():
+                # Cancelled: wake up the ingests waiting for this one
+                future.cancel()
+
+    async def _ingest_outcome(self, path: Path, content_hash: str) -> Dict:
+        try:
+            return await self._ingest_content(path, content_hash)
+        except PoolSaturated as e:
+            return {"status": DEFERRED, "error": str(e)}
+        except HTTPException as e:
+            return {"status": INVALID, "error": e.detail}
+        except Exception as e:
+            logger.error(f"Error ingesting {path}: {e}", exc_info=True)
+            return {"status": INVALID, "error": str(e)}
+
+    async def _ingest_content(self, path: Path, content_hash: str) -> Dict:
+        existing = await io_pool.run(get_metadata_store().find_by_hash, content_hash)
+        if existing is not None:
+            logger.info(f"{path.name} is a duplicate of file {existing['id']}")
+            return {"status": DUPLICATE, "file_id": existing["id"]}
+
+        # Same validation and storage as an upload
+        source = await io_pool.run(open, path, "rb")
+        try:
+            file_path, saved_size, saved_hash = await save_upload_file(
+                UploadFile(file=source, filename=path.name)
+            )
+        finally:
+            await io_pool.run(source.close)
+
+        record = {
+            "filename": path.name,
+            "timestamp": datetime.now().isoformat(),
+            "path": str(file_path),
+            "id": str(uuid.uuid4()),
+            "status": "pending",
+            "size": saved_size,
+            "hash": saved_hash,
+        }
+        try:
+            await job_queue.submit([record])
+        finally:
+            blob_store.unpin(file_path)
+        logger.info(f"Ingested {path.name} as file {record['id']}")
+        return {"status": INGESTED, "file_id": record["id"]}
+
+    def stats(self) -> Dict:
+        """Watched directory and files waiting to settle or being ingested."""
+        return {
+            "path": str(self.path) if self.path is not None else None,
+            "watching": self._observer is not None,
+            "settling": len(self._pending),
+            "ingesting": len(self._tasks),
+        }
+
+    async def close(self) -> None:
+        """Stop watching and cancel ingestion still in progress."""
+        self.stop()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+folder_watcher = FolderWatcher(
+    settle_seconds=settings.FOLDER_SETTLE_SECONDS,
+    workers=settings.FOLDER_INGEST_WORKERS,
+)
@@ -0,0 +1,75 @@
+# backend/app/services/http_cache.py
+# This file provides the HTTP caching of the data, export and file-list endpoints: entity tags, `Cache-Control`
+# and conditional requests.
+# The following functionalities are implemented:
+#
+# 1. Entity Tags:
+# - Uploaded flights never change, so the responses of the data and export endpoints are identified by the content
+#   of the file (its SHA-256 content hash; size and modification time for files stored before content hashing), the
+#   processing version (`PROCESSING_VERSION`: the artifact version plus `RESPONSE_VERSION`) and the variant of the
+#   request (query parameters, media type, content encoding): `flight_etag(record, *variant)`.
+# - The file list is identified by the revision of the metadata store (`MetadataStore.revision()`), which changes
+#   with every insert, update or delete of a file or track, plus the query.
+# - Entity tags are strong (`"<hex digest>"`), as equal tags mean byte-identical responses.
+#
+# 2. Conditional Requests:
+# - `is_not_modified(request, etag)` matches the `If-None-Match` header (a list of tags or `*`; weak tags are compared
+#   weakly, as required for `GET`), and `not_modified(headers)` builds the `304 Not Modified` response, so a
+#   repeated load costs a metadata lookup instead of reading and serializing the flight.
+# - `cache_headers(etag, max_age)` returns the `ETag` and `Cache-Control` headers: `private, no-cache` (clients
+#   store the response but revalidate it on every use) or `private, max-age=N` with `settings.HTTP_CACHE_MAX_AGE`.
+import hashlib
+from pathlib import Path
+from typing import Dict
+from fastapi import Request, Response
+from .flight_artifacts import ARTIFACT_VERSION
+from .flight_cache import file_signature
+
+# Bump when the data or export responses change for the same file content
+RESPONSE_VERSION = 1
+PROCESSING_VERSION = f"{ARTIFACT_VERSION}.{RESPONSE_VERSION}"
+
+
+def content_version(record: Dict) -> str:
+    """Identifies the stored content of a file record."""
+    if record.get("hash"):
+        return record["hash"]
+    mtime_ns, size = file_signature(Path(record["path"]))
+    return f"{size}-{mtime_ns}"
+
+
+def entity_tag(*parts) -> str:
+    """Strong entity tag of the given parts."""
+    digest = hashlib.sha256("\0".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def flight_etag(record: Dict, *variant) -> str:
+    """Entity tag of a response derived from a file's content."""
+    return entity_tag(content_version(record), PROCESSING_VERSION, *variant)
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match header matches the entity tag."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or _opaque(etag) in {_opaque(tag) for tag in tags}
+
+
+def cache_headers(etag: str, max_age: int = 0) -> Dict[str, str]:
+    """ETag and Cache-Control headers of a cacheable response."""
+    cache_control = (
+        f"private, max-age={max_age}" if max_age > 0 else "private, no-cache"
+    )
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """A 304 Not Modified response with the headers of the full response."""
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,112 @@
+# backend/app/services/ingestion.py
+# This file provides the single reader for uploaded flight files (CSV and JSON).
+# The following functionalities are implemented:
+#
+# 1. CSV Parsing:
+# - `read_csv_columns(file_path)` parses the file with the pandas C engine, reading only the required columns
+#   with explicit dtypes (`CSV_DTYPES`), so no type inference or per-row Python work is involved.
+#
+# 2. JSON Parsing:
+# - `read_json_columns(file_path)` decodes the file with `orjson` when it is installed (falling back to the
+#   standard `json` module) and extracts each field into a NumPy column in one pass per field.
+# - A single top-level object is treated as a flight with one record.
+#
+# 3. Entry Points:
+# - `read_flight(file_path) -> FlightColumns` selects the parser by file extension. Every reader of flight files
+#   (processing, the data endpoints and the `DroneData` parsers in `utils/file_handlers.py`) goes through it.
+# - `read_records(file_path) -> List[dict]` returns the flight as record dictionaries
+#   (`{"timestamp", "gps": {...}, "radar": {...}}`) for callers that need that shape.
+# - Unsupported extensions and malformed content raise a `ValueError` with details.
+import json
+import logging
+from pathlib import Path
+from typing import Callable, List
+import numpy as np
+import pandas as pd
+from .flight_columns import FlightColumns
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+CSV_DTYPES = {
+    "timestamp": str,
+    "latitude": np.float64,
+    "longitude": np.float64,
+    "altitude": np.float64,
+    "radar_distance": np.float64,
+}
+
+
+def _json_loads() -> Callable[[bytes], object]:
+    """The fastest available JSON decoder."""
+    return orjson.loads if orjson is not None else json.loads
+
+
+def read_csv_columns(file_path: Path) -> FlightColumns:
+    """Parse a CSV flight with the pandas C engine."""
+    df = pd.read_csv(
+        file_path,
+        usecols=list(CSV_DTYPES),
+        dtype=CSV_DTYPES,
+        engine="c",
+        encoding="utf-8",
+    )
+    return FlightColumns.from_arrays(
+        df["timestamp"].to_numpy(dtype=str),
+        df["latitude"].to_numpy(),
+        df["longitude"].to_numpy(),
+        df["altitude"].to_numpy(),
+        df["radar_distance"].to_numpy(),
+    )
+
+
+def read_json_columns(file_path: Path) -> FlightColumns:
+    """Parse a JSON flight (array of records or a single record)."""
+    data = _json_loads()(Path(file_path).read_bytes())
+    if isinstance(data, dict):
+        data = [data]
+
+    count = len(data)
+    gps = [item["gps"] for item in data]
+    radar = [item["radar"] for item in data]
+    return FlightColumns.from_arrays(
+        [str(item["timestamp"]) for item in data],
+        np.fromiter((g["latitude"] for g in gps), dtype=np.float64, count=count),
+        np.fromiter((g["longitude"] for g in gps), dtype=np.float64, count=count),
+        np.fromiter((g["altitude"] for g in gps), dtype=np.float64, count=count),
+        np.fromiter((r["distance"] for r in radar), dtype=np.float64, count=count),
+    )
+
+
+def read_flight(file_path: str | Path) -> FlightColumns:
+    """Read a flight file into columns."""
+    file_path = Path(file_path)
+    logger.debug(f"Reading file: {file_path}")
+
+    if not file_path.exists():
+        raise ValueError(f"File not found: {file_path}")
+
+    suffix = file_path.suffix.lower()
+    if suffix not in (".csv", ".json"):
+        raise ValueError(f"Unsupported file format: {suffix}")
+
+    try:
+        if suffix == ".csv":
+            columns = read_csv_columns(file_path)
+        else:
+            columns = read_json_columns(file_path)
+    except Exception as e:
+        logger.error(f"Error processing file: {e}")
+        raise ValueError(f"Error processing file: {str(e)}")
+
+    logger.debug(f"Read {len(columns)} records from {file_path.name}")
+    return columns
+
+
+def read_records(file_path: str | Path) -> List[dict]:
+    """Read a flight file into record dictionaries."""
+    return read_flight(file_path).to_records()
@@ -0,0 +1,184 @@
+# backend/app/services/job_queue.py
+# This file provides the background processing pipeline for uploaded files.
+# The following functionalities are implemented:
+#
+# 1. Persistent Queue:
+# - Jobs live in the `jobs` table of the metadata store (`app/db/metadata_store.py`), so queued work survives
+#   restarts. Uploads insert the file record and its job in one transaction.
+# - `submit(records)` registers new files (uploads, watched folders) together with their jobs and wakes up the
+#   workers.
+# - On start, jobs that were running when the server stopped and pending files without a job are requeued.
+#
+# 2. Workers:
+# - `JobQueue` runs `settings.JOB_WORKERS` asyncio workers. Each claims the oldest available job and runs
+#   `data_processing.process_file`, which builds the columnar artifact and LOD pyramid in the CPU worker pool
+#   (worker processes by default), so processing never runs inside a request. The flight metrics it returns are
+#   stored with the file when the job completes.
+# - Idle workers sleep until `notify()` is called for a new job or `settings.JOB_POLL_INTERVAL` passes.
+#
+# 3. Status Transitions and Retries:
+# - File and job status move from `pending` to `running` and then to `done` or `failed`; the error of the last
+#   failed attempt is stored with both.
+# - A failed attempt is retried after `settings.JOB_RETRY_DELAY` seconds, doubled for every further attempt, until
+#   `settings.JOB_MAX_ATTEMPTS` is reached.
+# - A job that could not run because a worker pool was saturated (`PoolSaturated`) is not a failed attempt: it goes
+#   back to the queue after `settings.JOB_RETRY_DELAY` seconds without counting the attempt, and the status updates
+#   of a job wait for a free I/O worker instead of leaving it `running`.
+# - If the file was deleted while it was processed, the derived data written by the job is removed again, unless
+#   another file shares the stored content (`blob_store.release`).
+#
+# 4. Statistics:
+# - `stats()` reports the number of jobs per status and the workers of the queue.
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from ..core.config import settings
+from ..db.metadata_store import get_metadata_store
+from .blob_store import blob_store
+from .data_processing import process_file
+from .executor import PoolSaturated, io_pool
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Workers that process the jobs of the persistent queue."""
+
+    def __init__(
+        self, workers: int, max_attempts: int, retry_delay: float, poll_interval: float
+    ):
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        """Requeue interrupted work and start the workers."""
+        if self._tasks:
+            return
+        requeued = await io_pool.run(
+            get_metadata_store().recover_jobs, self.max_attempts
+        )
+        if requeued:
+            logger.info(f"Requeued {requeued} processing jobs")
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(n), name=f"job-worker-{n}")
+            for n in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers; running jobs are requeued on the next start."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._wakeup = None
+
+    async def submit(self, records: List[Dict]) -> List[Dict]:
+        """Register files with a processing job each and wake up the workers. Returns the inserted records.
+
+        Files whose stored content was already processed are inserted as done, without a job.
+        """
+        inserted = await io_pool.run(
+            get_metadata_store().insert_many, records, True, self.max_attempts
+        )
+        self.notify()
+        return inserted
+
+    def notify(self) -> None:
+        """Wake up idle workers after jobs were added."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _wait(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _worker(self, n: int) -> None:
+        store = get_metadata_store()
+        while True:
+            try:
+                job = await io_pool.run(store.claim_job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {n} could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                await self._wait()
+                continue
+
+            await self._run(job)
+
+    async def _update(self, func, *args):
+        """Run a status update of a job in the I/O pool, waiting while the pool is saturated."""
+        while True:
+            try:
+                return await io_pool.run(func, *args)
+            except PoolSaturated:
+                await asyncio.sleep(self.retry_delay)
+
+    async def _run(self, job: Dict) -> None:
+        store = get_metadata_store()
+        file_id = job["file_id"]
+        try:
+            metrics = await process_file(file_id, job["path"])
+        except asyncio.CancelledError:
+            raise
+        except PoolSaturated as e:
+            logger.warning(
+                f"Processing of file {file_id} deferred, retrying in {self.retry_delay:.1f}s: {e}"
+            )
+            await self._update(
+                store.release_job, job["id"], time.time() + self.retry_delay
+            )
+            return
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if job["attempts"] < job["max_attempts"]:
+                delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+                logger.warning(
+                    f"Processing of file {file_id} failed (attempt {job['attempts']}/{job['max_attempts']}), "
+                    f"retrying in {delay:.1f}s: {error}"
+                )
+                await self._update(
+                    store.fail_job, job["id"], error, time.time() + delay
+                )
+            else:
+                logger.error(
+                    f"Processing of file {file_id} failed after {job['attempts']} attempts: {error}"
+                )
+                await self._update(store.fail_job, job["id"], error)
+            return
+
+        if not await self._update(store.complete_job, job["id"], metrics):
+            # The file was deleted while it was processed
+            logger.info(f"File {file_id} was deleted during processing")
+            await self._update(blob_store.release, Path(job["path"]))
+
+    def stats(self) -> Dict:
+        """Number of jobs per status and the configuration of the queue."""
+        return {
+            "workers": self.workers,
+            "running": bool(self._tasks),
+            "maxAttempts": self.max_attempts,
+            "jobs": get_metadata_store().job_counts(),
+        }
+
+
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_delay=settings.JOB_RETRY_DELAY,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+)
@@ -0,0 +1,151 @@
+# backend/app/services/spatial_index.py
+# This file provides the spatial index over the GPS tracks of processed flights.
+# The following functionalities are implemented:
+#
+# 1. Track Segments:
+# - `segment_boxes(columns)` splits a track into segments of `SEGMENT_POINTS` consecutive points (more for long
+#   flights, so a track has at most `MAX_SEGMENTS`) and computes the bounding box of each in one vectorized pass.
+#   Neighbouring segments share their boundary point, so the boxes also cover the path between segments.
+# - `process_file` indexes the boxes of every processed file (`index_file`) in the `track_segments` R*Tree of the
+#   metadata store, keyed by the stored file, so files sharing content share their index entries.
+#
+# 2. Queries:
+# - Bounding-box queries (`MetadataStore.find_in_area`) return the files with a track segment intersecting the box,
+#   answered by the R*Tree without reading flight data.
+# - `find_near(lat, lon, radius)` preselects the files around the point with the box enclosing the radius, then
+#   computes the exact closest approach (haversine distance) of each candidate from its memory-mapped columns with
+#   a map-reduce in the CPU worker pool (`fleet_analytics.map_artifacts`).
+#
+# 3. Backfill:
+# - `index_missing_tracks()` indexes processed files that have no index entries yet (e.g. processed before the
+#   index existed); it runs in the background on startup.
+import logging
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..db.metadata_store import get_metadata_store
+from .executor import cpu_pool, io_pool
+from .fleet_analytics import map_artifacts
+from .flight_artifacts import load_artifact
+from .flight_columns import FlightColumns
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_POINTS = 32
+MAX_SEGMENTS = 1024
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def segment_boxes(columns: FlightColumns) -> List[Tuple[float, float, float, float]]:
+    """Bounding boxes (min_lat, max_lat, min_lon, max_lon) of the segments of a track."""
+    valid = ~(np.isnan(columns.latitude) | np.isnan(columns.longitude))
+    latitude, longitude = columns.latitude[valid], columns.longitude[valid]
+    if len(latitude) == 0:
+        return []
+
+    step = max(SEGMENT_POINTS, math.ceil(len(latitude) / MAX_SEGMENTS))
+    starts = np.arange(0, max(len(latitude) - 1, 1), step)
+
+    bounds = []
+    for values in (latitude, longitude):
+        low, high = np.minimum.reduceat(values, starts), np.maximum.reduceat(
+            values, starts
+        )
+        # Extend every segment to the first point of the next one
+        following = values[np.minimum(starts + step, len(values) - 1)]
+        bounds += [np.minimum(low, following), np.maximum(high, following)]
+    return list(zip(*(b.tolist() for b in bounds)))
+
+
+def track_boxes(file_path: str) -> List[Tuple[float, float, float, float]]:
+    """Segment boxes of a processed file's track. Runs in a CPU worker."""
+    columns = load_artifact(Path(file_path))
+    if columns is None:
+        return []
+    return segment_boxes(columns)
+
+
+async def index_file(file_path: str) -> None:
+    """Index the track of a processed file."""
+    boxes = await cpu_pool.run(track_boxes, file_path)
+    await io_pool.run(get_metadata_store().index_track, file_path, boxes)
+
+
+def haversine(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: float, lon2: float
+) -> np.ndarray:
+    """Great-circle distances in meters."""
+    lat1, lon1 = np.radians(lat1), np.radians(lon1)
+    lat2, lon2 = math.radians(lat2), math.radians(lon2)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * math.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def radius_box(
+    lat: float, lon: float, radius: float
+) -> Tuple[float, float, float, float]:
+    """Bounding box (min_lat, max_lat, min_lon, max_lon) of a circle around a point."""
+    dlat = radius / METERS_PER_DEGREE
+    cos_lat = math.cos(math.radians(min(abs(lat) + dlat, 90.0)))
+    dlon = 180.0 if cos_lat < 1e-9 else min(dlat / cos_lat, 180.0)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def _chunk_nearest(paths: List[str], lat: float, lon: float) -> List[Optional[Dict]]:
+    """Closest point of each flight of a chunk to a location. Runs in a CPU worker."""
+    results = []
+    for path in paths:
+        columns = load_artifact(Path(path))
+        if columns is None or len(columns) == 0:
+            results.append(None)
+            continue
+
+        distances = haversine(columns.latitude, columns.longitude, lat, lon)
+        index = int(np.nanargmin(distances))
+        results.append(
+            {
+                "distance": round(float(distances[index]), 1),
+                "time": columns.timestamp_at(index),
+                "latitude": float(columns.latitude[index]),
+                "longitude": float(columns.longitude[index]),
+            }
+        )
+    return results
+
+
+async def find_near(lat: float, lon: float, radius: float) -> List[Dict]:
+    """Files whose track passes within radius meters of a point, closest first."""
+    store = get_metadata_store()
+    candidates = await io_pool.run(store.find_in_area, *radius_box(lat, lon, radius))
+
+    # Refine with the exact distances; records sharing a stored file are measured once
+    paths = list(dict.fromkeys(record["path"] for record in candidates))
+    nearest = dict(zip(paths, await map_artifacts(_chunk_nearest, paths, lat, lon)))
+
+    matches = []
+    for record in candidates:
+        approach = nearest.get(record["path"])
+        if approach is not None and approach["distance"] <= radius:
+            matches.append({**record, "closestApproach": approach})
+    matches.sort(key=lambda record: record["closestApproach"]["distance"])
+    return matches
+
+
+async def index_missing_tracks() -> None:
+    """Index processed files that are not in the spatial index yet."""
+    store = get_metadata_store()
+    paths = await io_pool.run(store.unindexed_paths)
+    if not paths:
+        return
+
+    logger.info(f"Indexing the tracks of {len(paths)} processed files")
+    for path in paths:
+        try:
+            await index_file(path)
+        except Exception as e:
+            logger.warning(f"Could not index track of {path}: {e}")
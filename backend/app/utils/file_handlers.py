@@ -3,63 +3,146 @@
 # The following functionalities are implemented:
 #
 # 1. File Upload Handling:
-# - The `save_upload_file` function saves the uploaded file to a specified directory and returns the file path.
-# - It validates the file size against the maximum upload size defined in `settings.MAX_UPLOAD_SIZE`.
+# - The `save_upload_file` function validates, hashes and saves the uploaded file in a single streaming pass and
+#   returns the stored path, the size and the SHA-256 content hash.
 # - It validates the file extension against the allowed extensions in `settings.ALLOWED_EXTENSIONS`.
-# - A unique filename is generated using a timestamp to prevent conflicts.
-# - The file content is saved asynchronously.
+# - The upload is read in chunks, fed to the streaming validator (`file_validator.create_stream_validator`)
+#   and written to a temporary `.part` file, so memory use does not depend on the file size.
+# - Validation and disk writes run in the I/O worker pool (`services/executor.py`), off the event loop.
+# - Uploads larger than `settings.MAX_UPLOAD_SIZE` raise an HTTP 413, invalid content an HTTP 400.
+# - Once validation succeeded, the temporary file is committed to the content-addressed blob store
+#   (`services/blob_store.py`): it is renamed atomically to `blobs/{hash[:2]}/{hash}{extension}`, or dropped if the
+#   same content is already stored. The blob stays pinned until the caller has registered it
+#   (`blob_store.unpin`). Invalid uploads are removed.
 #
-# 2. File Parsing:
+# 2. Archives:
+# - `open_archive` opens an uploaded zip archive (`settings.ARCHIVE_EXTENSIONS`) and `archive_members` lists the
+#   flight files inside it; directories, hidden files and other file types are skipped.
+# - `save_archive_member` streams one member through `save_upload_file`, so archive members are validated, hashed
+#   and stored exactly like uploads without extracting the archive first.
+#
+# 3. File Parsing:
 # - The `parse_file` function determines the file type (CSV or JSON) and calls the appropriate parser.
 # - Unsupported file types raise an HTTP 415 (Unsupported Media Type) exception.
 #
-# 3. CSV Parsing:
-# - The `parse_csv` function reads the CSV file and converts each row into a `DroneData` object.
-# - It validates and parses required columns: "timestamp", "latitude", "longitude", "altitude", and "radar_distance".
-# - It converts these values into appropriate types (e.g., `float` for numeric values, `datetime` for timestamps).
-# - Errors during parsing raise an HTTP 400 (Bad Request) exception with details.
-#
-# 4. JSON Parsing:
-# - The `parse_json` function reads the JSON file and converts each object into a `DroneData` object.
-# - It validates and parses required fields: "timestamp", "gps" (with "latitude", "longitude", "altitude"), and "radar" (with "distance").
-# - It converts these values into appropriate types.
+# 4. CSV and JSON Parsing:
+# - The `parse_csv` and `parse_json` functions read the file with the ingestion module (`services/ingestion.py`)
+#   and convert each record into a `DroneData` object.
+# - Required fields: "timestamp", "latitude", "longitude", "altitude" and "radar_distance" (CSV), or
+#   "timestamp", "gps" (with "latitude", "longitude", "altitude") and "radar" (with "distance") (JSON).
+# - Timestamps are converted into `datetime` objects and numeric values into `float`.
 # - Errors during parsing raise an HTTP 400 (Bad Request) exception with details.
 #
 # This module integrates with the `DroneData`, `DroneDataList`, `GPSData`, and `RadarData` models for structured data handling.
+import hashlib
+import uuid
+import zipfile
 import pandas as pd
-import json
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+from typing import List, Optional, Tuple
 from fastapi import UploadFile, HTTPException
-from datetime import datetime
 from ..models.drone_data import DroneData, DroneDataList, GPSData, RadarData
 from ..core.config import settings
+from ..services.blob_store import blob_store
+from ..services.executor import io_pool
+from ..services.ingestion import read_flight
+from .file_validator import READ_CHUNK_SIZE, StreamValidator, create_stream_validator
+
 
+def _consume_chunk(
+    buffer, validator: StreamValidator, digest, chunk: bytes
+) -> Optional[str]:
+    """Validate a chunk, hash it and append it to the temporary file. Returns the validation error, if any."""
+    error = validator.feed(chunk)
+    if error is None:
+        digest.update(chunk)
+        buffer.write(chunk)
+    return error
 
-async def save_upload_file(file: UploadFile) -> Path:
-    """Save uploaded file and return the path."""
-    # Validate file size
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    if file_size > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(status_code=413, detail="File too large")
-    file.file.seek(0)
 
+async def save_upload_file(file: UploadFile) -> Tuple[Path, int, str]:
+    """Validate and store an uploaded file in a single pass. Returns (path, size, content hash).
+
+    The stored file is pinned; call `blob_store.unpin(path)` once it is registered.
+    """
     # Validate extension
+    validator, error = create_stream_validator(file.filename)
     file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in settings.ALLOWED_EXTENSIONS:
-        raise HTTPException(status_code=415, detail="Unsupported file type")
+    if validator is None or file_extension not in settings.ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=415, detail=error or "Unsupported file type")
+
+    # Write to a temporary file while validating and hashing, then commit it to the blob store
+    upload_dir = Path(settings.UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = upload_dir / f".upload.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    try:
+        # Validation and disk writes run in the I/O worker pool, off the event loop
+        buffer = await io_pool.run(open, tmp_path, "wb")
+        try:
+            while chunk := await file.read(READ_CHUNK_SIZE):
+                if validator.size + len(chunk) > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE/1024/1024:.1f}MB",
+                    )
+                if await io_pool.run(_consume_chunk, buffer, validator, digest, chunk):
+                    break
+        finally:
+            await io_pool.run(buffer.close)
 
-    # Create unique filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = f"{timestamp}_{file.filename}"
-    file_path = Path(settings.UPLOAD_DIR) / safe_filename
+        error = await io_pool.run(validator.close)
+        if error is not None:
+            raise HTTPException(status_code=400, detail=error)
+
+        content_hash = digest.hexdigest()
+        file_path = await io_pool.run(
+            blob_store.commit, tmp_path, content_hash, file_extension
+        )
+    finally:
+        tmp_path.unlink(missing_ok=True)
 
-    # Save file
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
+    return file_path, validator.size, content_hash
 
-    return file_path
+
+def is_archive(filename: str) -> bool:
+    """Check if an uploaded file is an archive of flight files."""
+    return Path(filename or "").suffix.lower() in settings.ARCHIVE_EXTENSIONS
+
+
+def open_archive(file: UploadFile) -> zipfile.ZipFile:
+    """Open an uploaded zip archive."""
+    try:
+        return zipfile.ZipFile(file.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Invalid zip archive")
+
+
+def archive_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """List the flight files inside an archive."""
+    members = []
+    for info in archive.infolist():
+        path = PurePosixPath(info.filename)
+        if info.is_dir() or any(
+            part.startswith((".", "__MACOSX")) for part in path.parts
+        ):
+            continue
+        if path.suffix.lower() in settings.ALLOWED_EXTENSIONS:
+            members.append(info)
+    return members
+
+
+async def save_archive_member(
+    archive: zipfile.ZipFile, info: zipfile.ZipInfo
+) -> Tuple[Path, int, str]:
+    """Validate and store a flight file from an archive like an upload. Returns (path, size, content hash)."""
+    source = await io_pool.run(archive.open, info)
+    try:
+        return await save_upload_file(
+            UploadFile(file=source, filename=PurePosixPath(info.filename).name)
+        )
+    finally:
+        await io_pool.run(source.close)
 
 
 def parse_file(file_path: Path) -> DroneDataList:
@@ -72,24 +155,35 @@ def parse_file(file_path: Path) -> DroneDataList:
         raise HTTPException(status_code=415, detail="Unsupported file type")
 
 
+def _to_drone_data(file_path: Path) -> DroneDataList:
+    """Read a flight with the ingestion module and convert it into DroneData objects."""
+    columns = read_flight(file_path)
+    # Times of day on today's date (as pd.to_datetime gives them), from the already parsed seconds
+    timestamps = pd.Timestamp.today().normalize() + pd.to_timedelta(
+        columns.seconds + columns.start_second, unit="s"
+    )
+    return DroneDataList(
+        data=[
+            DroneData(
+                timestamp=timestamp,
+                gps=GPSData(latitude=lat, longitude=lon, altitude=alt),
+                radar=RadarData(distance=dist),
+            )
+            for timestamp, lat, lon, alt, dist in zip(
+                timestamps,
+                columns.latitude.tolist(),
+                columns.longitude.tolist(),
+                columns.altitude.tolist(),
+                columns.distance.tolist(),
+            )
+        ]
+    )
+
+
 def parse_csv(file_path: Path) -> DroneDataList:
     """Parse CSV file into DroneDataList."""
     try:
-        df = pd.read_csv(file_path)
-        data = []
-        for _, row in df.iterrows():
-            data.append(
-                DroneData(
-                    timestamp=pd.to_datetime(row["timestamp"]),
-                    gps=GPSData(
-                        latitude=float(row["latitude"]),
-                        longitude=float(row["longitude"]),
-                        altitude=float(row["altitude"]),
-                    ),
-                    radar=RadarData(distance=float(row["radar_distance"])),
-                )
-            )
-        return DroneDataList(data=data)
+        return _to_drone_data(file_path)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error parsing CSV file: {str(e)}")
 
@@ -97,22 +191,7 @@ def parse_csv(file_path: Path) -> DroneDataList:
 def parse_json(file_path: Path) -> DroneDataList:
     """Parse JSON file into DroneDataList."""
     try:
-        with open(file_path) as f:
-            raw_data = json.load(f)
-            data = []
-            for item in raw_data:
-                data.append(
-                    DroneData(
-                        timestamp=item["timestamp"],
-                        gps=GPSData(
-                            latitude=float(item["gps"]["latitude"]),
-                            longitude=float(item["gps"]["longitude"]),
-                            altitude=float(item["gps"]["altitude"]),
-                        ),
-                        radar=RadarData(distance=float(item["radar"]["distance"])),
-                    )
-                )
-            return DroneDataList(data=data)
+        return _to_drone_data(file_path)
     except Exception as e:
         raise HTTPException(
             status_code=400, detail=f"Error parsing JSON file: {str(e)}"
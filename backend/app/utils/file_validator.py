@@ -19,19 +19,50 @@
 # - The "gps" field must contain the keys "latitude", "longitude", and "altitude".
 # - The "radar" field must contain the key "distance".
 #
+# Streaming Validation:
+# - Validation runs incrementally while the file is read, so the content is never held in memory as a whole:
+#   - `create_stream_validator(filename)` returns a `CSVStreamValidator` or `JSONStreamValidator`.
+#   - `feed(chunk)` decodes the bytes with an incremental UTF-8 decoder (CSV files may start with a byte-order mark)
+#     and validates every complete CSV row or JSON array element; `close()` finishes validation and returns the error message, if any.
+#   - CSV rows are parsed with pandas in batches of at least `CSV_BATCH_ROWS` rows and validated with vectorized
+#     checks (`invalid_timestamps` on the code points of the timestamps, `pd.to_numeric` masks for the numeric
+#     columns), reporting every failing column with its first `MAX_REPORTED_ROWS` bad rows.
+#   - JSON arrays are consumed element by element.
+# - `validate_file_content(file, max_size)` (default: `settings.MAX_UPLOAD_SIZE`) validates an uploaded file chunk by chunk with these validators.
+#
 # Unsupported file types or files that do not pass these validations are rejected with an appropriate error message.
+import codecs
 import json
 import csv
-import pandas as pd
 import logging
+import re
 from io import StringIO
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
+import numpy as np
+import pandas as pd
+from ..core.config import settings
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+REQUIRED_COLUMNS = ["timestamp", "latitude", "longitude", "altitude", "radar_distance"]
+NUMERIC_COLUMNS = ["latitude", "longitude", "altitude", "radar_distance"]
+
+# Number of offending rows listed in error messages
+MAX_REPORTED_ROWS = 3
+
+# Minimum number of CSV rows parsed and validated together
+CSV_BATCH_ROWS = 10000
+
+# Size of the chunks read from uploaded files
+READ_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_TIMESTAMP_PATTERN = r"(?:2[0-3]|[01]\d|\d):(?:[0-5]\d|\d):(?:[0-5]\d|\d)"
+_PARSER_LINE = re.compile(r"line (\d+)")
+
 
 def validate_timestamp_format(timestamp: str) -> bool:
     """Validate if timestamp is in HH:MM:SS format"""
@@ -42,165 +73,420 @@ def validate_timestamp_format(timestamp: str) -> bool:
         return False
 
 
-async def validate_file_content(
-    file, max_size: int = 10 * 1024 * 1024
-) -> tuple[bool, str | None]:
-    """
-    Validate file content before saving.
-    Returns: (is_valid, error_message)
-    """
-    try:
-        # Read content
-        content = await file.read()
-        await file.seek(0)
+def invalid_timestamps(values: np.ndarray) -> np.ndarray:
+    """Vectorized HH:MM:SS check. Returns a mask of the invalid timestamps."""
+    values = np.asarray(values, dtype=str)
+    if values.size == 0:
+        return np.zeros(0, dtype=bool)
 
-        # Check file size
-        if len(content) > max_size:
-            return (
-                False,
-                f"File size exceeds maximum allowed size of {max_size/1024/1024:.1f}MB",
-            )
+    if values.dtype.itemsize == 8 * 4 and np.all(np.char.str_len(values) == 8):
+        # Fixed-width "HH:MM:SS": check the UCS-4 code points directly
+        codes = values.view(np.uint32).reshape(-1, 8).astype(np.int64) - ord("0")
+        digits = codes[:, [0, 1, 3, 4, 6, 7]]
+        valid = (
+            (codes[:, 2] == ord(":") - ord("0"))
+            & (codes[:, 5] == ord(":") - ord("0"))
+            & ((digits >= 0) & (digits <= 9)).all(axis=1)
+            & (codes[:, 0] * 10 + codes[:, 1] <= 23)
+            & (codes[:, 3] <= 5)
+            & (codes[:, 6] <= 5)
+        )
+        return ~valid
+
+    # Same fields strptime accepts for %H:%M:%S (one or two digits each)
+    return ~pd.Series(values).str.fullmatch(_TIMESTAMP_PATTERN).to_numpy(dtype=bool)
+
+
+def _format_rows(rows: List[int], total: int) -> str:
+    """Format the first offending row numbers for an error message."""
+    suffix = " ..." if total > MAX_REPORTED_ROWS else ""
+    return ", ".join(map(str, rows[:MAX_REPORTED_ROWS])) + suffix
+
+
+class StreamValidator:
+    """Incremental validator fed with the raw bytes of a file."""
+
+    ENCODING = "utf-8"
 
-        if len(content) == 0:
-            return False, "File is empty"
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder(self.ENCODING)()
+        self.size = 0
+        self.error: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """Validate the next chunk. Returns the error message once validation failed."""
+        if self.error is None and chunk:
+            self.size += len(chunk)
+            try:
+                text = self._decoder.decode(chunk)
+            except UnicodeDecodeError:
+                self.error = (
+                    "File must be UTF-8 encoded. Please check the file encoding."
+                )
+                return self.error
+            self._feed_text(text)
+        return self.error
+
+    def close(self) -> Optional[str]:
+        """Finish validation. Returns the error message, or None if the file is valid."""
+        if self.error is not None:
+            return self.error
+        if self.size == 0:
+            self.error = "File is empty"
+            return self.error
 
         try:
-            text_content = content.decode("utf-8")
+            text = self._decoder.decode(b"", final=True)
         except UnicodeDecodeError:
-            return False, "File must be UTF-8 encoded. Please check the file encoding."
+            self.error = "File must be UTF-8 encoded. Please check the file encoding."
+            return self.error
 
-        # Validate based on file type
-        file_extension = Path(file.filename).suffix.lower()
+        self._feed_text(text)
+        if self.error is None:
+            self._finish()
+        return self.error
 
-        if file_extension == ".csv":
-            try:
-                df = pd.read_csv(StringIO(text_content))
-
-                # Check required columns
-                required_columns = {
-                    "timestamp",
-                    "latitude",
-                    "longitude",
-                    "altitude",
-                    "radar_distance",
-                }
-
-                if not all(col in df.columns for col in required_columns):
-                    missing = required_columns - set(df.columns)
-                    return False, f"Missing required columns: {', '.join(missing)}"
-
-                # Validate timestamp format
-                invalid_timestamps = []
-                for idx, ts in enumerate(df["timestamp"], 1):
-                    try:
-                        datetime.strptime(str(ts), "%H:%M:%S")
-                    except ValueError:
-                        invalid_timestamps.append(idx)
-
-                if invalid_timestamps:
-                    rows = ", ".join(map(str, invalid_timestamps[:3]))
-                    suffix = " ..." if len(invalid_timestamps) > 3 else ""
+    def _feed_text(self, text: str) -> None:
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        raise NotImplementedError
+
+
+class CSVStreamValidator(StreamValidator):
+    """Validates CSV content in batches of rows as it arrives."""
+
+    # Skip the byte-order mark of files exported from Excel, like pandas does when reading them
+    ENCODING = "utf-8-sig"
+
+    def __init__(self):
+        super().__init__()
+        self._pending = ""
+        self._blocks: List[str] = []
+        self._block_rows = 0
+        self._header: Optional[List[str]] = None
+        self._columns: dict = {}
+        self._line_number = 0
+        self._row_number = 0
+        self._bad_rows = {col: [] for col in ["timestamp"] + NUMERIC_COLUMNS}
+        self._bad_counts = {col: 0 for col in ["timestamp"] + NUMERIC_COLUMNS}
+
+    def _feed_text(self, text: str) -> None:
+        text = self._pending + text
+        end = text.rfind("\n") + 1
+        self._pending = text[end:]
+        self._add_block(text[:end])
+
+    def _add_block(self, block: str) -> None:
+        while self._header is None and block:
+            # Leading blank lines are skipped, like pandas does
+            line, _, block = block.partition("\n")
+            self._line_number += 1
+            if line.strip():
+                self._read_header(line)
+                if self.error is not None:
+                    return
+
+        if block:
+            self._blocks.append(block)
+            self._block_rows += block.count("\n")
+            if self._block_rows >= CSV_BATCH_ROWS:
+                self._flush()
+
+    def _read_header(self, line: str) -> None:
+        self._header = next(csv.reader([line]))
+        missing = set(REQUIRED_COLUMNS) - set(self._header)
+        if missing:
+            self.error = f"Missing required columns: {', '.join(missing)}"
+            return
+        self._columns = {col: self._header.index(col) for col in REQUIRED_COLUMNS}
+
+    def _flush(self) -> None:
+        """Parse and validate the buffered rows."""
+        block, lines = "".join(self._blocks), self._block_rows
+        self._blocks, self._block_rows = [], 0
+        if not block:
+            return
+
+        # pandas would take extra fields in the first row as an index instead of failing
+        error = self._check_first_row(block)
+        if error is not None:
+            self.error = f"Invalid CSV format: {error}"
+            return
+
+        ts_index = self._columns["timestamp"]
+        try:
+            frame = pd.read_csv(
+                StringIO(block),
+                header=None,
+                names=range(len(self._header)),
+                dtype={ts_index: str},
+            )
+        except pd.errors.EmptyDataError:
+            frame = None
+        except pd.errors.ParserError as e:
+            # Line numbers are relative to the batch, make them relative to the file
+            message = _PARSER_LINE.sub(
+                lambda m: f"line {int(m.group(1)) + self._line_number}", str(e)
+            )
+            self.error = f"Invalid CSV format: {message}"
+            return
+
+        self._line_number += lines
+        if frame is None or frame.empty:
+            return
+
+        first_row = self._row_number + 1
+        self._row_number += len(frame)
+
+        timestamps = frame[ts_index].fillna("").to_numpy(dtype=str)
+        self._record("timestamp", invalid_timestamps(timestamps), first_row)
+        for col in NUMERIC_COLUMNS:
+            values = pd.to_numeric(frame[self._columns[col]], errors="coerce")
+            self._record(col, values.isna().to_numpy(), first_row)
+
+    def _check_first_row(self, block: str) -> Optional[str]:
+        """Check the field count of the first row of a batch, as pandas reports it."""
+        line_number = self._line_number
+        for line in block.split("\n", 64):
+            line_number += 1
+            if line.strip():
+                fields = len(next(csv.reader([line])))
+                if fields > len(self._header):
                     return (
-                        False,
-                        f"Invalid timestamp format in rows: {rows}{suffix}. Expected format: HH:MM:SS",
+                        f"Error tokenizing data. C error: Expected {len(self._header)} "
+                        f"fields in line {line_number}, saw {fields}\n"
                     )
+                return None
+        return None
+
+    def _record(self, column: str, invalid: np.ndarray, first_row: int) -> None:
+        """Count invalid rows of a column and keep the first ones for the message."""
+        positions = np.flatnonzero(invalid)
+        if len(positions) == 0:
+            return
+        self._bad_counts[column] += len(positions)
+        reported = self._bad_rows[column]
+        missing = MAX_REPORTED_ROWS - len(reported)
+        if missing > 0:
+            reported.extend((positions[:missing] + first_row).tolist())
+
+    def _finish(self) -> None:
+        if self._pending:
+            pending, self._pending = self._pending, ""
+            self._add_block(pending + "\n")
+            if self.error is not None:
+                return
+
+        if self._header is None:
+            self.error = "CSV file is empty"
+            return
+
+        self._flush()
+        if self.error is not None:
+            return
+
+        # Every failing column is reported with its first bad rows
+        errors = []
+        if self._bad_counts["timestamp"]:
+            rows = _format_rows(
+                self._bad_rows["timestamp"], self._bad_counts["timestamp"]
+            )
+            errors.append(
+                f"Invalid timestamp format in rows: {rows}. Expected format: HH:MM:SS"
+            )
+        for col in NUMERIC_COLUMNS:
+            if self._bad_counts[col]:
+                rows = _format_rows(self._bad_rows[col], self._bad_counts[col])
+                errors.append(f"Non-numeric values in column '{col}' at rows: {rows}")
+        if errors:
+            self.error = "; ".join(errors)
+
+
+def validate_json_record(item, idx: int) -> Optional[str]:
+    """Validate a single JSON record. Returns the error message, if any."""
+    # Check required fields
+    if not isinstance(item, dict) or not all(
+        field in item for field in ["timestamp", "gps", "radar"]
+    ):
+        return f"Missing required fields in record {idx}. Each record must have 'timestamp', 'gps', and 'radar' fields."
+
+    # Validate timestamp format
+    if not validate_timestamp_format(str(item["timestamp"])):
+        return f"Invalid timestamp format in record {idx}. Expected format: HH:MM:SS"
+
+    # Validate GPS data
+    gps = item.get("gps", {})
+    if not isinstance(gps, dict) or not all(
+        field in gps for field in ["latitude", "longitude", "altitude"]
+    ):
+        return f"Missing GPS fields in record {idx}. GPS data must include 'latitude', 'longitude', and 'altitude'."
+
+    # Validate radar data
+    radar = item.get("radar", {})
+    if not isinstance(radar, dict) or "distance" not in radar:
+        return f"Missing radar distance in record {idx}. Radar data must include 'distance'."
+
+    # Validate numeric values
+    try:
+        float(gps["latitude"])
+        float(gps["longitude"])
+        float(gps["altitude"])
+        float(radar["distance"])
+    except (ValueError, TypeError):
+        return f"Invalid numeric values in record {idx}. GPS and radar values must be numbers."
+
+    return None
+
+
+class JSONStreamValidator(StreamValidator):
+    """Validates a JSON array element by element as it arrives."""
+
+    def __init__(self):
+        super().__init__()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._line = 1
+        self._mode: Optional[str] = None  # "array", "object" or "done"
+        self._expect_value = True
+        self._record_count = 0
+
+    def _feed_text(self, text: str) -> None:
+        # Drop what was consumed already, keep the unparsed tail
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+
+        if self._mode is None:
+            start = _WHITESPACE.match(self._buffer).end()
+            if start == len(self._buffer):
+                return
+            if self._buffer[start] == "[":
+                self._advance(start + 1)
+                self._mode = "array"
+            else:
+                # A single object (or invalid content) is parsed as a whole at the end
+                self._mode = "object"
+
+        if self._mode == "array":
+            self._parse_elements(final=False)
+
+    def _advance(self, pos: int) -> None:
+        self._line += self._buffer.count("\n", self._pos, pos)
+        self._pos = pos
+
+    def _syntax_error(self, message: str) -> None:
+        self.error = f"Invalid JSON format near line {self._line}: {message}"
+
+    def _parse_elements(self, final: bool) -> None:
+        buffer = self._buffer
+        while self.error is None and self._mode == "array":
+            self._advance(_WHITESPACE.match(buffer, self._pos).end())
+            if self._pos == len(buffer):
+                return
+
+            head = buffer[self._pos]
+            if head == "]" and (not self._expect_value or self._record_count == 0):
+                self._advance(self._pos + 1)
+                self._mode = "done"
+                return
+            if not self._expect_value:
+                if head != ",":
+                    self._syntax_error("Expecting ',' delimiter")
+                    return
+                self._advance(self._pos + 1)
+                self._expect_value = True
+                continue
 
-                # Validate numeric columns
-                numeric_columns = [
-                    "latitude",
-                    "longitude",
-                    "altitude",
-                    "radar_distance",
-                ]
-                for col in numeric_columns:
-                    non_numeric = pd.to_numeric(df[col], errors="coerce").isna()
-                    if non_numeric.any():
-                        bad_rows = df.index[non_numeric].tolist()[:3]
-                        rows = ", ".join(map(str, [i + 1 for i in bad_rows]))
-                        suffix = " ..." if len(bad_rows) > 3 else ""
-                        return (
-                            False,
-                            f"Non-numeric values in column '{col}' at rows: {rows}{suffix}",
-                        )
-
-                return True, None
-
-            except pd.errors.EmptyDataError:
-                return False, "CSV file is empty"
-            except pd.errors.ParserError as e:
-                return False, f"Invalid CSV format: {str(e)}"
-            except Exception as e:
-                return False, f"Error processing CSV file: {str(e)}"
-
-        elif file_extension == ".json":
             try:
-                data = json.loads(text_content)
-                if isinstance(data, dict):
-                    data = [data]
-
-                if not isinstance(data, list):
-                    return False, "JSON must contain an array of drone data records"
-
-                # Validate each record
-                for idx, item in enumerate(data, 1):
-                    # Check required fields
-                    if not all(
-                        field in item for field in ["timestamp", "gps", "radar"]
-                    ):
-                        return (
-                            False,
-                            f"Missing required fields in record {idx}. Each record must have 'timestamp', 'gps', and 'radar' fields.",
-                        )
-
-                    # Validate timestamp format
-                    try:
-                        datetime.strptime(str(item["timestamp"]), "%H:%M:%S")
-                    except ValueError:
-                        return (
-                            False,
-                            f"Invalid timestamp format in record {idx}. Expected format: HH:MM:SS",
-                        )
-
-                    # Validate GPS data
-                    gps = item.get("gps", {})
-                    if not all(
-                        field in gps for field in ["latitude", "longitude", "altitude"]
-                    ):
-                        return (
-                            False,
-                            f"Missing GPS fields in record {idx}. GPS data must include 'latitude', 'longitude', and 'altitude'.",
-                        )
-
-                    # Validate radar data
-                    if "distance" not in item.get("radar", {}):
-                        return (
-                            False,
-                            f"Missing radar distance in record {idx}. Radar data must include 'distance'.",
-                        )
-
-                    # Validate numeric values
-                    try:
-                        float(gps["latitude"])
-                        float(gps["longitude"])
-                        float(gps["altitude"])
-                        float(item["radar"]["distance"])
-                    except (ValueError, TypeError):
-                        return (
-                            False,
-                            f"Invalid numeric values in record {idx}. GPS and radar values must be numbers.",
-                        )
-
-                return True, None
+                item, end = self._json.raw_decode(buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # The element may simply be incomplete; only fail once all data arrived
+                if final:
+                    self._advance(e.pos)
+                    self._syntax_error(e.msg)
+                return
+
+            if end == len(buffer) and not final:
+                # Numbers at the end of the buffer may continue in the next chunk
+                return
+
+            self._advance(end)
+            self._expect_value = False
+            self._record_count += 1
+            self.error = validate_json_record(item, self._record_count)
 
+    def _finish(self) -> None:
+        if self._mode is None:
+            self._syntax_error("Expecting value")
+            return
+
+        if self._mode == "object":
+            try:
+                data = json.loads(self._buffer[self._pos :])
             except json.JSONDecodeError as e:
-                line_info = f" near line {e.lineno}" if hasattr(e, "lineno") else ""
-                return False, f"Invalid JSON format{line_info}: {str(e)}"
+                self.error = f"Invalid JSON format near line {e.lineno}: {str(e)}"
+                return
+            if not isinstance(data, dict):
+                self.error = "JSON must contain an array of drone data records"
+                return
+            self.error = validate_json_record(data, 1)
+            return
 
-        else:
-            return (
-                False,
-                f"Unsupported file type: {file_extension}. Only .csv and .json files are supported.",
+        self._parse_elements(final=True)
+        if self.error is not None:
+            return
+        if self._mode != "done":
+            self._syntax_error(
+                "Expecting value" if self._expect_value else "Expecting ',' delimiter"
             )
+            return
+
+        rest = _WHITESPACE.match(self._buffer, self._pos).end()
+        if rest != len(self._buffer):
+            self._advance(rest)
+            self._syntax_error("Extra data")
+
+
+def create_stream_validator(
+    filename: str,
+) -> Tuple[Optional[StreamValidator], Optional[str]]:
+    """Create the validator for a file name. Returns (validator, error_message)."""
+    file_extension = Path(filename).suffix.lower()
+    if file_extension == ".csv":
+        return CSVStreamValidator(), None
+    if file_extension == ".json":
+        return JSONStreamValidator(), None
+    return (
+        None,
+        f"Unsupported file type: {file_extension}. Only .csv and .json files are supported.",
+    )
+
+
+async def validate_file_content(
+    file, max_size: int = settings.MAX_UPLOAD_SIZE
+) -> tuple[bool, str | None]:
+    """
+    Validate file content before saving.
+    Returns: (is_valid, error_message)
+    """
+    try:
+        validator, error = create_stream_validator(file.filename)
+        if validator is None:
+            return False, error
+
+        # Validate chunk by chunk instead of reading the whole file
+        while chunk := await file.read(READ_CHUNK_SIZE):
+            if validator.size + len(chunk) > max_size:
+                return (
+                    False,
+                    f"File size exceeds maximum allowed size of {max_size/1024/1024:.1f}MB",
+                )
+            if validator.feed(chunk) is not None:
+                break
+
+        error = validator.close()
+        return error is None, error
 
     except Exception as e:
         return False, f"File validation failed: {str(e)}"
@@ -0,0 +1,119 @@
+# backend/benchmarks/bench_fleet.py
+# This file benchmarks the fleet analytics over a synthetic archive.
+# The following functionalities are implemented:
+#
+# 1. Archive:
+# - Builds `--flights` processed flights (default: 10k) of `--rows` samples in a temporary metadata store: a
+#   columnar artifact per flight and the whole-flight metrics in the `metrics` column, ingested over `--days` days.
+#
+# 2. Measured Queries:
+# - **summary**, **distribution**, **daily**: the summary-based aggregates, including the metadata query.
+# - **approaches**: the 10 closest radar approaches, located in the artifacts of the preselected flights.
+# - **approaches<T**: all flights and points closer than the 5th percentile of the minimum distances, a
+#   map-reduce over the artifacts of about 5% of the archive.
+# - The best of `--repeat` runs is printed per query (the CPU pool is warmed up first).
+#
+# Usage (from the `backend` directory):
+#   python -m benchmarks.bench_fleet [--flights 10000] [--rows 300] [--days 30] [--repeat 3]
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+from app.db.metadata_store import DONE, SQLiteMetadataStore
+from app.services.executor import shutdown_pools
+from app.services.fleet_analytics import (
+    METRIC_FIELDS,
+    closest_approaches,
+    daily_totals,
+    fleet_summary,
+    metric_distribution,
+)
+from app.services.flight_artifacts import write_artifact
+from app.services.flight_columns import FlightColumns, calculate_summary
+from .synthetic import generate_flight
+
+
+def build_archive(
+    root: Path, flights: int, rows: int, days: int
+) -> SQLiteMetadataStore:
+    """A metadata store with processed synthetic flights."""
+    store = SQLiteMetadataStore(root / "metadata.db")
+    start = datetime.now() - timedelta(days=days)
+    records = []
+    for n in range(flights):
+        source = root / f"flight{n}.csv"
+        source.touch()
+        columns = FlightColumns.from_arrays(*generate_flight(rows, seed=n).values())
+        write_artifact(source, columns)
+        records.append(
+            {
+                "id": f"flight-{n}",
+                "filename": source.name,
+                "timestamp": (start + timedelta(days=days * n / flights)).isoformat(),
+                "path": str(source),
+                "status": DONE,
+                "size": 0,
+                "metrics": calculate_summary(columns),
+            }
+        )
+    store.insert_many(records)
+    return store
+
+
+def best_of(func, repeat: int) -> float:
+    """Best wall-clock time of repeated runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, default=10_000)
+    parser.add_argument("--rows", type=int, default=300)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        store = build_archive(Path(tmp), args.flights, args.rows, args.days)
+        print(f"built {args.flights} flights in {time.perf_counter() - start:.1f}s")
+
+        loop = asyncio.new_event_loop()
+        flights = store.flight_summaries(METRIC_FIELDS)
+        threshold = float(
+            np.percentile([f["flightMetrics"]["minDistance"] for f in flights], 5)
+        )
+        loop.run_until_complete(closest_approaches(flights, 10))  # warm up the pool
+
+        queries = {
+            "summary": lambda: fleet_summary(store.flight_summaries(METRIC_FIELDS)),
+            "distribution": lambda: metric_distribution(
+                store.flight_summaries(METRIC_FIELDS), "maxAltitude", 20
+            ),
+            "daily": lambda: daily_totals(store.flight_summaries(METRIC_FIELDS)),
+            "approaches": lambda: loop.run_until_complete(
+                closest_approaches(store.flight_summaries(METRIC_FIELDS), 10)
+            ),
+            "approaches<T": lambda: loop.run_until_complete(
+                closest_approaches(store.flight_summaries(METRIC_FIELDS), 10, threshold)
+            ),
+        }
+        print(f"{'query':>14} {'time':>8}")
+        for name, query in queries.items():
+            print(f"{name:>14} {best_of(query, args.repeat) * 1000:>6.1f}ms")
+
+        loop.close()
+        shutdown_pools()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# backend/benchmarks/bench_ingestion.py
+# This file benchmarks reading flight files into memory.
+# The following functionalities are implemented:
+#
+# 1. Compared Implementations:
+# - **dictreader**: the former `endpoints/data.read_file_content` (`csv.DictReader` / `json.load`).
+# - **iterrows**: the former `services/data_processing.read_file_content` (`pd.read_csv` + `df.iterrows()`).
+# - **pydantic**: the former `utils/file_handlers.parse_csv`/`parse_json` (a `DroneData` model per row).
+# - **ingestion**: `services/ingestion.read_flight`, the single reader all of them now use (pandas C engine with
+#   explicit dtypes for CSV, orjson for JSON when installed).
+#
+# 2. Output:
+# - For every format and size (default: 100k rows) the best of `--repeat` runs is printed per implementation,
+#   together with the speedup of `ingestion` over it.
+#
+# Usage (from the `backend` directory):
+#   python -m benchmarks.bench_ingestion [--rows 100000] [--repeat 3] [--skip-pydantic]
+import argparse
+import csv
+import json
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+import pandas as pd
+from app.models.drone_data import DroneData, GPSData, RadarData
+from app.services.ingestion import read_flight
+from .synthetic import write_flight
+
+
+def read_dictreader(file_path: Path) -> int:
+    """The former reader of the data endpoints."""
+    if file_path.suffix == ".json":
+        with open(file_path, "r") as f:
+            data = json.load(f)
+        return len(data)
+
+    data = []
+    with open(file_path, "r") as f:
+        for row in csv.DictReader(f):
+            data.append(
+                {
+                    "timestamp": row["timestamp"],
+                    "gps": {
+                        "latitude": float(row["latitude"]),
+                        "longitude": float(row["longitude"]),
+                        "altitude": float(row["altitude"]),
+                    },
+                    "radar": {"distance": float(row["radar_distance"])},
+                }
+            )
+    return len(data)
+
+
+def read_iterrows(file_path: Path) -> int:
+    """The former reader of the processing service."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if file_path.suffix == ".json":
+        return len(json.loads(content))
+
+    df = pd.read_csv(StringIO(content))
+    data = []
+    for _, row in df.iterrows():
+        data.append(
+            {
+                "timestamp": row["timestamp"],
+                "gps": {
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                    "altitude": float(row["altitude"]),
+                },
+                "radar": {"distance": float(row["radar_distance"])},
+            }
+        )
+    return len(data)
+
+
+def read_pydantic(file_path: Path) -> int:
+    """The former DroneData parsers."""
+    if file_path.suffix == ".json":
+        with open(file_path) as f:
+            items = json.load(f)
+        rows = [
+            (
+                pd.to_datetime(item["timestamp"]),
+                item["gps"]["latitude"],
+                item["gps"]["longitude"],
+                item["gps"]["altitude"],
+                item["radar"]["distance"],
+            )
+            for item in items
+        ]
+    else:
+        df = pd.read_csv(file_path)
+        rows = [
+            (
+                pd.to_datetime(row["timestamp"]),
+                row["latitude"],
+                row["longitude"],
+                row["altitude"],
+                row["radar_distance"],
+            )
+            for _, row in df.iterrows()
+        ]
+
+    data = [
+        DroneData(
+            timestamp=ts,
+            gps=GPSData(latitude=float(lat), longitude=float(lon), altitude=float(alt)),
+            radar=RadarData(distance=float(dist)),
+        )
+        for ts, lat, lon, alt, dist in rows
+    ]
+    return len(data)
+
+
+def read_ingestion(file_path: Path) -> int:
+    """The unified ingestion module."""
+    return len(read_flight(file_path))
+
+
+def best_of(func, file_path: Path, rows: int, repeat: int) -> float:
+    """Best wall-clock time of repeated runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert func(file_path) == rows, "wrong number of rows"
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-pydantic", action="store_true")
+    args = parser.parse_args()
+
+    readers = {
+        "dictreader": read_dictreader,
+        "iterrows": read_iterrows,
+        "pydantic": read_pydantic,
+        "ingestion": read_ingestion,
+    }
+    if args.skip_pydantic:
+        del readers["pydantic"]
+
+    print(f"{'format':>6} {'rows':>9} {'reader':>11} {'time':>8} {'ingestion':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            for suffix in (".csv", ".json"):
+                file_path = write_flight(Path(tmp) / f"flight{suffix}", rows)
+                timings = {
+                    name: best_of(func, file_path, rows, args.repeat)
+                    for name, func in readers.items()
+                }
+                for name, timing in timings.items():
+                    print(
+                        f"{suffix[1:]:>6} {rows:>9} {name:>11} {timing:>7.3f}s "
+                        f"{timing / timings['ingestion']:>9.1f}x"
+                    )
+
+
+if __name__ == "__main__":
+    main()
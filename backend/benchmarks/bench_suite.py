@@ -0,0 +1,349 @@
+# backend/benchmarks/bench_suite.py
+# This file runs the benchmark suite for the ingest, metrics and export hot paths and records the results.
+# The following functionalities are implemented:
+#
+# 1. Inputs:
+# - Synthetic flights (`synthetic.py`) of every `--rows` size (default: 1k, 100k and 1M; `--rows 10000000` for the
+#   10M run) are written once per format to a temporary directory, which is also the `UPLOAD_DIR` of the API cases.
+#
+# 2. Measured Cases (per format and size):
+# - **validate**: `file_validator.validate_file_content` on the stored file.
+# - **read.***: every reader of flight files: `ingestion.read_flight` (columns), `data_processing.read_file_content`
+#   and `endpoints/data.read_file_content` (record dicts), `file_handlers.parse_file` (`DroneData` models) and
+#   `flight_artifacts.load_artifact` (memory-mapped columns, fully paged in).
+# - **metrics** / **metrics.records**: `endpoints/data.calculate_metrics` from columns and from record dicts.
+# - **export.csv** / **export.json**: the streaming export writers, consumed completely.
+# - **api.***: end-to-end latency through a `TestClient`: the upload request, upload until processing is `done`
+#   (every run uploads a flight with another seed, so deduplication does not skip the work), `GET /files`,
+#   `GET /data/{id}` and both exports (uncompressed, so the response compression and its cache do not hide
+#   the serialization). The uploaded files are deleted afterwards.
+# - `--skip` leaves out cases by name prefix (e.g. `--skip read.models api`).
+#
+# 3. Results:
+# - The best and median of `--repeat` runs are printed and written as JSON to `--output` (default:
+#   `benchmarks/results/{commit}.json`) together with the commit, interpreter, platform and library versions.
+# - `--compare BASELINE.json` prints the change of every case against an earlier result file and exits with status
+#   1 if a case got slower than `--tolerance` (default: 10%).
+#
+# Usage (from the `backend` directory):
+#   python -m benchmarks.bench_suite [--rows 1000 100000 1000000] [--formats csv json] [--repeat 3]
+#                                    [--skip read.models] [--output results.json] [--compare baseline.json]
+import os
+import tempfile
+
+WORK_DIR_ENV = "DRONE_BENCH_DIR"
+
+# The settings are read on import, so the API cases get a throwaway upload directory. It is created only by the
+# script itself: spawned worker processes import this module again (as `__mp_main__`) and inherit it through the
+# environment instead of creating their own.
+if __name__ == "__main__":
+    os.environ[WORK_DIR_ENV] = tempfile.mkdtemp(prefix="drone-bench-")
+    os.environ["UPLOAD_DIR"] = os.environ[WORK_DIR_ENV]
+WORK_DIR = os.environ.get(WORK_DIR_ENV)
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+import numpy as np
+import pandas as pd
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from app.api.v1.endpoints import data as data_endpoint
+from app.core.config import settings
+from app.services import data_processing
+from app.services.flight_artifacts import load_artifact, write_artifact
+from app.services.flight_export import iter_csv, iter_json
+from app.services.ingestion import read_flight
+from app.utils.file_handlers import parse_file
+from app.utils.file_validator import validate_file_content
+from main import app
+from .synthetic import flight_csv, flight_json, write_flight
+
+RESULTS_VERSION = 1
+FORMATS = ("csv", "json")
+STATUS_POLL_SECONDS = 0.01
+
+
+def git_commit() -> Dict:
+    """Commit of the working tree, if it is a git checkout."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        return {"commit": commit, "dirty": bool(dirty)}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def environment() -> Dict:
+    """Interpreter, machine and library versions of a run."""
+    return {
+        **git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def measure(func: Callable[[int], None], repeat: int) -> List[float]:
+    """Wall-clock times of repeated runs; func gets the run number."""
+    timings = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        func(run)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def validate(path: Path) -> None:
+    with path.open("rb") as f:
+        upload = UploadFile(file=f, filename=path.name)
+        valid, error = asyncio.run(validate_file_content(upload))
+    assert valid, error
+
+
+def load_columns(path: Path) -> None:
+    columns = load_artifact(path)
+    # Page in every column of the memory map
+    for values in (
+        columns.seconds,
+        columns.latitude,
+        columns.longitude,
+        columns.altitude,
+        columns.distance,
+    ):
+        float(np.nansum(values))
+
+
+def consume(chunks) -> None:
+    for _ in chunks:
+        pass
+
+
+def library_cases(path: Path) -> Dict[str, Callable[[int], None]]:
+    """The measured service functions for one input file."""
+    columns = read_flight(path)
+    records = data_processing.read_file_content(path)
+    write_artifact(path, columns)
+    return {
+        "validate": lambda _: validate(path),
+        "read.columns": lambda _: read_flight(path),
+        "read.records": lambda _: data_processing.read_file_content(path),
+        "read.endpoint": lambda _: data_endpoint.read_file_content(path),
+        "read.models": lambda _: parse_file(path),
+        "read.artifact": lambda _: load_columns(path),
+        "metrics": lambda _: data_endpoint.calculate_metrics(columns),
+        "metrics.records": lambda _: data_endpoint.calculate_metrics(records),
+        "export.csv": lambda _: consume(iter_csv(columns, settings.EXPORT_CHUNK_ROWS)),
+        "export.json": lambda _: consume(
+            iter_json(columns, settings.EXPORT_CHUNK_ROWS)
+        ),
+    }
+
+
+def wait_until_processed(client, file_id: str) -> None:
+    while True:
+        status = client.get(f"/api/v1/files/{file_id}/status").json()["status"]
+        if status == "done":
+            return
+        assert status != "failed", f"processing of {file_id} failed"
+        time.sleep(STATUS_POLL_SECONDS)
+
+
+def api_cases(
+    client, rows: int, fmt: str, repeat: int, skip: List[str]
+) -> Dict[str, List[float]]:
+    """End-to-end latencies through the API for one format and size."""
+    encode = flight_csv if fmt == "csv" else flight_json
+    media_type = "text/csv" if fmt == "csv" else "application/json"
+    # Another seed per run, so every upload is new content (the suite's inputs use seed 0)
+    contents = [encode(rows, seed=run + 1) for run in range(repeat)]
+
+    timings: Dict[str, List[float]] = {"api.upload": [], "api.ingest": []}
+    uploaded = []
+    for content in contents:
+        start = time.perf_counter()
+        response = client.post(
+            "/api/v1/files/upload",
+            files={"file": (f"flight.{fmt}", content, media_type)},
+        )
+        timings["api.upload"].append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+        uploaded.append(response.json()["id"])
+        wait_until_processed(client, uploaded[-1])
+        timings["api.ingest"].append(time.perf_counter() - start)
+
+    file_id = uploaded[-1]
+    requests = {
+        "api.list": lambda _: client.get("/api/v1/files"),
+        "api.data": lambda _: client.get(
+            f"/api/v1/data/{file_id}", headers={"Accept-Encoding": "identity"}
+        ),
+        "api.export.csv": lambda _: client.get(
+            f"/api/v1/data/{file_id}/export?format=csv",
+            headers={"Accept-Encoding": "identity"},
+        ),
+        "api.export.json": lambda _: client.get(
+            f"/api/v1/data/{file_id}/export?format=json",
+            headers={"Accept-Encoding": "identity"},
+        ),
+    }
+    for name, request in requests.items():
+        if not any(name.startswith(prefix) for prefix in skip):
+            timings[name] = measure(request, repeat)
+
+    for uploaded_id in uploaded:
+        client.delete(f"/api/v1/files/{uploaded_id}")
+    return {
+        name: values
+        for name, values in timings.items()
+        if not any(name.startswith(prefix) for prefix in skip)
+    }
+
+
+def result_entry(
+    case: str, fmt: str, rows: int, size: int, timings: List[float]
+) -> Dict:
+    best = min(timings)
+    return {
+        "case": case,
+        "format": fmt,
+        "rows": rows,
+        "bytes": size,
+        "best": round(best, 6),
+        "median": round(statistics.median(timings), 6),
+        "runs": [round(t, 6) for t in timings],
+        "rowsPerSecond": round(rows / best) if best > 0 else None,
+    }
+
+
+def run_suite(rows: List[int], formats: List[str], repeat: int, skip: List[str]):
+    """Measure every case. Yields one result entry per case, format and size."""
+    inputs = Path(WORK_DIR) / "inputs"
+    inputs.mkdir()
+    with TestClient(app) as client:
+        for size in rows:
+            for fmt in formats:
+                path = write_flight(inputs / f"flight_{size}.{fmt}", size)
+                file_size = path.stat().st_size
+
+                for case, func in library_cases(path).items():
+                    if any(case.startswith(prefix) for prefix in skip):
+                        continue
+                    yield result_entry(
+                        case, fmt, size, file_size, measure(func, repeat)
+                    )
+
+                if not any("api".startswith(prefix) for prefix in skip):
+                    for case, timings in api_cases(
+                        client, size, fmt, repeat, skip
+                    ).items():
+                        yield result_entry(case, fmt, size, file_size, timings)
+
+
+def result_key(entry: Dict) -> tuple:
+    return entry["case"], entry["format"], entry["rows"]
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> int:
+    """Print the change of every case against a baseline. Returns the number of regressions."""
+    previous = {result_key(entry): entry for entry in baseline["results"]}
+    print(f"\ncompared with {baseline['environment'].get('commit')}:")
+    print(
+        f"{'case':>16} {'fmt':>4} {'rows':>9} {'before':>10} {'after':>10} {'change':>8}"
+    )
+
+    regressions = 0
+    for entry in results:
+        before = previous.get(result_key(entry))
+        if before is None:
+            continue
+        change = entry["best"] / before["best"] - 1 if before["best"] > 0 else 0.0
+        slower = change > tolerance
+        regressions += slower
+        print(
+            f"{entry['case']:>16} {entry['format']:>4} {entry['rows']:>9} "
+            f"{before['best'] * 1000:>8.1f}ms {entry['best'] * 1000:>8.1f}ms "
+            f"{change:>+7.0%}{'  SLOWER' if slower else ''}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip", nargs="*", default=[])
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+    if WORK_DIR is None:
+        parser.error("run the suite as a script: python -m benchmarks.bench_suite")
+
+    env = environment()
+    output = args.output or Path(__file__).parent / "results" / (
+        f"{env['commit'] or 'local'}.json"
+    )
+
+    results = []
+    try:
+        print(
+            f"{'case':>16} {'fmt':>4} {'rows':>9} {'size':>9} {'best':>10} {'median':>10}"
+        )
+        for entry in run_suite(args.rows, args.formats, args.repeat, args.skip):
+            results.append(entry)
+            print(
+                f"{entry['case']:>16} {entry['format']:>4} {entry['rows']:>9} "
+                f"{entry['bytes'] / 1e6:>7.1f}MB {entry['best'] * 1000:>8.1f}ms "
+                f"{entry['median'] * 1000:>8.1f}ms"
+            )
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "version": RESULTS_VERSION,
+                "environment": env,
+                "repeat": args.repeat,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+    print(f"\nresults written to {output}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# backend/benchmarks/bench_validation.py
+# This file benchmarks the CSV upload validation.
+# The following functionalities are implemented:
+#
+# 1. Compared Implementations:
+# - **per-row**: the former validation, `pd.read_csv` on the whole file followed by a Python loop calling
+#   `datetime.strptime` on every timestamp and `pd.to_numeric` per numeric column.
+# - **vectorized**: `CSVStreamValidator` fed in `READ_CHUNK_SIZE` chunks, which parses batches with pandas and
+#   checks timestamps and numeric columns with vectorized masks.
+#
+# 2. Output:
+# - For every size (default: 100k and 1M rows) the best of `--repeat` runs is printed for both implementations,
+#   together with the speedup.
+#
+# Usage (from the `backend` directory):
+#   python -m benchmarks.bench_validation [--rows 100000 1000000] [--repeat 3]
+import argparse
+import time
+from datetime import datetime
+from io import StringIO
+import pandas as pd
+from app.utils.file_validator import (
+    NUMERIC_COLUMNS,
+    READ_CHUNK_SIZE,
+    CSVStreamValidator,
+)
+from .synthetic import flight_csv
+
+
+def validate_per_row(content: bytes) -> bool:
+    """The former validation: whole-file DataFrame and a strptime loop."""
+    df = pd.read_csv(StringIO(content.decode("utf-8")))
+    for ts in df["timestamp"]:
+        try:
+            datetime.strptime(str(ts), "%H:%M:%S")
+        except ValueError:
+            return False
+    return not any(
+        pd.to_numeric(df[col], errors="coerce").isna().any() for col in NUMERIC_COLUMNS
+    )
+
+
+def validate_vectorized(content: bytes) -> bool:
+    """The streaming validator with vectorized batch checks."""
+    validator = CSVStreamValidator()
+    view = memoryview(content)
+    for start in range(0, len(content), READ_CHUNK_SIZE):
+        validator.feed(view[start : start + READ_CHUNK_SIZE])
+    return validator.close() is None
+
+
+def best_of(func, content: bytes, repeat: int) -> float:
+    """Best wall-clock time of repeated runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert func(content), "validation failed"
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'size':>9} {'per-row':>9} {'vectorized':>11} {'speedup':>8}")
+    for rows in args.rows:
+        content = flight_csv(rows)
+        per_row = best_of(validate_per_row, content, args.repeat)
+        vectorized = best_of(validate_vectorized, content, args.repeat)
+        print(
+            f"{rows:>10} {len(content) / 1e6:>7.1f}MB {per_row:>8.2f}s "
+            f"{vectorized:>10.2f}s {per_row / vectorized:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
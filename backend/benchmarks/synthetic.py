@@ -0,0 +1,89 @@
+# backend/benchmarks/synthetic.py
+# This file generates synthetic drone flights for the benchmarks.
+# The following functionalities are implemented:
+#
+# 1. Flight Generation:
+# - `generate_flight(rows, seed)` returns the columns of a random-walk flight: one sample per second starting
+#   at 08:00:00, GPS coordinates around Berlin, altitude and radar distance with noise.
+#
+# 2. File Formats:
+# - `flight_csv(rows, seed)` and `flight_json(rows, seed)` encode a generated flight in the upload formats
+#   (CSV with `timestamp,latitude,longitude,altitude,radar_distance`, JSON array of nested records).
+# - `write_flight(path, rows, seed)` writes a flight to disk in the format given by the file extension.
+#
+# Run as a module from the `backend` directory, e.g. `python -m benchmarks.bench_validation`.
+import json
+from pathlib import Path
+from typing import Dict
+import numpy as np
+
+START_SECOND = 8 * 3600
+
+
+def generate_flight(rows: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Columns of a random-walk flight with one sample per second."""
+    rng = np.random.default_rng(seed)
+    seconds = (START_SECOND + np.arange(rows)) % 86400
+    return {
+        "timestamp": np.array(
+            [
+                f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}"
+                for s in seconds.tolist()
+            ]
+        ),
+        "latitude": 52.52 + np.cumsum(rng.normal(0, 2e-5, rows)),
+        "longitude": 13.405 + np.cumsum(rng.normal(0, 2e-5, rows)),
+        "altitude": np.abs(100 + np.cumsum(rng.normal(0, 0.5, rows))),
+        "radar_distance": np.abs(50 + rng.normal(0, 5, rows)),
+    }
+
+
+def flight_csv(rows: int, seed: int = 0) -> bytes:
+    """A generated flight as CSV upload content."""
+    flight = generate_flight(rows, seed)
+    lines = ["timestamp,latitude,longitude,altitude,radar_distance"]
+    lines.extend(
+        f"{ts},{lat:.6f},{lon:.6f},{alt:.2f},{dist:.2f}"
+        for ts, lat, lon, alt, dist in zip(
+            flight["timestamp"].tolist(),
+            flight["latitude"].tolist(),
+            flight["longitude"].tolist(),
+            flight["altitude"].tolist(),
+            flight["radar_distance"].tolist(),
+        )
+    )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def flight_json(rows: int, seed: int = 0) -> bytes:
+    """A generated flight as JSON upload content."""
+    flight = generate_flight(rows, seed)
+    records = [
+        {
+            "timestamp": ts,
+            "gps": {
+                "latitude": round(lat, 6),
+                "longitude": round(lon, 6),
+                "altitude": round(alt, 2),
+            },
+            "radar": {"distance": round(dist, 2)},
+        }
+        for ts, lat, lon, alt, dist in zip(
+            flight["timestamp"].tolist(),
+            flight["latitude"].tolist(),
+            flight["longitude"].tolist(),
+            flight["altitude"].tolist(),
+            flight["radar_distance"].tolist(),
+        )
+    ]
+    return json.dumps(records, indent=2).encode("utf-8")
+
+
+def write_flight(path: Path, rows: int, seed: int = 0) -> Path:
+    """Write a generated flight as .csv or .json file."""
+    path = Path(path)
+    content = (
+        flight_json(rows, seed) if path.suffix == ".json" else flight_csv(rows, seed)
+    )
+    path.write_bytes(content)
+    return path
@@ -1,10 +1,38 @@
 # backend/main.py
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.api.v1.endpoints import files, data
+from app.core.instrumentation import InstrumentationMiddleware, render_metrics
+from app.core.profiler import ProfilerMiddleware
+from app.api.v1.endpoints import files, data, folders, system, analytics
+from app.services.executor import PoolSaturated, shutdown_pools
+from app.services.folder_watcher import folder_watcher
+from app.services.job_queue import job_queue
+from app.services.spatial_index import index_missing_tracks
 
-app = FastAPI(title=settings.PROJECT_NAME)
+logging.basicConfig(level=settings.LOG_LEVEL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start processing queued uploads
+    await job_queue.start()
+    # Index the tracks of files processed before the spatial index existed
+    backfill = asyncio.create_task(index_missing_tracks())
+    yield
+    backfill.cancel()
+    # Stop the folder watcher, the job workers and the worker pools
+    await folder_watcher.close()
+    await job_queue.stop()
+    shutdown_pools()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -15,11 +43,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses (gzip, and Brotli/Zstandard when installed)
+app.add_middleware(CompressionMiddleware)
+
+# Profile slow requests while the sampling profiler is enabled
+app.add_middleware(ProfilerMiddleware)
+
+# Measure every request (latency histograms, optional Server-Timing header)
+app.add_middleware(InstrumentationMiddleware)
+
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated(request: Request, exc: PoolSaturated):
+    """Answer requests that found a worker pool saturated with 503, so clients retry later."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Include routers
 app.include_router(files.router, prefix=f"{settings.API_V1_STR}/files", tags=["files"])
 app.include_router(data.router, prefix=f"{settings.API_V1_STR}/data", tags=["data"])
+app.include_router(
+    folders.router, prefix=f"{settings.API_V1_STR}/folders", tags=["folders"]
+)
+app.include_router(
+    system.router, prefix=f"{settings.API_V1_STR}/system", tags=["system"]
+)
+app.include_router(
+    analytics.router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"]
+)
 
 
 @app.get("/")
 async def root():
     return {"message": "Drone Data Analyzer API"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request latencies and processed bytes and rows in the Prometheus text format."""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,10 @@
+# backend/tests/conftest.py
+# This file configures the test suite: the `app` package is imported from the backend directory, and the settings
+# get a throwaway upload directory, so tests never touch `backend/uploads`.
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="drone-tests-"))
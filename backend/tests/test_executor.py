@@ -0,0 +1,79 @@
+# backend/tests/test_executor.py
+# This file checks the backpressure of the worker pools (`services/executor.py`): a saturated pool raises
+# `PoolSaturated`, which the API answers with 503 and the job queue treats as a deferral, not a failed attempt.
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.metadata_store import get_metadata_store
+from app.services import job_queue as job_queue_module
+from app.services.executor import PoolSaturated, WorkerPool
+from app.services.job_queue import JobQueue
+from main import app
+
+
+def test_saturated_pool_raises_pool_saturated():
+    pool = WorkerPool("test", workers=1, queue_size=0, queue_timeout=0.05)
+    release = threading.Event()
+
+    async def saturate():
+        busy = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(PoolSaturated):
+                await pool.run(time.sleep, 0)
+        finally:
+            release.set()
+            await busy
+
+    asyncio.run(saturate())
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+
+def test_saturated_pool_is_answered_with_503(monkeypatch):
+    async def saturated(*args, **kwargs):
+        raise PoolSaturated("io")
+
+    with TestClient(app) as client:
+        monkeypatch.setattr("app.api.v1.endpoints.files.io_pool.run", saturated)
+        response = client.get("/api/v1/files/")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_saturated_job_is_requeued_without_counting_the_attempt(monkeypatch):
+    store = get_metadata_store()
+    file_id = str(uuid.uuid4())
+    store.insert(
+        {
+            "id": file_id,
+            "filename": "flight.csv",
+            "timestamp": "2024-01-01T00:00:00",
+            "path": f"/nonexistent/{file_id}.csv",
+            "status": "pending",
+            "size": 0,
+        },
+        enqueue=True,
+        max_attempts=3,
+    )
+    job = store.claim_job()
+    while job["file_id"] != file_id:
+        job = store.claim_job()
+
+    async def saturated(*args):
+        raise PoolSaturated("cpu")
+
+    monkeypatch.setattr(job_queue_module, "process_file", saturated)
+    queue = JobQueue(workers=1, max_attempts=3, retry_delay=0, poll_interval=1)
+    asyncio.run(queue._run(job))
+
+    requeued = store.get_job(file_id)
+    assert requeued["status"] == "pending"
+    assert requeued["attempts"] == 0
+    assert store.get(file_id)["status"] == "pending"
+    store.delete(file_id)
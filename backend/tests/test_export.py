@@ -0,0 +1,78 @@
+# backend/tests/test_export.py
+# This file checks the content encoding of the export endpoint (`GET /api/v1/data/{file_id}/export`), which is
+# negotiated from the client's `Accept-Encoding` header by `core/compression.py`.
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.compression import negotiate_encoding
+from main import app
+
+HEADER = "timestamp,latitude,longitude,altitude,radar_distance\n"
+
+
+def csv_content(rows: int = 200) -> bytes:
+    return (
+        HEADER
+        + "".join(
+            f"12:{i // 60:02d}:{i % 60:02d},{52.5 + i * 1e-4:.6f},13.4,{100 + i},{50 + i}\n"
+            for i in range(rows)
+        )
+    ).encode("utf-8")
+
+
+@pytest.fixture(scope="module")
+def export_url():
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/files/upload",
+            files={"file": ("flight.csv", csv_content(), "text/csv")},
+        )
+        file_id = response.json()["id"]
+        for _ in range(300):
+            if client.get(f"/api/v1/files/{file_id}/status").json()["status"] == "done":
+                break
+            time.sleep(0.1)
+        yield client, f"/api/v1/data/{file_id}/export?format=csv"
+        client.delete(f"/api/v1/files/{file_id}")
+
+
+@pytest.mark.parametrize(
+    "accept_encoding", ["gzip;q=0", "identity", "gzip; q=0.0, identity", "x-gzip;q=0"]
+)
+def test_export_refusing_gzip_is_not_encoded(export_url, accept_encoding):
+    client, url = export_url
+    response = client.get(url, headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content.startswith(HEADER.encode("utf-8"))
+
+
+@pytest.mark.parametrize("accept_encoding", ["gzip", "x-gzip", "gzip;q=0.5"])
+def test_export_accepting_gzip_is_encoded(export_url, accept_encoding):
+    client, url = export_url
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    response = client.get(url, headers={"Accept-Encoding": accept_encoding})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f"W/{identity.headers['etag']}"
+    assert response.content == identity.content
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("", None),
+        ("gzip", "gzip"),
+        ("GZIP", "gzip"),
+        ("x-gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip;q=0, *", None),
+        ("deflate", None),
+        ("*;q=0.5, gzip;q=0", None),
+    ],
+)
+def test_negotiate_gzip(monkeypatch, accept_encoding, expected):
+    monkeypatch.setattr("app.core.compression.available_encodings", lambda: ["gzip"])
+    assert negotiate_encoding(accept_encoding) == expected
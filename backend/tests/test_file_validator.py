@@ -0,0 +1,66 @@
+# backend/tests/test_file_validator.py
+# This file checks the streaming upload validators (`utils/file_validator.py`).
+from app.utils.file_validator import create_stream_validator
+
+HEADER = "timestamp,latitude,longitude,altitude,radar_distance\n"
+
+
+def validate(filename: str, content: bytes, chunk_size: int = 7):
+    """Feed a file to its stream validator in small chunks. Returns the error message."""
+    validator, error = create_stream_validator(filename)
+    assert error is None
+    for start in range(0, len(content), chunk_size):
+        if validator.feed(content[start : start + chunk_size]) is not None:
+            break
+    return validator.close()
+
+
+def csv_content(rows: int = 5) -> str:
+    return HEADER + "".join(
+        f"12:00:{i:02d},52.5,13.4,{100 + i},{50 + i}\n" for i in range(rows)
+    )
+
+
+def test_valid_csv():
+    assert validate("flight.csv", csv_content().encode("utf-8")) is None
+
+
+def test_csv_with_byte_order_mark():
+    # Excel writes "UTF-8 (CSV)" files with a byte-order mark
+    assert validate("flight.csv", csv_content().encode("utf-8-sig")) is None
+    assert (
+        validate("flight.csv", csv_content().encode("utf-8-sig"), chunk_size=1) is None
+    )
+
+
+def test_csv_errors_report_every_failing_column():
+    rows = csv_content(8).splitlines(keepends=True)
+    header, rows = rows[0], rows[1:]
+    for i in (0, 2, 3, 5, 7):
+        rows[i] = rows[i].replace("12:00:", "12:0x:")
+    rows[1] = rows[1].replace(",52.5,", ",north,")
+    rows[4] = rows[4].replace(",104,", ",high,")
+    rows[6] = rows[6].replace(",56\n", ",far\n")
+
+    error = validate("flight.csv", (header + "".join(rows)).encode("utf-8"))
+
+    assert error == (
+        "Invalid timestamp format in rows: 1, 3, 4 .... Expected format: HH:MM:SS; "
+        "Non-numeric values in column 'latitude' at rows: 2; "
+        "Non-numeric values in column 'altitude' at rows: 5; "
+        "Non-numeric values in column 'radar_distance' at rows: 7"
+    )
+
+
+def test_csv_errors_are_collected_across_batches(monkeypatch):
+    monkeypatch.setattr("app.utils.file_validator.CSV_BATCH_ROWS", 2)
+    rows = csv_content(6).splitlines(keepends=True)
+    rows[1] = rows[1].replace("12:00:", "1200:")
+    rows[6] = rows[6].replace(",55\n", ",?\n")
+
+    error = validate("flight.csv", "".join(rows).encode("utf-8"))
+
+    assert error == (
+        "Invalid timestamp format in rows: 1. Expected format: HH:MM:SS; "
+        "Non-numeric values in column 'radar_distance' at rows: 6"
+    )
@@ -0,0 +1,149 @@
+# backend/tests/test_flight_columns.py
+# This file checks that the vectorized metrics engine (`services/flight_columns.py`) produces the same
+# `flightMetrics`, `timeSeries` and `summary` as the per-record implementation it replaced.
+# Integer inputs are compared by value: the columns are float64, so e.g. an altitude of 100 is served as 100.0.
+from datetime import datetime, time
+from typing import List
+import pytest
+from app.services.flight_columns import FlightColumns, calculate_metrics
+
+
+def legacy_time_to_minutes(t: time) -> float:
+    return t.hour * 60 + t.minute + t.second / 60
+
+
+def legacy_parse_time(time_str: str) -> time:
+    return datetime.strptime(time_str, "%H:%M:%S").time()
+
+
+def legacy_calculate_metrics(data: List[dict]):
+    """The per-record implementation of the data endpoint before the columnar engine."""
+    altitude_values = [d["gps"]["altitude"] for d in data]
+    distance_values = [d["radar"]["distance"] for d in data]
+
+    start_time = legacy_parse_time(data[0]["timestamp"])
+    total_duration = legacy_time_to_minutes(
+        legacy_parse_time(data[-1]["timestamp"])
+    ) - legacy_time_to_minutes(start_time)
+
+    max_altitude, min_altitude = max(altitude_values), min(altitude_values)
+    avg_altitude = sum(altitude_values) / len(altitude_values)
+    max_distance, min_distance = max(distance_values), min(distance_values)
+    avg_distance = sum(distance_values) / len(distance_values)
+
+    time_series = []
+    for item in data:
+        duration = legacy_time_to_minutes(
+            legacy_parse_time(item["timestamp"])
+        ) - legacy_time_to_minutes(start_time)
+        time_series.append(
+            {
+                "duration": round(duration, 2),
+                "altitude": item["gps"]["altitude"],
+                "distance": item["radar"]["distance"],
+                "normalizedAltitude": (
+                    (item["gps"]["altitude"] - min_altitude)
+                    / (max_altitude - min_altitude)
+                    if max_altitude != min_altitude
+                    else 0
+                ),
+                "normalizedDistance": (
+                    (item["radar"]["distance"] - min_distance)
+                    / (max_distance - min_distance)
+                    if max_distance != min_distance
+                    else 0
+                ),
+                "time": item["timestamp"],
+            }
+        )
+
+    return {
+        "flightMetrics": {
+            "duration": round(total_duration, 2),
+            "maxAltitude": max_altitude,
+            "minAltitude": min_altitude,
+            "avgAltitude": round(avg_altitude, 2),
+            "maxDistance": max_distance,
+            "minDistance": min_distance,
+            "avgDistance": round(avg_distance, 2),
+            "totalPoints": len(data),
+            "startTime": data[0]["timestamp"],
+            "endTime": data[-1]["timestamp"],
+        },
+        "timeSeries": time_series,
+        "summary": {
+            "altitude": {
+                "max": max_altitude,
+                "min": min_altitude,
+                "avg": round(avg_altitude, 2),
+                "change": round(altitude_values[-1] - altitude_values[0], 2),
+            },
+            "radar": {
+                "max": max_distance,
+                "min": min_distance,
+                "avg": round(avg_distance, 2),
+                "change": round(distance_values[-1] - distance_values[0], 2),
+            },
+        },
+    }
+
+
+def record(timestamp: str, altitude, distance, lat=52.5, lon=13.4) -> dict:
+    return {
+        "timestamp": timestamp,
+        "gps": {"latitude": lat, "longitude": lon, "altitude": altitude},
+        "radar": {"distance": distance},
+    }
+
+
+def float_flight(rows: int = 200) -> List[dict]:
+    return [
+        record(
+            f"12:{i // 60:02d}:{i % 60:02d}",
+            100.0 + (i * 7919 % 113) * 0.37,
+            50.0 + (i * 104729 % 97) * 0.61,
+            52.5 + i * 1e-5,
+            13.4 + i * 1e-5,
+        )
+        for i in range(rows)
+    ]
+
+
+INPUTS = {
+    "float": float_flight(),
+    "int": [
+        record(f"08:00:{i:02d}", 100 + i * 3 % 17, 40 + i * 5 % 11) for i in range(60)
+    ],
+    "unsorted": [
+        record("10:00:30", 120.5, 42.0),
+        record("10:00:00", 100.0, 40.0),
+        record("10:01:15", 130.25, 45.5),
+        record("10:00:45", 110.0, 41.0),
+    ],
+    "single row": [record("09:30:00", 150.0, 35.0)],
+    "three rows": [
+        record("23:59:58", 10.0, 5.0),
+        record("23:59:59", 12.5, 5.5),
+        record("23:59:59", 11.0, 6.0),
+    ],
+}
+
+
+@pytest.mark.parametrize("name", list(INPUTS))
+def test_metrics_match_legacy_engine(name):
+    records = INPUTS[name]
+    expected = legacy_calculate_metrics(records)
+    actual = calculate_metrics(FlightColumns.from_records(records))
+
+    assert actual["flightMetrics"] == expected["flightMetrics"]
+    assert actual["summary"] == expected["summary"]
+    assert len(actual["timeSeries"]) == len(expected["timeSeries"])
+    for point, legacy_point in zip(actual["timeSeries"], expected["timeSeries"]):
+        assert point == pytest.approx(legacy_point, rel=1e-12, abs=1e-12)
+
+
+def test_integer_inputs_are_served_as_floats():
+    metrics = calculate_metrics(FlightColumns.from_records(INPUTS["int"]))
+    assert metrics["flightMetrics"]["maxAltitude"] == 116
+    assert isinstance(metrics["flightMetrics"]["maxAltitude"], float)
+    assert isinstance(metrics["timeSeries"][0]["altitude"], float)
@@ -0,0 +1,35 @@
+# backend/tests/test_folder_watcher.py
+# This file checks the deduplication of concurrent ingests in the folder watcher (`services/folder_watcher.py`).
+import asyncio
+from pathlib import Path
+
+from app.services.folder_watcher import DUPLICATE, INGESTED, FolderWatcher
+
+
+def test_waiting_ingest_takes_over_when_the_first_is_cancelled(monkeypatch):
+    watcher = FolderWatcher(settle_seconds=0, workers=2)
+    calls = []
+
+    async def ingest_content(path: Path, content_hash: str):
+        calls.append(path.name)
+        if len(calls) == 1:
+            await asyncio.Event().wait()  # Never finishes unless cancelled
+        await asyncio.sleep(0)
+        return {"status": INGESTED, "file_id": path.name}
+
+    monkeypatch.setattr(watcher, "_ingest_content", ingest_content)
+
+    async def run():
+        first = asyncio.create_task(watcher._ingest_once(Path("a.csv"), "hash"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(watcher._ingest_once(Path("b.csv"), "hash"))
+        third = asyncio.create_task(watcher._ingest_once(Path("c.csv"), "hash"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await asyncio.wait_for(asyncio.gather(second, third), timeout=1)
+
+    second, third = asyncio.run(run())
+    assert second == {"status": INGESTED, "file_id": "b.csv"}
+    assert third == {"status": DUPLICATE, "file_id": "b.csv"}
+    assert calls == ["a.csv", "b.csv"]
+    assert watcher._in_flight == {}
@@ -0,0 +1,28 @@
+# backend/tests/test_profiler_control.py
+# This file checks that the profiler can only be changed at runtime when `PROFILER_RUNTIME_CONTROL` is set.
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiler import sampling_profiler
+from main import app
+
+URL = "/api/v1/system/profiler"
+
+
+def test_profiler_is_read_only_by_default():
+    with TestClient(app) as client:
+        assert client.put(URL, params={"enabled": True}).status_code == 403
+        assert client.delete(URL).status_code == 403
+        assert client.get(URL).status_code == 200
+    assert not sampling_profiler.enabled
+
+
+def test_profiler_runtime_control(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_RUNTIME_CONTROL", True)
+    with TestClient(app) as client:
+        response = client.put(URL, params={"enabled": True, "threshold": 5})
+        assert response.status_code == 200
+        assert response.json()["enabled"] is True
+        client.put(URL, params={"enabled": False})
+        assert client.delete(URL).json() == {"success": True}
+    assert not sampling_profiler.enabled
@@ -15,4 +15,39 @@ apiClient.interceptors.response.use(
     (error) => {
       return Promise.reject(error);
     }
-);
\ No newline at end of file
+);
+
+// Response formats of GET /data/{file_id} besides plain JSON records
+export const MEDIA_COLUMNS = 'application/vnd.drone.columns+json';
+export const MEDIA_BINARY = 'application/vnd.drone.columns';
+
+// Decode a binary columnar response: "DRC1", uint32 header length, JSON header, 8-byte aligned
+// little-endian arrays. Array descriptors in the header become typed array views on the buffer.
+export const decodeColumns = <T>(buffer: ArrayBuffer): T => {
+  const decoder = new TextDecoder();
+  if (decoder.decode(new Uint8Array(buffer, 0, 4)) !== 'DRC1') {
+    throw new Error('Unsupported binary response');
+  }
+  const headerLength = new DataView(buffer).getUint32(4, true);
+  const header = JSON.parse(decoder.decode(new Uint8Array(buffer, 8, headerLength)));
+  const base = 8 + headerLength;
+
+  const revive = (value: unknown): unknown => {
+    if (Array.isArray(value)) {
+      return value.map(revive);
+    }
+    if (value !== null && typeof value === 'object') {
+      const entry = value as Record<string, unknown>;
+      if (typeof entry.$array === 'string') {
+        const offset = base + (entry.offset as number);
+        const length = entry.length as number;
+        return entry.$array === 'int32'
+          ? new Int32Array(buffer, offset, length)
+          : new Float64Array(buffer, offset, length);
+      }
+      return Object.fromEntries(Object.entries(entry).map(([key, item]) => [key, revive(item)]));
+    }
+    return value;
+  };
+  return revive(header) as T;
+};
@@ -1,10 +1,71 @@
 // src/api/endpoints.ts
-import { apiClient } from './client';
+import { apiClient, decodeColumns, MEDIA_BINARY } from './client';
 import type { 
+  ColumnarFlightData,
+  BatchUploadResponse,
+  ClosestApproaches,
+  CompareAlign,
+  DailyTotals,
+  DataQuery,
+  FileAreaQuery,
+  FleetQuery,
+  FleetSummary,
+  FlightComparisonResponse,
+  MetricDistribution,
+  FileStatusResponse,
   FileUploadResponse,
   ProcessedData 
 } from '@/api/types';
 
+const formatTime = (secondsOfDay: number): string =>
+  [Math.floor(secondsOfDay / 3600), Math.floor(secondsOfDay / 60) % 60, secondsOfDay % 60]
+    .map(value => String(value).padStart(2, '0'))
+    .join(':');
+
+// Expand a columnar page into the record-oriented ProcessedData the views use
+const toProcessedData = ({ data, metrics, page }: ColumnarFlightData): ProcessedData => {
+  const result: Partial<ProcessedData> = { page };
+  if (data) {
+    const length = Object.values(data)[0]?.length ?? 0;
+    result.data = Array.from({ length }, (_, i) => ({
+      timestamp: data.timestamp ? formatTime(data.timestamp[i]) : '',
+      gps: {
+        latitude: data.latitude?.[i] as number,
+        longitude: data.longitude?.[i] as number,
+        altitude: data.altitude?.[i] as number,
+      },
+      radar: { distance: data.distance?.[i] as number },
+    }));
+  }
+  const series = metrics.timeSeries;
+  result.metrics = {
+    ...metrics,
+    timeSeries: series
+      ? Array.from(series.duration, (duration, i) => ({
+          duration,
+          altitude: series.altitude[i],
+          distance: series.distance[i],
+          normalizedAltitude: series.normalizedAltitude[i],
+          normalizedDistance: series.normalizedDistance[i],
+          time: formatTime(series.time[i]),
+        }))
+      : undefined,
+  } as ProcessedData['metrics'];
+  return result as ProcessedData;
+};
+
+const toDataParams = (query: DataQuery = {}) => ({
+  start_time: query.startTime,
+  end_time: query.endTime,
+  offset: query.offset,
+  limit: query.limit,
+  fields: query.fields?.join(','),
+  max_points: query.maxPoints,
+  include_data: query.includeData,
+  include_series: query.includeSeries,
+  include_summary: query.includeSummary,
+});
+
 export const api = {
   files: {
     upload: async (file: File): Promise<FileUploadResponse> => {
@@ -18,25 +79,101 @@ export const api = {
       return data;
     },
     
+    uploadBatch: async (files: File[]): Promise<BatchUploadResponse> => {
+      const formData = new FormData();
+      files.forEach(file => formData.append('files', file));
+      const { data } = await apiClient.post<BatchUploadResponse>('/api/v1/files/upload/batch', formData, {
+        headers: {
+          'Content-Type': 'multipart/form-data',
+        },
+      });
+      return data;
+    },
+    
     getAll: async (): Promise<FileUploadResponse[]> => {
       const { data } = await apiClient.get<FileUploadResponse[]>('/api/v1/files');
       return data;
     },
 
+    // Files whose track passes through a box, or near a point (closest first)
+    findInArea: async (query: FileAreaQuery): Promise<FileUploadResponse[]> => {
+      const { data } = await apiClient.get<FileUploadResponse[]>('/api/v1/files', {
+        params: {
+          bbox: query.bbox?.join(','),
+          near: query.near?.join(','),
+          radius: query.radius,
+        },
+      });
+      return data;
+    },
+
+    getStatus: async (fileId: string): Promise<FileStatusResponse> => {
+      const { data } = await apiClient.get<FileStatusResponse>(`/api/v1/files/${fileId}/status`);
+      return data;
+    },
+
     delete: async (fileId: string): Promise<void> => {
       await apiClient.delete(`/api/v1/files/${fileId}`);
     }
   },
 
   data: {
-    get: async (fileId: string): Promise<ProcessedData> => {
+    get: async (fileId: string, query?: DataQuery): Promise<ProcessedData> => {
       try {
-        const { data } = await apiClient.get<ProcessedData>(`/api/v1/data/${fileId}`);
-        return data;
+        return toProcessedData(await api.data.getColumns(fileId, query));
       } catch (error) {
         console.error('Error in data.get:', error);
         throw error;
       }
+    },
+
+    // Typed arrays instead of records: smaller and faster to decode than JSON
+    getColumns: async (fileId: string, query?: DataQuery): Promise<ColumnarFlightData> => {
+      const { data } = await apiClient.get<ArrayBuffer>(`/api/v1/data/${fileId}`, {
+        params: toDataParams(query),
+        headers: { Accept: MEDIA_BINARY },
+        responseType: 'arraybuffer',
+      });
+      return decodeColumns<ColumnarFlightData>(data);
+    },
+
+    compare: async (
+      fileIds: string[],
+      options: { points?: number; align?: CompareAlign } = {}
+    ): Promise<FlightComparisonResponse> => {
+      const { data } = await apiClient.get<FlightComparisonResponse>('/api/v1/data/compare', {
+        params: { ids: fileIds.join(','), points: options.points, align: options.align },
+      });
+      return data;
+    }
+  },
+
+  fleet: {
+    summary: async (query: FleetQuery = {}): Promise<FleetSummary> => {
+      const { data } = await apiClient.get<FleetSummary>('/api/v1/analytics/summary', { params: query });
+      return data;
+    },
+
+    distribution: async (
+      metric: string,
+      query: FleetQuery & { bins?: number } = {}
+    ): Promise<MetricDistribution> => {
+      const { data } = await apiClient.get<MetricDistribution>('/api/v1/analytics/distribution', {
+        params: { metric, ...query },
+      });
+      return data;
+    },
+
+    daily: async (query: FleetQuery = {}): Promise<DailyTotals[]> => {
+      const { data } = await apiClient.get<{ days: DailyTotals[] }>('/api/v1/analytics/daily', { params: query });
+      return data.days;
+    },
+
+    approaches: async (
+      query: FleetQuery & { limit?: number; threshold?: number } = {}
+    ): Promise<ClosestApproaches> => {
+      const { data } = await apiClient.get<ClosestApproaches>('/api/v1/analytics/approaches', { params: query });
+      return data;
     }
   },
 
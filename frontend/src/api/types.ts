@@ -43,6 +43,15 @@ export interface TimeSeriesPoint {
   time: string;
 }
 
+export interface DataPage {
+  offset: number;
+  limit: number | null;
+  returned: number;
+  total: number;
+  nextOffset: number | null;
+  maxPoints: number | null;
+}
+
 export interface ProcessedData {
   data: DroneData[];
   metrics: {
@@ -53,13 +62,202 @@ export interface ProcessedData {
       radar: StatsSummary;
     };
   };
+  page?: DataPage;
+}
+
+// Column-oriented page of GET /data/{file_id} (binary format); timestamps are seconds since midnight
+export interface FlightDataColumns {
+  timestamp?: Int32Array;
+  latitude?: Float64Array;
+  longitude?: Float64Array;
+  altitude?: Float64Array;
+  distance?: Float64Array;
+}
+
+export interface TimeSeriesColumns {
+  duration: Float64Array;
+  altitude: Float64Array;
+  distance: Float64Array;
+  normalizedAltitude: Float64Array;
+  normalizedDistance: Float64Array;
+  time: Int32Array;
+}
+
+export interface ColumnarFlightData {
+  data?: FlightDataColumns;
+  metrics: {
+    flightMetrics?: FlightMetrics;
+    timeSeries?: TimeSeriesColumns;
+    summary?: {
+      altitude: StatsSummary;
+      radar: StatsSummary;
+    };
+  };
+  page: DataPage;
+}
+
+export type DataField =
+  | 'timestamp'
+  | 'gps.latitude'
+  | 'gps.longitude'
+  | 'gps.altitude'
+  | 'radar.distance';
+
+// Optional server-side window, pagination and projection for /data/{file_id}
+export interface DataQuery {
+  startTime?: string;  // Format: HH:MM:SS
+  endTime?: string;    // Format: HH:MM:SS
+  offset?: number;
+  limit?: number;
+  fields?: DataField[];
+  maxPoints?: number;  // Downsample series (LTTB) and track (Douglas-Peucker)
+  includeData?: boolean;
+  includeSeries?: boolean;
+  includeSummary?: boolean;
+}
+
+export type ProcessingStatus = 'pending' | 'running' | 'done' | 'failed';
+
+// Whole-flight metrics stored at ingest and returned with the file list
+export interface StoredFlightMetrics {
+  flightMetrics: FlightMetrics;
+  summary: {
+    altitude: StatsSummary;
+    radar: StatsSummary;
+  };
 }
 
 export interface FileUploadResponse {
   id: string;
   filename: string;
   timestamp: string;
-  status: 'success' | 'error' | 'processing';
+  status: 'success' | 'error' | 'processing' | ProcessingStatus;
+  metrics?: StoredFlightMetrics | null;
+  closestApproach?: ClosestApproach; // only for proximity queries
+}
+
+// Area filters of GET /files: bbox, or a point and radius
+export interface FileAreaQuery {
+  bbox?: [number, number, number, number]; // [minLon, minLat, maxLon, maxLat]
+  near?: [number, number]; // [lat, lon]
+  radius?: number; // meters, default 500
+}
+
+export interface ClosestApproach {
+  distance: number; // meters
+  time: string;
+  latitude: number;
+  longitude: number;
+}
+
+// Result per file of a batch upload (archive members are listed individually)
+export interface BatchUploadResult {
+  filename: string;
+  archive: string | null;
+  status: 'success' | 'error';
+  id?: string;
+  timestamp?: string;
+  error?: string;
+}
+
+export interface BatchUploadResponse {
+  files: BatchUploadResult[];
+  uploaded: number;
+  failed: number;
+}
+
+// Flights aligned on a common grid by GET /data/compare (null where a flight has no data)
+export type CompareAlign = 'elapsed' | 'progress';
+
+export interface ComparedFlight {
+  id: string;
+  filename: string;
+  durationSeconds: number;
+  points: number;
+  altitude: (number | null)[];
+  distance: (number | null)[];
+  flightMetrics: FlightMetrics;
+  // Differences to the reference flight (the first one); null for the reference itself
+  deltas: {
+    altitude: (number | null)[];
+    distance: (number | null)[];
+    altitudeRmse: number | null;
+    distanceRmse: number | null;
+    flightMetrics: Partial<Record<keyof FlightMetrics, number>>;
+  } | null;
+}
+
+export interface FlightComparisonResponse {
+  align: CompareAlign;
+  reference: string;
+  grid: number[]; // seconds since takeoff, or fraction of the flight for 'progress'
+  flights: ComparedFlight[];
+}
+
+// Fleet analytics (GET /analytics/...); days refer to the ingest date of a file
+export interface FleetQuery {
+  since?: string; // YYYY-MM-DD
+  until?: string; // YYYY-MM-DD, inclusive
+  days?: number; // the last n days
+}
+
+export interface FleetFlightRef {
+  id: string;
+  filename: string;
+  timestamp: string;
+  value: number;
+}
+
+export interface FleetSummary {
+  flights: number;
+  totalDuration: number; // minutes
+  totalPoints: number;
+  maxAltitude: FleetFlightRef | null;
+  minDistance: FleetFlightRef | null;
+}
+
+export interface MetricDistribution {
+  metric: keyof FlightMetrics;
+  flights: number;
+  histogram: { min: number; max: number; count: number }[];
+  stats: { min: number; max: number; mean: number; p50: number; p90: number; p99: number } | null;
+  top: FleetFlightRef[];
+}
+
+export interface DailyTotals {
+  date: string;
+  flights: number;
+  duration: number; // minutes
+  points: number;
+}
+
+export interface RadarApproach {
+  id: string;
+  filename: string;
+  timestamp: string;
+  distance: number;
+  time: string | null;
+  latitude: number | null;
+  longitude: number | null;
+  altitude: number | null;
+  pointsBelow?: number;
+}
+
+export interface ClosestApproaches {
+  flights: number;
+  threshold: number | null;
+  approaches: RadarApproach[];
+  flightsBelow?: number;
+  pointsBelow?: number;
+}
+
+export interface FileStatusResponse {
+  id: string;
+  status: ProcessingStatus;
+  attempts: number;
+  maxAttempts: number;
+  error: string | null;
+  updatedAt: string;
 }
 
 export interface FileSlots {
@@ -11,7 +11,7 @@ interface FileUploadProps {
 
 export const FileUpload = ({
   onFileAccepted,
-  maxSize = 10, // 10MB default
+  maxSize = 4096, // 4GB default
   allowedTypes = ['.csv', '.json']
 }: FileUploadProps) => {
   const [isDragging, setIsDragging] = useState(false);
@@ -17,7 +17,7 @@ export function ImportDialog({ disabled }: ImportDialogProps) {
   const [slotDialogOpen, setSlotDialogOpen] = useState(false);
   const [uploadedFile, setUploadedFile] = useState<FileUploadResponse | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
-  const { uploadFile, addFileToSlot } = useDataStore();
+  const { uploadFile, uploadFiles, addFileToSlot } = useDataStore();
 
   const triggerFileInput = () => {
     setError(null); // Clear error before opening file dialog
@@ -29,10 +29,34 @@ export function ImportDialog({ disabled }: ImportDialogProps) {
     setError(null); // Clear any existing errors
     
     try {
-      const file = fileOrFiles instanceof File ? fileOrFiles : fileOrFiles[0];
-      const response = await uploadFile(file);
-      setUploadedFile(response);
-      setSlotDialogOpen(true);
+      const files = fileOrFiles instanceof File ? [fileOrFiles] : Array.from(fileOrFiles);
+      if (files.length === 1 && !files[0].name.match(/\.zip$/i)) {
+        const response = await uploadFile(files[0]);
+        setUploadedFile(response);
+        setSlotDialogOpen(true);
+      } else {
+        // Several files or an archive: one batch request, results per file
+        const response = await uploadFiles(files);
+        const stored = response.files.filter(result => result.status === 'success');
+        if (response.failed > 0) {
+          setError(
+            `${response.failed} of ${response.files.length} files failed\n` +
+              response.files
+                .filter(result => result.status === 'error')
+                .map(result => `${result.filename}: ${result.error}`)
+                .join('\n')
+          );
+        }
+        if (stored.length === 1) {
+          setUploadedFile({
+            id: stored[0].id!,
+            filename: stored[0].filename,
+            timestamp: stored[0].timestamp!,
+            status: 'success',
+          });
+          setSlotDialogOpen(true);
+        }
+      }
       
       // Clear input for reuse
       if (fileInputRef.current) {
@@ -51,7 +75,7 @@ export function ImportDialog({ disabled }: ImportDialogProps) {
     } finally {
       setIsUploading(false);
     }
-  }, [uploadFile]);
+  }, [uploadFile, uploadFiles]);
 
   const handleSlotSelect = async (slot: 1 | 2) => {
     if (!uploadedFile) return;
@@ -75,7 +99,8 @@ export function ImportDialog({ disabled }: ImportDialogProps) {
         ref={fileInputRef}
         type="file"
         className="hidden"
-        accept=".csv,.json"
+        accept=".csv,.json,.zip"
+        multiple
         onChange={(e) => {
           if (e.target.files && e.target.files.length > 0) {
             handleFileUpload(e.target.files);
@@ -159,7 +159,7 @@ export default function Dashboard() {
                       Drag files or click to upload
                     </p>
                     <p className="text-sm text-muted-foreground">
-                      Supports .csv, .json files up to 10MB
+                      Supports .csv, .json files up to 4GB
                     </p>
                   </div>
                 </div>
@@ -4,13 +4,17 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { FileType, Clock, X, Trash2, Loader2, ChevronLeft, ChevronRight } from 'lucide-react';
 import { useDataStore } from '@/store/useDataStore';
-import { FileUploadResponse } from '@/api/types';
+import { FileUploadResponse, FlightMetrics } from '@/api/types';
 import { Badge } from '@/components/ui/badge';
 import { FileSlotDialog } from '@/components/shared/FileSlotDialog';
 import { api } from '@/api/endpoints';
 
 const ITEMS_PER_PAGE = 6;
 
+// Per-flight stats from the metrics stored at ingest, no flight data needed
+const formatFlightStats = (metrics: FlightMetrics) =>
+  `${metrics.duration.toFixed(1)} min · ${metrics.maxAltitude.toFixed(1)} m max · ${metrics.totalPoints} points`;
+
 export const RecentFiles = () => {
   const { 
     recentFiles, 
@@ -98,11 +102,24 @@ export const RecentFiles = () => {
                       transition-colors
                     `}
                   >
-                    <div className="flex items-center gap-2 flex-1">
+                    <div className="flex items-center gap-2 flex-1 min-w-0">
                       <FileType className="h-4 w-4 text-primary" />
-                      <span className="text-sm font-medium truncate flex-1">
-                        {file.filename}
-                      </span>
+                      <div className="flex flex-col flex-1 min-w-0">
+                        <span className="text-sm font-medium truncate">
+                          {file.filename}
+                        </span>
+                        {file.metrics && (
+                          <span className="text-xs text-muted-foreground truncate">
+                            {formatFlightStats(file.metrics.flightMetrics)}
+                          </span>
+                        )}
+                      </div>
+                      {(file.status === 'pending' || file.status === 'running') && (
+                        <Badge variant="outline">Processing</Badge>
+                      )}
+                      {file.status === 'failed' && (
+                        <Badge variant="destructive">Failed</Badge>
+                      )}
                       {slot && (
                         <Badge variant="secondary">
                           Slot {slot}
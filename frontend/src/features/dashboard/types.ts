@@ -1,9 +1,11 @@
 // src/features/dashboard/types.ts
+import { ProcessingStatus } from '@/api/types';
+
 export interface FileInfo {
   id: string;
   filename: string;
   timestamp: string;
-  status: 'success' | 'error' | 'processing';
+  status: ProcessingStatus; // job state, as reported by GET /files/{id}/status
   analyzed?: boolean;
 }
 
@@ -2,6 +2,7 @@
 import { create } from 'zustand';
 import { api } from '../api/endpoints';
 import type { 
+  BatchUploadResponse,
   DroneData, 
   FileUploadResponse,
   FlightMetrics,
@@ -27,6 +28,7 @@ interface DataState {
 interface DataActions {
   loadRecentFiles: () => Promise<void>;
   uploadFile: (file: File) => Promise<FileUploadResponse>;
+  uploadFiles: (files: File[]) => Promise<BatchUploadResponse>;
   addFileToSlot: (file: FileUploadResponse, slot: 1 | 2) => Promise<void>;
   removeFileFromSlot: (slot: 1 | 2) => void;
   clearError: () => void;
@@ -73,7 +75,7 @@ const formatErrorMessage = (error: any): string => {
 
   // Handle common HTTP errors
   if (error.response?.status === 413) {
-    return 'File Too Large\nThe maximum allowed file size is 10MB\nTry compressing your file';
+    return 'File Too Large\nThe maximum allowed file size is 4GB\nTry compressing your file';
   }
   if (error.response?.status === 415) {
     return 'Invalid File Type\nOnly .csv and .json files are supported\nCheck your file extension';
@@ -116,9 +118,9 @@ export const useDataStore = create<DataState & DataActions>((set, get) => ({
         throw new Error('Invalid File Type\nOnly .csv and .json files are supported\nCheck your file extension');
       }
 
-      if (file.size > 10 * 1024 * 1024) {
+      if (file.size > 4 * 1024 * 1024 * 1024) {
         throw new Error(
-          `File Too Large\nMaximum size: 10MB\nCurrent size: ${(file.size / (1024 * 1024)).toFixed(1)}MB`
+          `File Too Large\nMaximum size: 4GB\nCurrent size: ${(file.size / (1024 * 1024)).toFixed(1)}MB`
         );
       }
 
@@ -138,6 +140,34 @@ export const useDataStore = create<DataState & DataActions>((set, get) => ({
     }
   },
 
+  uploadFiles: async (files: File[]) => {
+    try {
+      set({ isLoading: true, error: null, uploadProgress: 10 });
+
+      // Client-side validation; zip archives are expanded by the server
+      const invalid = files.filter(file => !file.name.match(/\.(csv|json|zip)$/i));
+      if (invalid.length > 0) {
+        throw new Error(
+          `Invalid File Type\nOnly .csv, .json and .zip files are supported\n${invalid.map(f => f.name).join(', ')}`
+        );
+      }
+
+      const response = await api.files.uploadBatch(files);
+      set({ uploadProgress: 50 });
+
+      await get().loadRecentFiles();
+      set({ uploadProgress: 100 });
+
+      return response;
+    } catch (error) {
+      const errorMessage = formatErrorMessage(error);
+      throw new Error(errorMessage);
+    } finally {
+      set({ isLoading: false });
+      setTimeout(() => get().setUploadProgress(0), 1000);
+    }
+  },
+
   addFileToSlot: async (file: FileUploadResponse, slot: 1 | 2) => {
     try {
       set({ isLoading: true, error: null });